@@ -0,0 +1,274 @@
+"""Vectorized analytics over the backup snapshot series.
+
+Every snapshot (backup/jobs_<YYYY-MM-DD>[...].json|.jsonl|.parquet) is
+loaded once into a typed frame (hourly wage as float, dates as
+datetime64, state / status / category as categoricals) and cached on
+disk in data/analytics_cache, keyed on the file's size and mtime, so
+later runs only parse the snapshots added since. The aggregates below
+work on the concatenated history with pandas group-bys:
+
+    python services/analytics.py wages --by state --since 2025-08-01
+    python services/analytics.py postings --by category
+    python services/analytics.py per-day --by category
+    python services/analytics.py inactive --by category
+    python services/analytics.py churn
+
+The same reports run from `python services/cli.py stats <report>`.
+
+Needs pandas (pip install pandas).
+"""
+from snapshot_store import iter_records
+from job_record import WAGE_PATTERN, STATE_PATTERN, HOURS_PER_PERIOD
+import argparse
+import glob
+import os
+import re
+
+SNAPSHOT_DATE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+SNAPSHOT_EXTENSIONS = ('.json', '.jsonl', '.parquet')
+COLUMNS = ('caseNumber', 'jobTitle', 'company', 'location', 'salary', 'begin_date', 'end_date',
+           'experience_required', 'workers_requested', 'status', 'category', 'categories')
+CATEGORICAL = ('state', 'status', 'category', 'experience_required')
+REPORTS = ('wages', 'postings', 'per-day', 'inactive', 'churn')
+
+
+def _pandas():
+    try:
+        import pandas
+        return pandas
+    except ImportError:
+        raise RuntimeError("Analytics needs pandas: pip install pandas")
+
+
+def snapshot_files(pattern='backup/jobs_*'):
+    """{date: filename} of the snapshot series; the last file of a day wins"""
+    files = {}
+    for filename in sorted(glob.glob(pattern)):
+        match = SNAPSHOT_DATE.search(os.path.basename(filename))
+        if match and filename.endswith(SNAPSHOT_EXTENSIONS):
+            files[match.group(1)] = filename
+    return dict(sorted(files.items()))
+
+
+def _clean(series):
+    return series.where(~series.isin(['N/A', '']))
+
+
+def _raw_frame(filename, snapshot_date):
+    pd = _pandas()
+    frame = pd.DataFrame.from_records(iter_records(filename, list(COLUMNS)), columns=list(COLUMNS))
+    frame['snapshot_date'] = snapshot_date
+    return frame
+
+
+def typed_frame(frame):
+    """Raw snapshot rows (with a snapshot_date column) -> typed frame, one row per case and date"""
+    pd = _pandas()
+    frame = frame.drop_duplicates(['snapshot_date', 'caseNumber'], keep='first')
+    for column in frame.columns:
+        if column not in ('categories', 'snapshot_date'):
+            frame[column] = _clean(frame[column].astype('object'))
+
+    salary = frame['salary'].fillna('')
+    amount = pd.to_numeric(salary.str.extract(WAGE_PATTERN, expand=False).str.replace(',', ''), errors='coerce')
+    lowered = salary.str.lower()
+    # Same unit rule as job_record.parse_hourly_wage: first period mentioned wins, none means hourly
+    hours = pd.Series(1.0, index=frame.index)
+    unset = pd.Series(True, index=frame.index)
+    for period, period_hours in HOURS_PER_PERIOD:
+        matches = unset & (lowered.str.contains(f'per {period}', regex=False)
+                           | lowered.str.contains(f'/{period}', regex=False))
+        hours = hours.mask(matches, float(period_hours))
+        unset &= ~matches
+
+    # Listing snapshots carry 'category'; merged ones only 'categories'
+    first_category = frame['categories'].map(lambda value: value[0] if isinstance(value, list) and value else None)
+
+    typed = pd.DataFrame({
+        'snapshot_date': pd.to_datetime(frame['snapshot_date'], format='%Y-%m-%d'),
+        'caseNumber': frame['caseNumber'],
+        'jobTitle': frame['jobTitle'],
+        'company': frame['company'],
+        'state': frame['location'].str.extract(STATE_PATTERN, expand=False),
+        'wage': (amount / hours).round(2),
+        'begin_date': pd.to_datetime(frame['begin_date'], format='%m/%d/%Y', errors='coerce'),
+        'end_date': pd.to_datetime(frame['end_date'], format='%m/%d/%Y', errors='coerce'),
+        'experience_required': frame['experience_required'],
+        'workers_requested': pd.to_numeric(frame['workers_requested'], errors='coerce').astype('Int64'),
+        # Snapshots written before status was scraped only hold active postings
+        'status': frame['status'].fillna('ACTIVE').str.upper(),
+        'category': frame['category'].fillna(first_category),
+    })
+    typed = typed[typed['caseNumber'].notna()].reset_index(drop=True)
+    for column in CATEGORICAL:
+        typed[column] = typed[column].astype('category')
+    return typed
+
+
+def snapshot_frame(filename, snapshot_date):
+    """One snapshot as a typed frame"""
+    return typed_frame(_raw_frame(filename, snapshot_date))
+
+
+def _cache_path(cache_dir, filename):
+    stat = os.stat(filename)
+    return os.path.join(cache_dir, f"{os.path.basename(filename)}.{stat.st_size}-{stat.st_mtime_ns}.pkl")
+
+
+def _store_cached(cache_dir, filename, frame):
+    os.makedirs(cache_dir, exist_ok=True)
+    # Drop cache entries of earlier versions of the same file
+    for stale in glob.glob(os.path.join(cache_dir, glob.escape(os.path.basename(filename)) + '.*.pkl')):
+        os.remove(stale)
+    cached = _cache_path(cache_dir, filename)
+    frame.to_pickle(cached + '.tmp')
+    os.replace(cached + '.tmp', cached)
+
+
+def load_history(pattern='backup/jobs_*', cache_dir='data/analytics_cache', since=None, until=None):
+    """Every snapshot of the series (optionally between two ISO dates) in one frame.
+
+    Cached snapshots are read back as they are; the others are typed
+    together in one vectorized pass and then cached one file each.
+    """
+    pd = _pandas()
+    files = {day: filename for day, filename in snapshot_files(pattern).items()
+             if (since is None or day >= since) and (until is None or day <= until)}
+    if not files:
+        window = ''.join(f" {label} {day}" for label, day in (('since', since), ('until', until)) if day)
+        raise RuntimeError(f"No snapshots match {pattern}{window}")
+
+    frames = []
+    missing = {}
+    for day, filename in files.items():
+        cached = _cache_path(cache_dir, filename) if cache_dir else None
+        if cached and os.path.exists(cached):
+            frames.append(pd.read_pickle(cached))
+        else:
+            missing[day] = filename
+    if missing:
+        print(f"📥 Parsing {len(missing)} snapshot(s) not in the cache")
+        fresh = typed_frame(pd.concat([_raw_frame(filename, day) for day, filename in missing.items()],
+                                      ignore_index=True))
+        frames.append(fresh)
+        if cache_dir:
+            for day, frame in fresh.groupby('snapshot_date'):
+                _store_cached(cache_dir, missing[day.strftime('%Y-%m-%d')], frame.reset_index(drop=True))
+
+    history = pd.concat(frames, ignore_index=True).sort_values('snapshot_date', kind='stable', ignore_index=True)
+    # concat turns categoricals with different categories into object columns
+    for column in CATEGORICAL:
+        history[column] = history[column].astype('category')
+    return history
+
+
+def latest(history):
+    """Rows of the most recent snapshot"""
+    return history[history['snapshot_date'] == history['snapshot_date'].max()]
+
+
+def wage_distribution(history, by='state'):
+    """Hourly wage percentiles per group, over the distinct postings of `history`"""
+    postings = history.drop_duplicates('caseNumber', keep='last')
+    grouped = postings.dropna(subset=['wage']).groupby(by, observed=True)['wage']
+    stats = grouped.describe(percentiles=[0.25, 0.5, 0.75])
+    return stats.rename(columns={'50%': 'median'}).sort_values('count', ascending=False)
+
+
+def postings_per(history, by=('state',)):
+    """Active postings per group in the latest snapshot"""
+    current = latest(history)
+    current = current[current['status'] == 'ACTIVE']
+    return current.groupby(list(by), observed=True).size().sort_values(ascending=False).rename('postings')
+
+
+def first_seen(history):
+    """Date each case first appeared in the series"""
+    return history.groupby('caseNumber', observed=True)['snapshot_date'].min().rename('first_seen')
+
+
+def postings_per_day(history, by='category'):
+    """New postings per day (first snapshot a case shows up in) and group"""
+    first = history.sort_values('snapshot_date').drop_duplicates('caseNumber', keep='first')
+    return first.groupby(['snapshot_date', by], observed=True).size().unstack(fill_value=0)
+
+
+def time_to_inactive(history, by='category'):
+    """Days from first sighting to the first INACTIVE snapshot, summarized per group"""
+    pd = _pandas()
+    inactive = (history[history['status'] == 'INACTIVE']
+                .groupby('caseNumber', observed=True)['snapshot_date'].min().rename('inactive_since'))
+    cases = pd.concat([first_seen(history), inactive], axis=1, join='inner')
+    cases['days'] = (cases['inactive_since'] - cases['first_seen']).dt.days
+    groups = history.drop_duplicates('caseNumber', keep='last').set_index('caseNumber')[by]
+    cases = cases.join(groups)
+    return cases.groupby(by, observed=True)['days'].describe(percentiles=[0.5])
+
+
+def new_vs_removed(history):
+    """Per snapshot date: cases that appeared and cases gone since the previous snapshot"""
+    pd = _pandas()
+    dates = pd.Index(sorted(history['snapshot_date'].unique()))
+    seen = history[['caseNumber', 'snapshot_date']].drop_duplicates()
+    seen = seen.assign(position=dates.get_indexer(seen['snapshot_date'])).sort_values(['caseNumber', 'position'])
+    previous = seen.groupby('caseNumber')['position'].shift(1)
+    following = seen.groupby('caseNumber')['position'].shift(-1)
+
+    # New: not present in the snapshot right before (the first snapshot has no "before")
+    new = seen[(seen['position'] > 0) & (previous != seen['position'] - 1)]
+    # Removed: not present in the next snapshot; counted on that next date
+    gone = seen[(seen['position'] < len(dates) - 1) & (following != seen['position'] + 1)]
+
+    result = pd.DataFrame(index=dates)
+    result['total'] = seen.groupby('position').size().reindex(range(len(dates)), fill_value=0).to_numpy()
+    result['new'] = new.groupby('position').size().reindex(range(len(dates)), fill_value=0).to_numpy()
+    result['removed'] = (gone.groupby(gone['position'] + 1).size()
+                         .reindex(range(len(dates)), fill_value=0).to_numpy())
+    result.index.name = 'snapshot_date'
+    return result
+
+
+def report(history, name, by=None):
+    """The `name` aggregate (one of REPORTS) of a loaded history"""
+    if name == 'wages':
+        return wage_distribution(history, by=by or 'state')
+    if name == 'postings':
+        return postings_per(history, by=(by or 'state').split(','))
+    if name == 'per-day':
+        return postings_per_day(history, by=by or 'category')
+    if name == 'inactive':
+        return time_to_inactive(history, by=by or 'category')
+    if name == 'churn':
+        return new_vs_removed(history)
+    raise ValueError(f"Unknown report {name!r}; choose from {', '.join(REPORTS)}")
+
+
+def print_report(name, by=None, pattern='backup/jobs_*', since=None, until=None, cache_dir='data/analytics_cache'):
+    """Load the snapshot series and print one report"""
+    if name not in REPORTS:
+        raise ValueError(f"Unknown report {name!r}; choose from {', '.join(REPORTS)}")
+    history = load_history(pattern, cache_dir, since, until)
+    print(f"📊 {history['snapshot_date'].nunique()} snapshots, {len(history)} rows, "
+          f"{history['caseNumber'].nunique()} distinct cases")
+    print(report(history, name, by).to_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregates over the backup snapshot series")
+    parser.add_argument('report', choices=REPORTS)
+    parser.add_argument('--by', default=None, help="grouping column (state, category, status, ...)")
+    parser.add_argument('--pattern', default='backup/jobs_*', help="snapshot files (glob)")
+    parser.add_argument('--since', default=None, help="first snapshot date, YYYY-MM-DD")
+    parser.add_argument('--until', default=None, help="last snapshot date, YYYY-MM-DD")
+    parser.add_argument('--cache-dir', default='data/analytics_cache', help="'' disables the cache")
+    args = parser.parse_args()
+
+    try:
+        print_report(args.report, args.by, args.pattern, args.since, args.until, args.cache_dir or None)
+    except RuntimeError as e:
+        # No pandas, or nothing in the --since/--until window
+        print(f"✗ {e}")
+
+
+if __name__ == "__main__":
+    main()
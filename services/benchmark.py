@@ -0,0 +1,219 @@
+"""Offline benchmark of the scrapers against the local fixture server.
+
+Each scenario runs in its own process (so memory numbers and metrics
+don't leak between them) against a fixture server started from
+data/seasonal_jobs_scraped.json, and reports jobs/sec and peak memory:
+
+    python services/benchmark.py                       # every scenario
+    python services/benchmark.py http simple-http --jobs 100 --latency 0.05
+    python services/benchmark.py dynamic --failure-rate 0.02
+
+Scenarios other than `http` need selenium and a local Chrome (`tabs` also
+needs websockets).
+"""
+from fixture_server import serve_fixtures, load_records
+from scheduler import AdaptiveRateLimiter
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SCENARIOS = ('http', 'simple-http', 'simple', 'tabs', 'list-http', 'list', 'dynamic', 'harvest')
+
+
+def _python_peak_mb():
+    """Peak RSS of this process; psutil where `resource` is missing (Windows), else None"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        memory = psutil.Process().memory_info()
+        return getattr(memory, 'peak_wset', memory.rss) / (1024 * 1024)
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _unthrottled():
+    # Measure the scraper, not the politeness limit
+    return AdaptiveRateLimiter(rate=1000.0, max_rate=1000.0)
+
+
+def run_http(base_url, cases, workers, workdir):
+    """HttpJobClient alone: the floor the browser scenarios are compared to"""
+    from browser_pool import BrowserPool
+    from http_backend import HttpJobClient
+
+    pool = BrowserPool(lambda: HttpJobClient(base_url), workers=workers, limiter=_unthrottled(),
+                       progress_file=None, dead_letter_file=os.path.join(workdir, 'dead_letter.jsonl'))
+    results = pool.map(cases, lambda client, case: client.extract_job_data(case))
+    return sum(1 for result in results if result), None
+
+
+def run_simple(base_url, cases, workers, workdir, use_http, tabs=0):
+    from lista_randomizada import SeasonalJobsSimpleScraper
+
+    scraper = SeasonalJobsSimpleScraper(headless=True, use_http=use_http, base_url=base_url)
+    scraper.jsonl_filename = os.path.join(workdir, 'jobs.jsonl')
+    scraper.pool_progress_filename = os.path.join(workdir, 'pool_progress.jsonl')
+    scraper.dead_letter_filename = os.path.join(workdir, 'dead_letter.jsonl')
+    scraper.limiter = _unthrottled()
+    try:
+        count = scraper.scrape_multiple_jobs(cases, workers=workers, tabs=tabs)
+        return count, scraper.drivers.rss_mb()
+    finally:
+        scraper.close()
+
+
+def run_list(base_url, cases, workers, workdir, use_http):
+    from browser_pool import BrowserPool
+    from t import JobListScraper
+
+    primary = JobListScraper(headless=True, use_http=use_http)
+    pool = BrowserPool(
+        lambda: JobListScraper(headless=True, use_http=use_http),
+        workers=workers, limiter=_unthrottled(), primary=primary, progress_file=None,
+        dead_letter_file=os.path.join(workdir, 'dead_letter.jsonl'),
+    )
+    try:
+        results = pool.map([base_url + case for case in cases],
+                           lambda worker, job_url: worker.extract_job_data(job_url))
+        return sum(1 for result in results if result), primary.drivers.rss_mb()
+    finally:
+        primary.close()
+
+
+def run_dynamic(base_url, cases, workers, workdir):
+    from scraper_v3 import SeasonalJobsDynamicScraper
+    from scheduler import DeadLetter
+
+    scraper = SeasonalJobsDynamicScraper(headless=True)
+    scraper.job_urls = {'benchmark': base_url.rstrip('/') + '?search=benchmark'}
+    scraper.limiter = _unthrottled()
+    scraper.dead_letter = DeadLetter(os.path.join(workdir, 'dead_letter.jsonl'))
+    try:
+        jobs = scraper.scrape_categories(0, len(cases) - 1, max_concurrent=1)
+        return len(jobs), scraper.drivers.rss_mb()
+    finally:
+        scraper.close()
+
+
+def run_harvest(base_url, cases, workers, workdir):
+    """scraper_v3 listing harvest: one DOM pass over the cards, details over HTTP"""
+    from scraper_v3 import SeasonalJobsDynamicScraper
+    from scheduler import DeadLetter
+
+    scraper = SeasonalJobsDynamicScraper(headless=True)
+    scraper.job_urls = {'benchmark': base_url.rstrip('/') + '?search=benchmark'}
+    scraper.detail_base_url = base_url
+    scraper.limiter = _unthrottled()
+    scraper.dead_letter = DeadLetter(os.path.join(workdir, 'dead_letter.jsonl'))
+    scraper.detail_dead_letter_file = os.path.join(workdir, 'dead_letter_details.jsonl')
+    try:
+        jobs = scraper.harvest_categories(0, len(cases) - 1, detail_workers=workers)
+        return len(jobs), scraper.drivers.rss_mb()
+    finally:
+        scraper.close()
+
+
+def run_scenario(name, base_url, cases, workers):
+    runners = {
+        'http': run_http,
+        'simple-http': lambda *args: run_simple(*args, use_http=True),
+        'simple': lambda *args: run_simple(*args, use_http=False),
+        # One Chrome with as many tabs as the other scenarios have browsers
+        'tabs': lambda base_url, cases, workers, workdir: run_simple(base_url, cases, workers, workdir,
+                                                                     use_http=False, tabs=workers),
+        'list-http': lambda *args: run_list(*args, use_http=True),
+        'list': lambda *args: run_list(*args, use_http=False),
+        'dynamic': run_dynamic,
+        'harvest': run_harvest,
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        jobs, chrome_mb = runners[name](base_url, cases, workers, workdir)
+        seconds = time.perf_counter() - start
+
+    from metrics import metrics_snapshot
+    python_mb = _python_peak_mb()
+    return {
+        'scenario': name,
+        'jobs': jobs,
+        'requested': len(cases),
+        'seconds': round(seconds, 3),
+        'jobs_per_sec': round(jobs / seconds, 2) if seconds else 0.0,
+        'python_peak_mb': None if python_mb is None else round(python_mb, 1),
+        'chrome_rss_mb': None if chrome_mb is None else round(chrome_mb, 1),
+        'stages': metrics_snapshot()['stages'],
+    }
+
+
+def child_main(args):
+    """One scenario against a fresh fixture server; prints the result as JSON"""
+    records = load_records(args.records)
+    server, base_url = serve_fixtures(
+        records=records, page_size=args.page_size, latency=args.latency,
+        failure_rate=args.failure_rate, seed=args.seed
+    )
+    try:
+        cases = list(records)[:args.jobs]
+        result = run_scenario(args.child, base_url, cases, args.workers)
+    finally:
+        server.shutdown()
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against the local fixture server")
+    parser.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help="any of " + ', '.join(SCENARIOS) + " (default: all)")
+    parser.add_argument('--records', default='data/seasonal_jobs_scraped.json')
+    parser.add_argument('--jobs', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--page-size', type=int, default=25)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='data/benchmark.json')
+    parser.add_argument('--child', choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child_main(args)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    results = []
+    for name in args.scenarios or SCENARIOS:
+        command = [sys.executable, os.path.abspath(__file__), '--child', name,
+                   '--records', args.records, '--jobs', str(args.jobs), '--workers', str(args.workers),
+                   '--page-size', str(args.page_size), '--latency', str(args.latency),
+                   '--failure-rate', str(args.failure_rate), '--seed', str(args.seed)]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines or not lines[-1].startswith('{'):
+            error = (completed.stderr.strip().splitlines() or ['no output'])[-1]
+            print(f"✗ {name}: {error}")
+            continue
+        result = json.loads(lines[-1])
+        results.append(result)
+        python = f"{result['python_peak_mb']} MB" if result['python_peak_mb'] is not None else "n/a"
+        chrome = f"{result['chrome_rss_mb']} MB" if result['chrome_rss_mb'] is not None else "n/a"
+        print(f"✓ {name:12} {result['jobs']:>4}/{result['requested']} jobs  {result['seconds']:>7.2f}s  "
+              f"{result['jobs_per_sec']:>7.2f} jobs/s  python {python}  chrome {chrome}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    print(f"📊 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
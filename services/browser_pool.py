@@ -0,0 +1,155 @@
+from collections import defaultdict
+from jsonl_store import JsonlWriter, iter_jsonl
+from scheduler import AdaptiveRateLimiter, RetryPolicy, DeadLetter
+from metrics import increment
+import queue
+import threading
+import time
+
+
+class BrowserPool:
+    """N scrapers (one Chrome each) pulling items from a shared queue.
+
+    `scraper_factory` builds a scraper inside its worker thread; `primary`
+    is an already running scraper reused as worker 1. Results are yielded
+    in input order by `imap`.
+
+    Requests are paced by an AdaptiveRateLimiter starting at one per
+    `min_interval` seconds. An item whose task fails (exception or None)
+    is retried with backoff per `retry`; when it runs out of attempts it
+    is written to `dead_letter_file` and yielded as None.
+    """
+
+    def __init__(self, scraper_factory, workers=4, min_interval=1.0, primary=None,
+                 progress_file='data/pool_progress.jsonl', limiter=None, retry=None,
+                 dead_letter_file='data/dead_letter.jsonl'):
+        self.scraper_factory = scraper_factory
+        self.workers = max(1, workers)
+        self.rate_limiter = limiter or AdaptiveRateLimiter.from_interval(min_interval)
+        self.retry = retry or RetryPolicy()
+        self.dead_letter_file = dead_letter_file
+        self.primary = primary
+        self.progress_file = progress_file
+        self.progress_lock = threading.Lock()
+
+    def _worker(self, worker_id, tasks, results, task, progress):
+        scraper = None
+        owned = False
+        try:
+            if worker_id == 1 and self.primary is not None:
+                scraper = self.primary
+            else:
+                scraper = self.scraper_factory()
+                owned = True
+        except Exception as e:
+            print(f"✗ Worker {worker_id} could not start a browser: {e}")
+            results.put(('dead', worker_id, None))
+            return
+
+        try:
+            while True:
+                entry = tasks.get()
+                if entry is None:
+                    break
+                index, item, attempts = entry
+                self.rate_limiter.acquire()
+                error = None
+                start = time.monotonic()
+                try:
+                    result = task(scraper, item)
+                except Exception as e:
+                    print(f"✗ Worker {worker_id} failed on {item}: {e}")
+                    result, error = None, str(e)
+                self.rate_limiter.record(time.monotonic() - start, ok=result is not None)
+
+                if result and progress is not None:
+                    with self.progress_lock:
+                        progress.append({'worker': worker_id, 'index': index, 'item': item})
+                results.put(('done', (index, item, attempts + 1, error), result))
+        finally:
+            if owned and scraper:
+                scraper.close()
+            results.put(('exit', worker_id, None))
+
+    def imap(self, items, task):
+        """Run `task(scraper, item)` over items, yielding (index, item, result) in order"""
+        items = list(items)
+        tasks = queue.Queue()
+        results = queue.Queue()
+        for index, item in enumerate(items):
+            tasks.put((index, item, 0))
+
+        progress = JsonlWriter(self.progress_file) if self.progress_file else None
+        dead_letter = DeadLetter(self.dead_letter_file) if self.dead_letter_file else None
+        timers = []
+        threads = [
+            threading.Thread(target=self._worker, args=(n, tasks, results, task, progress), daemon=True)
+            for n in range(1, self.workers + 1)
+        ]
+        for thread in threads:
+            thread.start()
+
+        buffer = {}
+        next_index = 0
+        running = len(threads)
+        try:
+            while next_index < len(items):
+                if running == 0:
+                    # Every browser is gone: report what is left as failures
+                    for index in range(next_index, len(items)):
+                        buffer.setdefault(index, None)
+                else:
+                    kind, key, result = results.get()
+                    if kind != 'done':
+                        running -= 1
+                    elif result is None and self.retry.should_retry(key[2]):
+                        index, item, attempts, _ = key
+                        delay = self.retry.delay(attempts)
+                        print(f"↻ Retrying {item} in {delay:.1f}s (attempt {attempts + 1}/{self.retry.max_attempts})")
+                        increment('retries')
+                        # Workers only stop on the sentinels sent below, so a late put still runs
+                        timer = threading.Timer(delay, tasks.put, args=((index, item, attempts),))
+                        timer.daemon = True
+                        timer.start()
+                        timers.append(timer)
+                    else:
+                        index, item, attempts, error = key
+                        increment('jobs_scraped' if result is not None else 'jobs_failed')
+                        if result is None and dead_letter is not None:
+                            increment('dead_letters')
+                            dead_letter.add(item, attempts, error or 'no result')
+                        buffer[index] = result
+
+                # Release every result that is now contiguous with the output
+                while next_index in buffer:
+                    yield next_index, items[next_index], buffer.pop(next_index)
+                    next_index += 1
+        finally:
+            for timer in timers:
+                timer.cancel()
+            # Stop workers early if the consumer bailed out
+            while not tasks.empty():
+                try:
+                    tasks.get_nowait()
+                except queue.Empty:
+                    break
+            for _ in threads:
+                tasks.put(None)
+            for thread in threads:
+                thread.join()
+            if progress:
+                progress.close()
+            if dead_letter:
+                dead_letter.close()
+
+    def map(self, items, task):
+        """Same as `imap` but returns the list of results in input order"""
+        return [result for _, _, result in self.imap(items, task)]
+
+
+def load_pool_progress(filename='data/pool_progress.jsonl'):
+    """Completed items per worker, as written by BrowserPool"""
+    completed = defaultdict(list)
+    for entry in iter_jsonl(filename):
+        completed[entry['worker']].append(entry['item'])
+    return dict(completed)
@@ -0,0 +1,83 @@
+from snapshot_store import iter_records
+from datetime import datetime
+import os
+import sqlite3
+import sys
+import threading
+
+
+class CaseIndex:
+    """Persistent set of case numbers already scraped (SQLite on disk).
+
+    Safe to share between the category threads of scraper_v3.
+    """
+
+    def __init__(self, filename='data/case_index.sqlite'):
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS cases ("
+            " case_number TEXT PRIMARY KEY,"
+            " category TEXT,"
+            " first_seen TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def __contains__(self, case_number):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM cases WHERE case_number = ?", (case_number,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+    def seen(self, case_numbers):
+        """Subset of `case_numbers` already in the index (one query)"""
+        case_numbers = [case for case in case_numbers if case]
+        seen = set()
+        # SQLite limits bound parameters per statement
+        for start in range(0, len(case_numbers), 500):
+            chunk = case_numbers[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            with self.lock:
+                rows = self.connection.execute(
+                    f"SELECT case_number FROM cases WHERE case_number IN ({placeholders})", chunk
+                ).fetchall()
+            seen.update(row[0] for row in rows)
+        return seen
+
+    def add_many(self, case_numbers, category=None):
+        """Mark case numbers as seen (keeps the first sighting)"""
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = [(case, category, now) for case in case_numbers if case and case != "N/A"]
+        with self.lock:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO cases (case_number, category, first_seen) VALUES (?, ?, ?)", rows
+            )
+            self.connection.commit()
+
+    def add(self, case_number, category=None):
+        self.add_many([case_number], category)
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    # Seed the index from existing snapshots (JSON, JSONL or Parquet):
+    # python services/case_index.py backup/jobs_*
+    index = CaseIndex()
+    for filename in sys.argv[1:]:
+        case_numbers = [job.get('caseNumber') for job in iter_records(filename, ['caseNumber'])]
+        index.add_many(case_numbers)
+        print(f"✓ {filename}: {len(case_numbers)} jobs")
+    print(f"📦 Index has {len(index)} case numbers")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
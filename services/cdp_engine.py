@@ -0,0 +1,336 @@
+"""Many tabs of one Chrome, driven concurrently over the DevTools protocol.
+
+BrowserPool runs one Chrome (and one chromedriver) per worker, and each
+of them sits idle while its single tab loads. TabCrawler starts one
+light Chrome through DriverManager, opens `tabs` extra targets over the
+browser's DevTools websocket and keeps all of them loading different
+/jobs/<case> pages from an asyncio loop. Waiting for #job-detail and
+reading the fields (dom_extractor.EXTRACT_JOB_JS, job_fields mappings)
+is a single Runtime.evaluate per page.
+
+    crawler = TabCrawler(tabs=8)
+    for index, case_number, job_data in crawler.imap(case_numbers):
+        ...
+
+Results come in completion order. Needs selenium and websockets
+(pip install websockets).
+"""
+from driver_manager import DriverManager, BLOCKED_URLS
+from dom_extractor import EXTRACT_JOB_JS
+from job_fields import build_job_data
+from scheduler import AdaptiveRateLimiter, RetryPolicy, DeadLetter
+from metrics import timed, increment
+import asyncio
+import itertools
+import json
+import queue
+import threading
+import time
+import urllib.request
+
+# Resolves with the extracted fields once #job-detail is in the page, or
+# null after the timeout; arguments: include_html, timeout in ms
+WAIT_AND_EXTRACT_JS = """
+(function(includeHtml, timeout) {
+    const extract = function() {
+%s
+    };
+    const deadline = Date.now() + timeout;
+    return new Promise(resolve => {
+        (function poll() {
+            if (document.readyState !== 'loading' && document.querySelector('#job-detail')) {
+                resolve(extract.call(null, includeHtml));
+            } else if (Date.now() > deadline) {
+                resolve(null);
+            } else {
+                setTimeout(poll, 50);
+            }
+        })();
+    });
+})(%s, %d)
+"""
+
+
+def _websockets():
+    try:
+        import websockets
+        return websockets
+    except ImportError:
+        raise RuntimeError("The multi-tab engine needs websockets: pip install websockets")
+
+
+class CdpError(Exception):
+    pass
+
+
+class CdpConnection:
+    """One browser-level DevTools websocket; tabs are flat sessions on it"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.reader = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def connect(cls, debugger_address):
+        with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=10) as response:
+            url = json.loads(response.read())['webSocketDebuggerUrl']
+        websocket = await _websockets().connect(url, max_size=None)
+        return cls(websocket)
+
+    @property
+    def closed(self):
+        return self.reader.done()
+
+    async def _read(self):
+        try:
+            async for message in self.websocket:
+                data = json.loads(message)
+                future = self.pending.pop(data.get('id'), None)
+                if future is None or future.done():
+                    # Events aren't subscribed to; the engine polls the page instead
+                    continue
+                if 'error' in data:
+                    future.set_exception(CdpError(data['error'].get('message', str(data['error']))))
+                else:
+                    future.set_result(data.get('result', {}))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(CdpError("DevTools connection closed"))
+            self.pending.clear()
+
+    async def send(self, method, params=None, session_id=None, timeout=30):
+        if self.closed:
+            raise CdpError("DevTools connection closed")
+        message_id = next(self.ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[message_id] = future
+        try:
+            await self.websocket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        except _websockets().exceptions.ConnectionClosed:
+            raise CdpError("DevTools connection closed")
+        finally:
+            self.pending.pop(message_id, None)
+
+    async def close(self):
+        await self.websocket.close()
+        self.reader.cancel()
+
+
+class Tab:
+    """A page target attached as a flat session"""
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+
+    @classmethod
+    async def open(cls, connection):
+        target = await connection.send('Target.createTarget', {'url': 'about:blank'})
+        attached = await connection.send('Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True})
+        tab = cls(connection, target['targetId'], attached['sessionId'])
+        # Same light profile as the Selenium tab: no images, fonts, media or analytics
+        await tab.send('Network.enable')
+        await tab.send('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+        return tab
+
+    async def send(self, method, params=None, timeout=30):
+        return await self.connection.send(method, params, self.session_id, timeout)
+
+    async def navigate(self, url):
+        result = await self.send('Page.navigate', {'url': url})
+        if result.get('errorText'):
+            raise CdpError(f"{result['errorText']} loading {url}")
+
+    async def evaluate(self, expression, timeout=30):
+        result = await self.send('Runtime.evaluate', {
+            'expression': expression, 'returnByValue': True, 'awaitPromise': True,
+        }, timeout=timeout)
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            raise CdpError(details.get('exception', {}).get('description') or details.get('text'))
+        return result.get('result', {}).get('value')
+
+    async def close(self):
+        try:
+            await self.connection.send('Target.closeTarget', {'targetId': self.target_id}, timeout=5)
+        except (CdpError, asyncio.TimeoutError):
+            pass
+
+
+class TabCrawler:
+    """`tabs` concurrent page loads in a single Chrome (see the module docstring)"""
+
+    def __init__(self, tabs=8, headless=True, base_url="https://seasonaljobs.dol.gov/jobs/", timeout=15,
+                 limiter=None, retry=None, dead_letter_file='data/dead_letter.jsonl', archive=None, drivers=None):
+        self.tabs = max(1, tabs)
+        self.base_url = base_url
+        self.timeout = timeout
+        self.rate_limiter = limiter or AdaptiveRateLimiter()
+        self.retry = retry or RetryPolicy()
+        self.dead_letter_file = dead_letter_file
+        self.archive = archive
+        self.expression = WAIT_AND_EXTRACT_JS % (EXTRACT_JOB_JS, 'true' if archive else 'false', int(timeout * 1000))
+        # An existing DriverManager (e.g. a scraper's) lends its Chrome; otherwise one is started here
+        self.owns_drivers = drivers is None
+        self.drivers = drivers or DriverManager(headless, light=True)
+        self.connection = None
+        self.browser_lock = None
+
+    def _debugger_address(self):
+        return self.drivers.driver.capabilities['goog:chromeOptions']['debuggerAddress']
+
+    async def _ensure_connection(self):
+        """Connect on first use; reconnect (restarting Chrome) when the browser died.
+
+        Tabs that saw the same connection fail wait on the lock and get the
+        new one, so only the first of them restarts the browser; a closed
+        connection is never handed out, also not to a tab starting up.
+        """
+        async with self.browser_lock:
+            if self.connection is not None and not self.connection.closed:
+                return self.connection
+            loop = asyncio.get_running_loop()
+            if self.connection is not None:
+                print("♻️ Chrome connection lost, restarting")
+                increment('driver_crashes')
+                await loop.run_in_executor(None, self.drivers.restart)
+            address = await loop.run_in_executor(None, self._debugger_address)
+            self.connection = await CdpConnection.connect(address)
+            return self.connection
+
+    async def _extract(self, tab, case_number):
+        url = f"{self.base_url}{case_number}"
+        with timed('driver_get'):
+            await tab.navigate(url)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                with timed('detail_ready'):
+                    raw = await tab.evaluate(self.expression, timeout=self.timeout + 5)
+                break
+            except CdpError as e:
+                # The old document can still be there right after navigate returns
+                if 'context' not in str(e).lower() or time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.05)
+        if not raw:
+            return None
+        job_data = build_job_data(raw, case_number)
+        if self.archive:
+            self.archive.save(case_number, raw.get('html'))
+        return job_data
+
+    def _finish(self, work, emit, dead_letter, state, index, case_number, attempts, job_data, error=None):
+        """Emit a case that is done (scraped, or dead-lettered after its last attempt)"""
+        increment('jobs_scraped' if job_data is not None else 'jobs_failed')
+        if job_data is None:
+            increment('dead_letters')
+            dead_letter.add(case_number, attempts, error or 'no result')
+        emit((index, case_number, job_data))
+        del state['open'][index]
+        if not state['open']:
+            for _ in range(self.tabs):
+                work.put_nowait(None)
+
+    async def _tab_worker(self, work, emit, dead_letter, state):
+        loop = asyncio.get_running_loop()
+        connection = await self._ensure_connection()
+        tab = await Tab.open(connection)
+        try:
+            while True:
+                entry = await work.get()
+                if entry is None:
+                    break
+                index, case_number, attempts = entry
+                start = time.monotonic()
+                error = None
+                try:
+                    await loop.run_in_executor(None, self.rate_limiter.acquire)
+                    start = time.monotonic()
+                    job_data = await self._extract(tab, case_number)
+                except Exception as e:
+                    # Whatever goes wrong on this page only fails this case
+                    job_data, error = None, str(e) or type(e).__name__
+                    print(f"✗ Tab failed on {case_number}: {error}")
+                self.rate_limiter.record(time.monotonic() - start, ok=job_data is not None)
+
+                attempts += 1
+                state['attempts'][index] = attempts
+                if job_data is None and self.retry.should_retry(attempts):
+                    increment('retries')
+                    loop.call_later(self.retry.delay(attempts), work.put_nowait, (index, case_number, attempts))
+                else:
+                    self._finish(work, emit, dead_letter, state, index, case_number, attempts, job_data, error)
+
+                # A dead browser takes every tab with it: reconnect and reopen this one
+                if tab.connection.closed:
+                    connection = await self._ensure_connection()
+                    tab = await Tab.open(connection)
+        finally:
+            await tab.close()
+
+    async def crawl(self, case_numbers, emit):
+        """Extract every case, calling emit((index, case_number, job_data)) as each finishes"""
+        case_numbers = list(case_numbers)
+        if not case_numbers:
+            return
+        self.browser_lock = asyncio.Lock()
+        work = asyncio.Queue()
+        for index, case_number in enumerate(case_numbers):
+            work.put_nowait((index, case_number, 0))
+        state = {'open': dict(enumerate(case_numbers)), 'attempts': {}}
+        dead_letter = DeadLetter(self.dead_letter_file)
+        try:
+            workers = min(self.tabs, len(case_numbers))
+            # A tab that can't be (re)opened stops alone; the others keep draining the queue
+            results = await asyncio.gather(*(self._tab_worker(work, emit, dead_letter, state)
+                                             for _ in range(workers)), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"✗ Tab stopped: {str(result) or type(result).__name__}")
+            # Every tab stopped before these cases were done
+            for index, case_number in list(state['open'].items()):
+                self._finish(work, emit, dead_letter, state, index, case_number,
+                             state['attempts'].get(index, 0), None, 'no tab left')
+        finally:
+            dead_letter.close()
+            if self.connection is not None:
+                await self.connection.close()
+                self.connection = None
+
+    def imap(self, case_numbers):
+        """Run the crawl on a background event loop, yielding (index, case, job_data) as they finish"""
+        results = queue.Queue()
+        done = object()
+        failure = []
+
+        def run():
+            try:
+                asyncio.run(self.crawl(case_numbers, results.put))
+            except BaseException as e:
+                failure.append(e)
+            finally:
+                results.put(done)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        while True:
+            item = results.get()
+            if item is done:
+                break
+            yield item
+        thread.join()
+        if failure:
+            raise failure[0]
+
+    def close(self):
+        if self.owns_drivers:
+            self.drivers.quit()
@@ -0,0 +1,141 @@
+"""Crash-safe run state.
+
+atomic_open / atomic_write_json replace a file only once the new content
+is fully on disk (temp file in the same directory, fsync, rename), so a
+crash mid-write leaves the previous version instead of a torn file.
+
+Checkpoint keeps the sets of completed and failed case numbers of a run
+(data/checkpoint.json). Resuming skips exactly the completed cases, in
+whatever order the input list comes, and running it again is harmless.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+import tempfile
+
+# What main() does with an existing checkpoint (SCRAPER_RESUME env var)
+RESUME_POLICIES = ('resume', 'skip-failed', 'restart')
+
+
+def _fsync_directory(directory):
+    # Makes the rename itself durable (not supported on Windows)
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _read_umask():
+    # os.umask can only be read by setting it; done once, before any worker threads start
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+UMASK = _read_umask()
+
+
+def _target_mode(filename):
+    """Mode a plain open(filename, 'w') would leave: the existing file's, else 0666 minus the umask"""
+    try:
+        return os.stat(filename).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+@contextmanager
+def atomic_open(filename, mode='w', encoding='utf-8', durable=True):
+    """open() for writing that only replaces `filename` if the block succeeds.
+
+    durable=False skips the fsyncs, for files that are cheap to redo.
+    """
+    directory = os.path.dirname(filename) or '.'
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.", suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, mode, encoding=None if 'b' in mode else encoding) as file:
+            yield file
+            file.flush()
+            if durable:
+                os.fsync(file.fileno())
+        # mkstemp creates the file as 0600; keep the permissions open() would have given
+        os.chmod(temporary, _target_mode(filename))
+        os.replace(temporary, filename)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    if durable:
+        _fsync_directory(directory)
+
+
+def atomic_write_json(filename, data, indent=2):
+    with atomic_open(filename) as file:
+        json.dump(data, file, indent=indent, ensure_ascii=False)
+
+
+class Checkpoint:
+    """Completed / failed case numbers, saved atomically every `save_every` changes"""
+
+    def __init__(self, filename='data/checkpoint.json', save_every=25):
+        self.filename = filename
+        self.save_every = save_every
+        self.completed = set()
+        self.failed = {}
+        self.unsaved = 0
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Note: Could not load checkpoint {self.filename}: {e}")
+            return
+        self.completed = set(state.get('completed', []))
+        self.failed = dict(state.get('failed', {}))
+
+    def mark_completed(self, case_number):
+        self.completed.add(case_number)
+        self.failed.pop(case_number, None)
+        self._changed()
+
+    def mark_failed(self, case_number, error=None):
+        if case_number not in self.completed:
+            self.failed[case_number] = error or 'no result'
+            self._changed()
+
+    def pending(self, case_numbers, retry_failed=True):
+        """Case numbers still to scrape, in input order and without duplicates"""
+        skip = self.completed if retry_failed else self.completed | set(self.failed)
+        return [case for case in dict.fromkeys(case_numbers) if case not in skip]
+
+    def _changed(self):
+        self.unsaved += 1
+        if self.unsaved >= self.save_every:
+            self.save()
+
+    def save(self):
+        atomic_write_json(self.filename, {
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'completed': sorted(self.completed),
+            'failed': self.failed,
+        })
+        self.unsaved = 0
+
+    def reset(self):
+        """Forget every case and remove the file"""
+        self.completed = set()
+        self.failed = {}
+        self.unsaved = 0
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
@@ -0,0 +1,182 @@
+"""Single entry point for the scrapers and the offline tools.
+
+    python services/cli.py scrape cases --excel lista_randomizada_2026.xlsx --workers 4
+    python services/cli.py scrape list --csv services/h2.csv
+    python services/cli.py scrape categories --start 0 --end 50
+    python services/cli.py scrape listing --start 0 --end 50
+    python services/cli.py filter data/jobs_data.json --view data/no_experience.json:experience=no
+    python services/cli.py diff backup/jobs_2025-08-13.json backup/jobs_2025-08-18.json --output data/compared
+    python services/cli.py export data/no_experience.json --experience no
+    python services/cli.py stats
+    python services/cli.py stats wages --by state --since 2025-08-01
+
+Each command imports what it needs when it runs: Selenium, websockets
+and pandas only load for `scrape` (pandas also for a `stats` report), so
+filter / diff / export / stats start in tens of milliseconds and can run in tight loops from cron or
+shell pipelines. Every path is an argument; the defaults are the paths
+the standalone scripts use.
+"""
+import argparse
+import importlib.util
+import sys
+
+
+def scrape(args):
+    if importlib.util.find_spec('selenium') is None:
+        raise RuntimeError("Scraping needs selenium: pip install selenium")
+    if args.source == 'cases':
+        from lista_randomizada import main as scrape_cases
+        scrape_cases(excel_file=args.excel, workers=args.workers, tabs=args.tabs, use_http=args.http,
+                     resume_policy=args.resume, prometheus_file=args.prometheus)
+    elif args.source == 'list':
+        from t import main as scrape_list
+        scrape_list(csv_file=args.csv, workers=args.workers, use_http=args.http)
+    elif args.source == 'categories':
+        from scraper_v3 import main as scrape_categories
+        scrape_categories(start_index=args.start, end_index=args.end, incremental=args.incremental,
+                          harvest=not args.click, detail_workers=args.detail_workers, use_http=args.http,
+                          max_concurrent=args.max_concurrent, output=args.output)
+    else:
+        from scraper_v2 import main as scrape_listing
+        scrape_listing(start_index=args.start, end_index=args.end, output=args.output)
+
+
+def filter_views(args):
+    from filter_jobs import parse_view, run_filters
+    views = [parse_view(spec) for spec in args.view]
+    counts = run_filters(args.input, views, indent=args.indent)
+    for (filename, _), count in zip(views, counts):
+        print(f"{count} jobs saved to {filename}")
+
+
+def diff(args):
+    from json_compare import comparar
+    comparar(args.snapshots, args.output, args.output_dir)
+
+
+def export(args):
+    from job_store import JobStore
+    titles = args.title
+    if titles and titles.startswith('@'):
+        from filter_jobs import title_preset
+        titles = title_preset(titles[1:])
+    store = JobStore(args.db)
+    try:
+        count = store.export_query(
+            args.output, indent=args.indent, state=args.state, category=args.category,
+            experience=args.experience, status=args.status, titles=titles, begin_from=args.begin_from,
+            begin_to=args.begin_to, wage_min=args.wage_min, wage_max=args.wage_max,
+        )
+    finally:
+        store.close()
+    print(f"{count} jobs saved to {args.output}")
+
+
+def stats(args):
+    if args.report:
+        # Aggregates over the backup snapshot series (analytics.py, needs pandas)
+        from analytics import print_report
+        print_report(args.report, args.by, args.pattern, args.since, args.until, args.cache_dir or None)
+        return
+    from job_store import JobStore, print_stats
+    store = JobStore(args.db)
+    try:
+        print_stats(store)
+    finally:
+        store.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Seasonal jobs scrapers and offline tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scrape_parser = commands.add_parser('scrape', help="run a scraper (needs selenium and Chrome)")
+    sources = scrape_parser.add_subparsers(dest='source', required=True)
+    cases = sources.add_parser('cases', help="case numbers of an Excel list (lista_randomizada.py)")
+    cases.add_argument('--excel', default='lista_randomizada_2026.xlsx', help="file with a 'Case Number' column")
+    cases.add_argument('--workers', type=int, default=4, help="parallel headless browsers")
+    cases.add_argument('--tabs', type=int, default=0, help="tabs of one Chrome instead of workers")
+    cases.add_argument('--http', action='store_true', help="try plain HTTP before Chrome (experimental)")
+    cases.add_argument('--resume', default=None, choices=('resume', 'skip-failed', 'restart'),
+                       help="checkpoint policy (default: $SCRAPER_RESUME, then resume)")
+    cases.add_argument('--prometheus', default=None, help="also write metrics as Prometheus text")
+    job_list = sources.add_parser('list', help="job codes of a CSV file (t.py)")
+    job_list.add_argument('--csv', default='services/h2.csv', help="job codes in the first column")
+    job_list.add_argument('--workers', type=int, default=4, help="parallel headless browsers")
+    job_list.add_argument('--http', action='store_true', help="try plain HTTP before Chrome (experimental)")
+    categories = sources.add_parser('categories', help="category listings (scraper_v3.py)")
+    categories.add_argument('--start', type=int, default=0)
+    categories.add_argument('--end', type=int, default=50)
+    categories.add_argument('--incremental', action='store_true',
+                            help="only postings not in the case index, saved to data/new_jobs.json without a backup")
+    categories.add_argument('--click', action='store_true', help="click through every card instead of harvesting")
+    categories.add_argument('--detail-workers', type=int, default=4)
+    categories.add_argument('--http', action='store_true', help="fetch details over plain HTTP first (experimental)")
+    categories.add_argument('--max-concurrent', type=int, default=2, help="categories at once with --click")
+    categories.add_argument('--output', default=None,
+                            help="default data/all_jobs.json (data/new_jobs.json with --incremental)")
+    listing = sources.add_parser('listing', help="first postings of the main listing (scraper_v2.py)")
+    listing.add_argument('--start', type=int, default=0)
+    listing.add_argument('--end', type=int, default=50)
+    listing.add_argument('--output', default='data/seasonal_jobs_scraped.json')
+    scrape_parser.set_defaults(handler=scrape)
+
+    filter_parser = commands.add_parser('filter', help="split a snapshot into filtered views in one pass")
+    filter_parser.add_argument('input', help="snapshot (.json, .jsonl or .parquet)")
+    filter_parser.add_argument('--view', action='append', required=True, metavar='OUTPUT:FILTERS',
+                               help="e.g. data/no_experience.json:experience=no (see filter_jobs.py)")
+    filter_parser.add_argument('--indent', type=int, default=2)
+    filter_parser.set_defaults(handler=filter_views)
+
+    diff_parser = commands.add_parser('diff', help="new, removed and changed records between snapshots")
+    diff_parser.add_argument('snapshots', nargs='+', metavar='snapshot',
+                             help="older then newer; three or more compare each one with the previous")
+    diff_parser.add_argument('--output', default='data/compared', help="output prefix for two snapshots")
+    diff_parser.add_argument('--output-dir', default='data', help="output directory for a series")
+    diff_parser.set_defaults(handler=diff)
+
+    export_parser = commands.add_parser('export', help="query the job store into a snapshot file")
+    export_parser.add_argument('output', help="snapshot file (.json, .jsonl or .parquet)")
+    export_parser.add_argument('--db', default='data/jobs.sqlite')
+    export_parser.add_argument('--experience', default=None, help="yes or no")
+    export_parser.add_argument('--state', default=None, help="e.g. KY|TN")
+    export_parser.add_argument('--category', default=None)
+    export_parser.add_argument('--status', default=None, help="ACTIVE or INACTIVE")
+    export_parser.add_argument('--title', default=None, help="Welder|Laborer, or @construction")
+    export_parser.add_argument('--begin-from', default=None, help="YYYY-MM-DD")
+    export_parser.add_argument('--begin-to', default=None, help="YYYY-MM-DD")
+    export_parser.add_argument('--wage-min', type=float, default=None, help="hourly")
+    export_parser.add_argument('--wage-max', type=float, default=None, help="hourly")
+    export_parser.add_argument('--indent', type=int, default=2)
+    export_parser.set_defaults(handler=export)
+
+    stats_parser = commands.add_parser('stats', help="job store counts, or a report over the backup snapshots")
+    stats_parser.add_argument('report', nargs='?', default=None,
+                              help="wages, postings, per-day, inactive or churn (analytics.py, needs pandas); "
+                                   "without one: jobs, versions and runs in the job store")
+    stats_parser.add_argument('--db', default='data/jobs.sqlite')
+    stats_parser.add_argument('--by', default=None, help="grouping column of the report (state, category, ...)")
+    stats_parser.add_argument('--pattern', default='backup/jobs_*', help="snapshot files (glob)")
+    stats_parser.add_argument('--since', default=None, help="first snapshot date, YYYY-MM-DD")
+    stats_parser.add_argument('--until', default=None, help="last snapshot date, YYYY-MM-DD")
+    stats_parser.add_argument('--cache-dir', default='data/analytics_cache', help="'' disables the cache")
+    stats_parser.set_defaults(handler=stats)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'diff' and len(args.snapshots) < 2:
+        parser.error("diff needs at least two snapshots")
+    try:
+        args.handler(args)
+    except (RuntimeError, ValueError) as e:
+        # Missing optional dependency or bad input: a message, not a traceback
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
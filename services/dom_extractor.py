@@ -0,0 +1,128 @@
+"""One-round-trip extraction of a job detail page.
+
+Instead of one WebDriver call per field (and per dt), EXTRACT_JOB_JS runs
+in the page and returns every field at once, in the raw format of
+job_fields. The selectors are the ones the scrapers used individually.
+Passing include_html also returns the #job-detail markup as 'html', for
+the HtmlArchive, in the same round-trip; fallbacks adds the looser
+selectors t.py always had (h1 title, .company-name, a '$' salary,
+dates outside <time>), for pages without the usual #job-detail layout. HARVEST_CARDS_JS does the same
+for a loaded listing: the summary of every card in one call, without
+opening any of them.
+"""
+
+EXTRACT_JOB_JS = """
+const includeHtml = arguments[0];
+const fallbacks = arguments[1];
+const detail = document.querySelector('#job-detail');
+const scope = detail || (fallbacks ? document : null);
+const inScope = selector => scope ? scope.querySelector(selector) : null;
+const text = el => el ? el.innerText.trim() : null;
+const ownText = el => Array.from(el.childNodes)
+    .filter(node => node.nodeType === Node.TEXT_NODE)
+    .map(node => node.nodeValue).join('');
+const withOwnText = (selector, needle) => {
+    for (const el of document.querySelectorAll(selector)) {
+        if (ownText(el).includes(needle)) return el;
+    }
+    return null;
+};
+const dateText = label => {
+    const el = withOwnText('time', label) || (fallbacks ? withOwnText('body *', label) : null);
+    return el ? text(el).replace(label + ' ', '').trim() : null;
+};
+
+const gray = scope ? scope.querySelectorAll('p.text-gray-500') : [];
+const pairs = {};
+let website = null;
+for (const dt of document.querySelectorAll('dt')) {
+    let dd = dt.nextElementSibling;
+    while (dd && dd.tagName !== 'DD') dd = dd.nextElementSibling;
+    if (!dd) continue;
+    const label = dt.innerText.trim();
+    pairs[label] = dd.innerText.trim();
+    if (website === null && label.includes('Web address to Apply:')) {
+        const link = dd.querySelector('a');
+        if (link) website = link.href;
+    }
+}
+
+return {
+    title: text(inScope('h2') || (fallbacks
+        ? document.querySelector('h2.text-primary-dark') || document.querySelector('h1') : null)),
+    company: text(gray[0] || (fallbacks ? document.querySelector('.company-name') : null)),
+    location: gray.length > 1 ? text(gray[1]) : null,
+    salary: text(withOwnText('body *', 'per hour') || (fallbacks ? withOwnText('body *', '$') : null)),
+    begin_date: dateText('Begin date:'),
+    end_date: dateText('End date:'),
+    phone: text(document.querySelector("a[href^='tel:']")),
+    email: text(document.querySelector("a[href^='mailto:']")),
+    website: website,
+    pairs: pairs,
+    status: text(document.querySelector('span.text-red-700')),
+    html: includeHtml && detail ? detail.outerHTML : null,
+};
+"""
+
+
+def extract_job_fields(driver, include_html=False, fallbacks=False):
+    """Raw field dict (see job_fields) of the job detail currently on screen"""
+    return driver.execute_script(EXTRACT_JOB_JS, include_html, fallbacks)
+
+
+# Case number of every listing card, in the same order as
+# find_elements(By.CSS_SELECTOR, "article[tabindex='0']")
+CARD_CASES_JS = """
+const pattern = /[A-Z]-\\d{3}-\\d{5}-\\d{6}/;
+return Array.from(document.querySelectorAll("article[tabindex='0']")).map(article => {
+    const link = article.querySelector("a[href*='/jobs/']");
+    const match = (link && link.getAttribute('href').match(pattern)) || article.innerText.match(pattern);
+    return match ? match[0] : null;
+});
+"""
+
+
+def card_case_numbers(driver):
+    """Case numbers shown on the listing cards (None where a card has none)"""
+    return driver.execute_script(CARD_CASES_JS)
+
+
+# Summary of every listing card in one pass: case number, detail link and
+# the fields shown on the card (None where the card doesn't show them)
+HARVEST_CARDS_JS = """
+const casePattern = /[A-Z]-\\d{3}-\\d{5}-\\d{6}/;
+const datePattern = /\\d{1,2}\\/\\d{1,2}\\/\\d{4}/g;
+const statePattern = /,\\s*[A-Z]{2}\\b/;
+return Array.from(document.querySelectorAll("article[tabindex='0']")).map(article => {
+    const link = article.querySelector("a[href*='/jobs/']");
+    const cardText = article.innerText;
+    const match = (link && link.getAttribute('href').match(casePattern)) || cardText.match(casePattern);
+    const heading = article.querySelector('h1, h2, h3, h4');
+    const title = heading ? heading.innerText.trim() : null;
+    const lines = cardText.split('\\n').map(line => line.trim()).filter(line => line);
+    const salary = lines.find(line => line.includes('$')) || null;
+    const dates = cardText.match(datePattern) || [];
+    // Remaining paragraphs: company first, location is the one ending in ", ST"
+    const rest = Array.from(article.querySelectorAll('p'))
+        .map(p => p.innerText.trim())
+        .filter(line => line && line !== title && line !== salary
+                && !casePattern.test(line) && !line.match(datePattern));
+    const location = rest.find(line => statePattern.test(line)) || null;
+    const company = rest.find(line => line !== location) || null;
+    return {
+        caseNumber: match ? match[0] : null,
+        url: link ? link.href : null,
+        title: title,
+        company: company,
+        location: location,
+        salary: salary,
+        begin_date: dates[0] || null,
+        end_date: dates[1] || null,
+    };
+});
+"""
+
+
+def harvest_cards(driver):
+    """Summary dict of every listing card, in page order (see HARVEST_CARDS_JS)"""
+    return driver.execute_script(HARVEST_CARDS_JS)
@@ -0,0 +1,185 @@
+"""Chrome lifecycle shared by every scraper.
+
+create_chrome_driver builds a light Chrome: eager page loads (no waiting
+for subresources) and images, fonts, media and analytics blocked through
+the DevTools protocol. DriverManager owns one such driver, starts it on
+first use, recycles it after `max_pages` page loads or when Chrome's
+resident memory passes `max_rss_mb`, and restarts it when it crashes.
+Measuring memory needs psutil (pip install psutil); without it only the
+page count triggers a recycle.
+"""
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import WebDriverException
+from metrics import timed, increment, max_gauge
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Nothing the scrapers read comes from these. CSS stays: the visibility
+# waits on the job detail dialog depend on layout.
+BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*dap.digitalgov.gov*', '*touchpoints.app.cloud.gov*',
+]
+
+# Error messages of a dead browser or session (anything else is a page problem)
+CRASH_MARKERS = (
+    'invalid session id', 'session deleted', 'chrome not reachable', 'tab crashed',
+    'disconnected', 'no such window', 'target window already closed', 'connection refused',
+)
+
+
+def create_chrome_driver(headless=True, user_agent=DEFAULT_USER_AGENT, light=True):
+    """Build one configured Chrome driver (used by every scraper and the pool)"""
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument(f"--user-agent={user_agent}")
+    if light:
+        # get() returns at DOMContentLoaded; the scrapers wait for their own elements
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_experimental_option(
+            'prefs', {'profile.managed_default_content_settings.images': 2}
+        )
+
+    driver = webdriver.Chrome(options=chrome_options)
+    if light:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+    return driver
+
+
+def is_crash(error):
+    """True when a WebDriverException means the browser itself is gone"""
+    message = str(error).lower()
+    return any(marker in message for marker in CRASH_MARKERS)
+
+
+def _psutil():
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+
+class DriverManager:
+    """One Chrome per scraper: lazy start, periodic recycling, restart on crash"""
+
+    def __init__(self, headless=True, user_agent=DEFAULT_USER_AGENT, light=True,
+                 max_pages=300, max_rss_mb=1500, rss_check_every=25):
+        self.headless = headless
+        self.user_agent = user_agent
+        self.light = light
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.rss_check_every = rss_check_every
+        self._driver = None
+        self._waits = {}
+        self.pages = 0
+        self.restarts = 0
+
+    @property
+    def started(self):
+        return self._driver is not None
+
+    @property
+    def driver(self):
+        """The current driver, started on first use"""
+        if self._driver is None:
+            self.start()
+        return self._driver
+
+    def start(self):
+        self._driver = create_chrome_driver(self.headless, self.user_agent, self.light)
+        self._waits = {}
+        self.pages = 0
+
+    def wait(self, timeout):
+        """WebDriverWait bound to the current driver"""
+        driver = self.driver
+        if timeout not in self._waits:
+            self._waits[timeout] = WebDriverWait(driver, timeout)
+        return self._waits[timeout]
+
+    def get(self, url):
+        """driver.get, recycling first when due and restarting once if Chrome died"""
+        self.maybe_recycle()
+        with timed('driver_get'):
+            try:
+                self.driver.get(url)
+            except WebDriverException as e:
+                if not is_crash(e):
+                    raise
+                print(f"♻️ Chrome crashed ({str(e).splitlines()[0]}), restarting")
+                increment('driver_crashes')
+                self.restart()
+                self.driver.get(url)
+        self.pages += 1
+
+    def rss_mb(self):
+        """Resident memory of chromedriver + Chrome processes, or None without psutil"""
+        psutil = _psutil()
+        service = getattr(self._driver, 'service', None)
+        process = getattr(service, 'process', None)
+        if psutil is None or process is None:
+            return None
+        try:
+            root = psutil.Process(process.pid)
+            processes = [root] + root.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    def maybe_recycle(self):
+        """Restart Chrome between pages once it has served max_pages or grown past max_rss_mb"""
+        if self._driver is None:
+            return
+        reason = None
+        if self.max_pages and self.pages >= self.max_pages:
+            reason = f"{self.pages} pages"
+        elif self.max_rss_mb and self.pages and self.pages % self.rss_check_every == 0:
+            rss = self.rss_mb()
+            if rss is not None:
+                max_gauge('driver_rss_mb_peak', round(rss, 1))
+            if rss is not None and rss > self.max_rss_mb:
+                reason = f"{rss:.0f} MB"
+        if reason:
+            print(f"♻️ Recycling Chrome after {reason}")
+            increment('driver_recycles')
+            self.restart()
+
+    def alive(self):
+        if self._driver is None:
+            return False
+        try:
+            self._driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def restart(self):
+        self.quit()
+        self.restarts += 1
+        self.start()
+
+    def quit(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+            self._waits = {}
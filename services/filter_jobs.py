@@ -0,0 +1,149 @@
+"""Filter engine: one streaming pass over a snapshot, several output views.
+
+    python services/filter_jobs.py data/jobs_data.json \
+        --view "data/no_experience.json:experience=no" \
+        --view "data/with_experience.json:experience=yes" \
+        --view "data/construction.json:title=@construction,state=KY|TN"
+
+Each record is parsed once into a JobRecord (see job_record.py) and every
+predicate of every view reads its typed fields; the output files keep the
+original records. Predicates of a view are comma separated and must all match:
+    experience=yes|no
+    title=Welder|Laborer   (or title=@construction for FILTER_TITLES)
+    state=KY|TN            (state code at the end of `location`)
+    wage=MIN-MAX           (hourly wage, either side optional: wage=16-)
+    begin=START..END       (begin_date window, YYYY-MM-DD, either side optional)
+"""
+from snapshot_store import iter_records, open_snapshot_writer
+from job_record import JobRecord, parse_experience
+from datetime import datetime
+import argparse
+
+# Job titles of the construction view (used by contruction.py)
+CONSTRUCTION_TITLES = {
+    "Landscape Laborer",
+    "Concrete Finisher",
+    "Landscaping",
+    "Welder",
+    "Welder Journeyman",
+    "Laborer",
+    "General Construction Laborer"
+}
+
+TITLE_PRESETS = {'construction': CONSTRUCTION_TITLES}
+
+# Predicates take a JobRecord
+
+
+def experience_is(value):
+    experience = parse_experience(value)
+    if experience is None:
+        raise ValueError(f"Unknown experience {value!r}")
+    return lambda record: record.experience is experience
+
+
+def title_in(titles):
+    titles = {title.strip() for title in titles}
+    return lambda record: record.title in titles
+
+
+def state_in(states):
+    states = {state.strip().upper() for state in states}
+    return lambda record: record.state in states
+
+
+def wage_between(low=None, high=None):
+    def predicate(record):
+        wage = record.wage
+        return wage is not None and (low is None or wage >= low) and (high is None or wage <= high)
+    return predicate
+
+
+def begin_between(start=None, end=None):
+    def predicate(record):
+        begin = record.begin_date
+        return begin is not None and (start is None or begin >= start) and (end is None or begin <= end)
+    return predicate
+
+
+def _bounds(text, separator, convert):
+    low, _, high = text.partition(separator)
+    return (convert(low) if low.strip() else None, convert(high) if high.strip() else None)
+
+
+def _iso_date(text):
+    return datetime.strptime(text.strip(), '%Y-%m-%d').date()
+
+
+def title_preset(name):
+    """Titles of a TITLE_PRESETS entry ('construction')"""
+    if name not in TITLE_PRESETS:
+        raise ValueError(f"Unknown title preset {name!r}; choose from {', '.join(TITLE_PRESETS)}")
+    return TITLE_PRESETS[name]
+
+
+def build_predicate(spec):
+    """'state=KY|TN' -> predicate function"""
+    key, _, value = spec.partition('=')
+    key = key.strip().lower()
+    if key == 'experience':
+        return experience_is(value)
+    if key == 'title':
+        if value.startswith('@'):
+            return title_in(title_preset(value[1:]))
+        return title_in(title.strip() for title in value.split('|'))
+    if key == 'state':
+        return state_in(value.split('|'))
+    if key == 'wage':
+        return wage_between(*_bounds(value, '-', float))
+    if key == 'begin':
+        return begin_between(*_bounds(value, '..', _iso_date))
+    raise ValueError(f"Unknown filter '{key}'")
+
+
+def parse_view(spec):
+    """'out.json:experience=no,state=KY' -> ('out.json', [predicates])"""
+    filename, separator, predicates = spec.rpartition(':')
+    if not separator or '=' not in predicates:
+        return spec, []
+    return filename, [build_predicate(part) for part in predicates.split(',') if part.strip()]
+
+
+def run_filters(input_file, views, indent=2):
+    """Stream `input_file` once and write every view; returns the match counts.
+
+    `views` is a list of (output filename, [predicates]).
+    """
+    writers = [open_snapshot_writer(filename, indent=indent) for filename, _ in views]
+    counts = [0] * len(views)
+    try:
+        for job in iter_records(input_file):
+            record = JobRecord.from_scraped(job)
+            for position, (_, predicates) in enumerate(views):
+                if all(predicate(record) for predicate in predicates):
+                    writers[position].append(job)
+                    counts[position] += 1
+    finally:
+        for writer in writers:
+            writer.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filter a jobs snapshot into several views in one pass")
+    parser.add_argument('input', help="snapshot (.json, .jsonl or .parquet)")
+    parser.add_argument('--view', action='append', required=True, metavar='OUTPUT:FILTERS',
+                        help="output file and its filters, e.g. data/no_experience.json:experience=no")
+    args = parser.parse_args()
+
+    try:
+        views = [parse_view(spec) for spec in args.view]
+    except ValueError as e:
+        parser.error(str(e))
+    counts = run_filters(args.input, views)
+    for (filename, _), count in zip(views, counts):
+        print(f"{count} jobs saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
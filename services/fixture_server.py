@@ -0,0 +1,234 @@
+"""Local stand-in of seasonaljobs.dol.gov for offline runs and benchmarks.
+
+Serves, for a list of job records (e.g. data/seasonal_jobs_scraped.json):
+
+    /jobs?...            listing with article[tabindex='0'] cards, a working
+                         "Load More" button and a #job-detail dialog opened
+                         by clicking a card (closed by button[aria-label='Close'])
+    /jobs/<case>         rendered detail page, with ETag / 304 support
+    /api/jobs?offset=N   the next page of cards (used by "Load More")
+
+Saved pages in a fixtures directory (<dir>/<case>.html) are served as
+well. Every response can be delayed (`latency`, +/-50% jitter) and a
+share of them fail with 503 (`failure_rate`).
+
+    python services/fixture_server.py --records data/seasonal_jobs_scraped.json --latency 0.2
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from urllib.parse import parse_qs
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+LISTING_SCRIPT = """
+const cards = document.getElementById('cards');
+const dialog = document.getElementById('dialog');
+const loadMore = document.getElementById('load-more');
+let offset = cards.querySelectorAll('article').length;
+
+loadMore.addEventListener('click', async () => {
+    const response = await fetch('/api/jobs?offset=' + offset);
+    if (!response.ok) return;
+    const html = await response.text();
+    cards.insertAdjacentHTML('beforeend', html);
+    offset = cards.querySelectorAll('article').length;
+    if (response.headers.get('X-More') === '0') loadMore.remove();
+});
+
+cards.addEventListener('click', async event => {
+    const article = event.target.closest('article');
+    if (!article) return;
+    event.preventDefault();
+    const response = await fetch('/jobs/' + article.dataset.case + '?fragment=1');
+    if (!response.ok) return;
+    dialog.innerHTML = '<button aria-label="Close">&times;</button>' + await response.text();
+});
+
+dialog.addEventListener('click', event => {
+    if (event.target.closest("button[aria-label='Close']")) dialog.innerHTML = '';
+});
+"""
+
+
+def load_records(filename):
+    """Job records keyed by caseNumber (first occurrence wins), in file order"""
+    with open(filename, 'r', encoding='utf-8') as file:
+        records = json.load(file)
+    by_case = {}
+    for record in records:
+        case_number = record.get('caseNumber')
+        if case_number and case_number != "N/A":
+            by_case.setdefault(case_number, record)
+    return by_case
+
+
+def _present(record, key):
+    value = record.get(key)
+    return None if value in (None, "", "N/A") else escape(str(value))
+
+
+def render_detail(record):
+    """#job-detail section laid out like the real site, from a listing record"""
+    parts = ['<section id="job-detail">']
+    if _present(record, 'status'):
+        parts.append(f'<span class="text-red-700">{_present(record, "status")}</span>')
+    parts.append(f'<h2 class="text-primary-dark">{_present(record, "jobTitle") or ""}</h2>')
+    for key in ('company', 'location'):
+        parts.append(f'<p class="text-gray-500">{_present(record, key) or ""}</p>')
+    if _present(record, 'salary'):
+        parts.append(f'<div><span>{_present(record, "salary")}</span></div>')
+    for key, label in (('begin_date', 'Begin date:'), ('end_date', 'End date:')):
+        if _present(record, key):
+            parts.append(f'<time>{label} {_present(record, key)}</time>')
+    if _present(record, 'phone'):
+        parts.append(f'<a href="tel:{_present(record, "phone")}">{_present(record, "phone")}</a>')
+    email = _present(record, 'recApplyEmail') or _present(record, 'email')
+    if email:
+        parts.append(f'<a href="mailto:{email}">{email}</a>')
+
+    parts.append('<dl>')
+    for key, label in (('caseNumber', 'ETA Case Number:'), ('experience_required', 'Experience Required:'),
+                       ('job_duties', 'Job Duties:')):
+        if _present(record, key):
+            parts.append(f'<dt>{label}</dt><dd>{_present(record, key)}</dd>')
+    parts.append('</dl></section>')
+    return ''.join(parts)
+
+
+def render_card(record):
+    case_number = escape(record['caseNumber'])
+    return (
+        f'<article tabindex="0" data-case="{case_number}">'
+        f'<a href="/jobs/{case_number}"><h3>{_present(record, "jobTitle") or ""}</h3></a>'
+        f'<p>{_present(record, "company") or ""}</p><p>{_present(record, "location") or ""}</p>'
+        f'<p>{case_number}</p></article>'
+    )
+
+
+def _page(body, title='Seasonal Jobs'):
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head>'
+            f'<body><div id="root">{body}</div></body></html>')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the stand-in site (see the module docstring)"""
+    protocol_version = 'HTTP/1.1'
+    # Buffer headers and body into one write (avoids Nagle/delayed-ACK stalls
+    # on keep-alive connections); flushed after every request
+    wbufsize = -1
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        params = parse_qs(query)
+        server = self.server
+
+        if server.latency:
+            time.sleep(server.latency * server.random.uniform(0.5, 1.5))
+        if server.failure_rate and server.random.random() < server.failure_rate:
+            return self.send_page(503, b'Service Unavailable')
+
+        if path.rstrip('/') == '/jobs' and server.records:
+            cards = ''.join(render_card(record) for record in server.case_order[:server.page_size])
+            body = (f'<div id="cards">{cards}</div><button id="load-more">Load More</button>'
+                    f'<div id="dialog"></div><script>{LISTING_SCRIPT}</script>')
+            return self.send_page(200, _page(body).encode('utf-8'))
+
+        if path == '/api/jobs':
+            offset = int(params.get('offset', ['0'])[0])
+            chunk = server.case_order[offset:offset + server.page_size]
+            more = '1' if offset + server.page_size < len(server.case_order) else '0'
+            body = ''.join(render_card(record) for record in chunk).encode('utf-8')
+            return self.send_page(200, body, extra_headers={'X-More': more})
+
+        if not path.startswith('/jobs/'):
+            return self.send_page(404, b'Not found')
+
+        case_number = os.path.basename(path[len('/jobs/'):])
+        body = self.detail_body(case_number, fragment='fragment' in params)
+        if body is None:
+            return self.send_page(404, b'Not found')
+
+        # Validators like the real site, so cache revalidation can be exercised
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            return self.send_page(304, b'', etag)
+        self.send_page(200, body, etag)
+
+    def detail_body(self, case_number, fragment=False):
+        record = self.server.records.get(case_number)
+        if record is not None:
+            section = render_detail(record)
+            return (section if fragment else _page(section, record.get('jobTitle', ''))).encode('utf-8')
+
+        if self.server.fixtures_dir:
+            filename = os.path.join(self.server.fixtures_dir, f"{case_number}.html")
+            if os.path.exists(filename):
+                with open(filename, 'rb') as file:
+                    return file.read()
+        return None
+
+    def send_page(self, status, body, etag=None, extra_headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(fixtures_dir=None, port=0, handler=FixtureHandler, records=None,
+                   page_size=25, latency=0.0, failure_rate=0.0, seed=None):
+    """Start the fixture server in a background thread.
+
+    `records` is a {caseNumber: record} dict (see load_records). Returns
+    (server, base_url); the listing is at base_url without the trailing
+    slash. Call server.shutdown() when done.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.fixtures_dir = fixtures_dir
+    server.records = records or {}
+    server.case_order = list(server.records.values())
+    server.page_size = page_size
+    server.latency = latency
+    server.failure_rate = failure_rate
+    server.random = random.Random(seed)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/jobs/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in of seasonaljobs.dol.gov")
+    parser.add_argument('fixtures_dir', nargs='?', default=None, help="saved <case>.html pages")
+    parser.add_argument('--records', default='data/seasonal_jobs_scraped.json')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--page-size', type=int, default=25)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="share of responses failing with 503")
+    args = parser.parse_args()
+
+    records = load_records(args.records) if os.path.exists(args.records) else {}
+    server, base_url = serve_fixtures(
+        args.fixtures_dir, args.port, records=records, page_size=args.page_size,
+        latency=args.latency, failure_rate=args.failure_rate
+    )
+    print(f"✓ Serving {len(records)} jobs: listing at {base_url.rstrip('/')}, details at {base_url}<case>")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
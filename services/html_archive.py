@@ -0,0 +1,117 @@
+"""Raw #job-detail markup per case, for offline re-extraction.
+
+The scrapers can keep the #job-detail section of every page they parse
+in data/html/<case>.html.gz. After a schema change (a new entry in
+DT_DD_MAPPINGS, a new field) the dataset is rebuilt from those files on
+every CPU instead of re-scraping live:
+
+    python services/html_archive.py reparse data/jobs_data.json
+    python services/html_archive.py reparse data/jobs_list.json --schema listing --workers 8
+"""
+from concurrent.futures import ProcessPoolExecutor
+from snapshot_store import open_snapshot_writer
+from checkpoint import atomic_open
+import argparse
+import gzip
+import os
+
+SUFFIX = '.html.gz'
+# Relative links (e.g. the apply address) are resolved against the job page URL
+BASE_URL = "https://seasonaljobs.dol.gov/jobs/"
+
+
+class HtmlArchive:
+    """One gzip file per case; safe to share between threads and processes"""
+
+    def __init__(self, directory='data/html'):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def path(self, case_number):
+        return os.path.join(self.directory, f"{case_number}{SUFFIX}")
+
+    def save(self, case_number, html):
+        """Store (or replace) the markup of a case; the write is atomic"""
+        if not case_number or case_number == "N/A" or not html:
+            return
+        # Not fsynced: a lost file is re-archived by the next scrape of the case
+        with atomic_open(self.path(case_number), 'wb', durable=False) as file:
+            file.write(gzip.compress(html.encode('utf-8'), 6))
+
+    def load(self, case_number):
+        return read_html(self.path(case_number))
+
+    def __contains__(self, case_number):
+        return os.path.exists(self.path(case_number))
+
+    def files(self):
+        """Archived files, sorted by case number"""
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(SUFFIX))
+        return [os.path.join(self.directory, name) for name in names]
+
+
+def read_html(filename):
+    with open(filename, 'rb') as file:
+        return gzip.decompress(file.read()).decode('utf-8')
+
+
+def case_number_of(filename):
+    return os.path.basename(filename)[:-len(SUFFIX)]
+
+
+def _reparse_file(args):
+    """Worker: (filename, schema) -> record or None. Runs in a child process."""
+    from http_backend import parse_job_page
+    from job_fields import build_job_data, build_listing_data
+
+    filename, schema = args
+    raw = parse_job_page(read_html(filename), BASE_URL + case_number_of(filename))
+    if raw is None:
+        return None
+    if schema == 'listing':
+        return build_listing_data(raw)
+    return build_job_data(raw, case_number_of(filename))
+
+
+def reparse(archive, output_file, schema='job', workers=None, chunksize=64):
+    """Rebuild a dataset from the archive; returns (extracted, failed).
+
+    Pages are parsed on every CPU; records are written in case number order.
+    """
+    files = archive.files()
+    writer = open_snapshot_writer(output_file)
+    extracted = failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tasks = ((filename, schema) for filename in files)
+            for record in executor.map(_reparse_file, tasks, chunksize=chunksize):
+                if record is None:
+                    failed += 1
+                    continue
+                writer.append(record)
+                extracted += 1
+    finally:
+        writer.close()
+    return extracted, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract jobs from archived #job-detail pages")
+    parser.add_argument('--archive', default='data/html')
+    commands = parser.add_subparsers(dest='command', required=True)
+    reparse_parser = commands.add_parser('reparse')
+    reparse_parser.add_argument('output', help="output snapshot (.json, .jsonl or .parquet)")
+    reparse_parser.add_argument('--schema', choices=('job', 'listing'), default='job',
+                                help="job: lista_randomizada records; listing: t.py / scraper_v3 records")
+    reparse_parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    archive = HtmlArchive(args.archive)
+    extracted, failed = reparse(archive, args.output, args.schema, args.workers)
+    print(f"✓ {extracted} jobs re-extracted to {args.output}")
+    if failed:
+        print(f"✗ {failed} archived pages had no #job-detail section")
+
+
+if __name__ == "__main__":
+    main()
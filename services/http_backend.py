@@ -0,0 +1,380 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+from job_fields import build_job_data, build_listing_data
+from metrics import timed, increment
+import http.client
+import gzip
+import re
+import threading
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+# Server-rendered detail section; the bare SPA shell doesn't have it
+DETAIL_MARKER = re.compile(r'''id\s*=\s*["']?job-detail\b''')
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt',
+    'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr',
+    'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul'
+}
+
+
+class Node:
+    """Minimal DOM element: just enough to mirror the Selenium selectors"""
+    __slots__ = ('tag', 'attrs', 'children', 'parent')
+
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+
+    def has_class(self, name):
+        return name in (self.attrs.get('class') or '').split()
+
+    def iter(self):
+        """Descendant elements in document order"""
+        stack = list(reversed(self.elements()))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.elements()))
+
+    def elements(self):
+        return [child for child in self.children if isinstance(child, Node)]
+
+    def own_text(self):
+        return ''.join(child for child in self.children if isinstance(child, str))
+
+    def text(self):
+        """Rendered text, close to what WebElement.text returns"""
+        parts = []
+        self._collect_text(parts)
+        lines = (' '.join(line.split()) for line in ''.join(parts).split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+    def _collect_text(self, parts):
+        block = self.tag in BLOCK_TAGS
+        if block:
+            parts.append('\n')
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child.replace('\n', ' '))
+            elif child.tag == 'br':
+                parts.append('\n')
+            else:
+                child._collect_text(parts)
+        if block:
+            parts.append('\n')
+
+    def next_element(self):
+        """Following sibling element (XPath following-sibling::*[1])"""
+        if self.parent is None:
+            return None
+        siblings = self.parent.elements()
+        index = next(i for i, sibling in enumerate(siblings) if sibling is self)
+        return siblings[index + 1] if index + 1 < len(siblings) else None
+
+
+class TreeBuilder(HTMLParser):
+    """Builds the Node tree; also notes where #job-detail starts and ends
+    in the source so the section can be archived verbatim"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document', {})
+        self.stack = [self.root]
+        self.skipping = 0
+        self.detail_depth = None
+        self.detail_start = None
+        self.detail_end = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skipping += 1
+            return
+        if self.skipping:
+            return
+        node = Node(tag, {name: value or '' for name, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+            if self.detail_start is None and node.attrs.get('id') == 'job-detail':
+                self.detail_depth = len(self.stack) - 1
+                self.detail_start = self.getpos()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and not self.skipping and self.stack[-1].tag == tag:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skipping = max(0, self.skipping - 1)
+            return
+        if self.skipping or tag in VOID_TAGS:
+            return
+        # Close up to the matching open tag; ignore stray end tags
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag == tag:
+                if self.detail_end is None and self.detail_depth is not None and depth <= self.detail_depth:
+                    self.detail_end = self.getpos()
+                del self.stack[depth:]
+                break
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.stack[-1].children.append(data)
+
+
+def _build(html):
+    builder = TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder
+
+
+def parse_html(html):
+    return _build(html).root
+
+
+def _offset(html, position):
+    """HTMLParser (line, column) -> index into `html`"""
+    line, column = position
+    start = 0
+    for _ in range(line - 1):
+        start = html.index('\n', start) + 1
+    return start + column
+
+
+def _detail_html(html, builder):
+    """Source text of the #job-detail element (to the end if it is never closed)"""
+    start = _offset(html, builder.detail_start)
+    if builder.detail_end is None:
+        return html[start:]
+    end = html.find('>', _offset(html, builder.detail_end))
+    return html[start:end + 1 if end != -1 else len(html)]
+
+
+def _first(nodes):
+    return next(iter(nodes), None)
+
+
+def parse_job_page(html, page_url='', keep_html=False, fallbacks=False):
+    """Raw field dict (see job_fields) from a job detail page, or None when
+    the document has no rendered #job-detail section (e.g. the bare SPA shell).
+
+    With `keep_html`, the raw dict also carries the #job-detail markup as 'html'.
+    `fallbacks` adds t.py's looser selectors (see dom_extractor).
+    A stored section is itself a valid input for this function.
+    """
+    builder = _build(html)
+    root = builder.root
+    nodes = list(root.iter())
+
+    detail = _first(node for node in nodes if node.attrs.get('id') == 'job-detail')
+    if detail is None:
+        return None
+    detail_nodes = list(detail.iter())
+
+    def with_own_text(needle, tag=None):
+        return _first(node for node in nodes
+                      if (tag is None or node.tag == tag) and needle in node.own_text())
+
+    title = _first(node for node in detail_nodes if node.tag == 'h2')
+    gray = [node for node in detail_nodes if node.tag == 'p' and node.has_class('text-gray-500')]
+    company = gray[0] if gray else None
+    salary = with_own_text('per hour')
+    begin = with_own_text('Begin date:', 'time')
+    end = with_own_text('End date:', 'time')
+    if fallbacks:
+        title = (title or _first(node for node in nodes if node.tag == 'h2' and node.has_class('text-primary-dark'))
+                 or _first(node for node in nodes if node.tag == 'h1'))
+        company = company or _first(node for node in nodes if node.has_class('company-name'))
+        salary = salary or with_own_text('$')
+        begin = begin or with_own_text('Begin date:')
+        end = end or with_own_text('End date:')
+    phone = _first(node for node in nodes if node.tag == 'a' and node.attrs.get('href', '').startswith('tel:'))
+    email = _first(node for node in nodes if node.tag == 'a' and node.attrs.get('href', '').startswith('mailto:'))
+    status = _first(node for node in nodes if node.tag == 'span' and node.has_class('text-red-700'))
+
+    pairs = {}
+    website = None
+    for dt in (node for node in nodes if node.tag == 'dt'):
+        dd = dt.next_element()
+        while dd is not None and dd.tag != 'dd':
+            dd = dd.next_element()
+        if dd is None:
+            continue
+        label = dt.text().strip()
+        pairs[label] = dd.text().strip()
+        if website is None and 'Web address to Apply:' in label:
+            link = _first(node for node in dd.iter() if node.tag == 'a')
+            if link is not None:
+                website = urljoin(page_url, link.attrs.get('href', ''))
+
+    def text_of(node):
+        return node.text().strip() if node is not None else None
+
+    raw = {
+        'title': text_of(title),
+        'company': text_of(company),
+        'location': text_of(gray[1]) if len(gray) > 1 else None,
+        'salary': text_of(salary),
+        'begin_date': text_of(begin).replace('Begin date: ', '').strip() if begin is not None else None,
+        'end_date': text_of(end).replace('End date: ', '').strip() if end is not None else None,
+        'phone': text_of(phone),
+        'email': text_of(email),
+        'website': website,
+        'pairs': pairs,
+        'status': text_of(status),
+    }
+    if keep_html:
+        raw['html'] = _detail_html(html, builder)
+    return raw
+
+
+def case_number_from_url(job_url):
+    """'https://seasonaljobs.dol.gov/jobs/H-300-...' -> 'H-300-...'"""
+    return urlsplit(job_url).path.rstrip('/').rsplit('/', 1)[-1]
+
+
+class HttpJobClient:
+    """Fetches job detail pages over pooled keep-alive connections
+    (one connection per host and thread) and parses them without a browser.
+
+    With a PageCache, fresh pages are served from disk and stale ones are
+    revalidated with a conditional GET (ETag / Last-Modified); only pages
+    with a #job-detail section are cached, so a bare SPA shell never hides
+    the page from the Selenium fallback. With an HtmlArchive, the
+    #job-detail section of every parsed page is kept.
+
+    Off by default in the scrapers: the live site renders job pages
+    client-side, so for now this path mostly falls back to Chrome.
+    """
+
+    def __init__(self, base_url="https://seasonaljobs.dol.gov/jobs/", timeout=15, cache=None, archive=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache = cache
+        self.archive = archive
+        self.local = threading.local()
+        # Every open connection of every thread, so close() can reach them all
+        self.lock = threading.Lock()
+        self.open_connections = set()
+
+    def _connection(self, scheme, netloc):
+        connections = getattr(self.local, 'connections', None)
+        if connections is None:
+            connections = self.local.connections = {}
+        key = (scheme, netloc)
+        # Not in open_connections: closed by close() from another thread
+        if key not in connections or connections[key] not in self.open_connections:
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            connections[key] = connection_class(netloc, timeout=self.timeout)
+            with self.lock:
+                self.open_connections.add(connections[key])
+        return connections[key]
+
+    def _drop_connection(self, scheme, netloc):
+        connection = self.local.connections.pop((scheme, netloc), None)
+        if connection:
+            with self.lock:
+                self.open_connections.discard(connection)
+            connection.close()
+
+    def fetch(self, url, headers=None):
+        """GET `url`; returns (status, response headers with lowercase names, body text)"""
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else '')
+        request_headers = {
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/json',
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive',
+        }
+        request_headers.update(headers or {})
+
+        # A pooled connection may have been closed by the server: retry once
+        for attempt in range(2):
+            connection = self._connection(parts.scheme, parts.netloc)
+            try:
+                connection.request('GET', path, headers=request_headers)
+                response = connection.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError, OSError):
+                self._drop_connection(parts.scheme, parts.netloc)
+                if attempt:
+                    raise
+
+        if response.getheader('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        charset = re.search(r'charset=([\w-]+)', response.getheader('Content-Type') or '')
+        text = body.decode(charset.group(1) if charset else 'utf-8', errors='replace')
+        headers = {name.lower(): value for name, value in response.getheaders()}
+        return response.status, headers, text
+
+    def fetch_html(self, url, case_number=None):
+        """Page HTML, from the cache when fresh, revalidated when stale"""
+        cached = self.cache.get(case_number) if self.cache and case_number else None
+        if cached and not DETAIL_MARKER.search(cached.html):
+            # Shell cached before the check existed: fetch the page again
+            cached = None
+        if cached and cached.is_fresh(self.cache.ttl):
+            increment('cache_hits')
+            return cached.html
+
+        try:
+            with timed('http_fetch'):
+                status, headers, html = self.fetch(url, cached.validators() if cached else None)
+        except Exception as e:
+            print(f"✗ HTTP error for {url}: {e}")
+            return None
+
+        if status == 304 and cached:
+            increment('cache_revalidated')
+            self.cache.touch(case_number)
+            return cached.html
+        if status != 200:
+            print(f"✗ HTTP {status} for {url}")
+            return None
+        if self.cache and case_number and DETAIL_MARKER.search(html):
+            self.cache.put(case_number, html, etag=headers.get('etag'), last_modified=headers.get('last-modified'))
+        return html
+
+    def fetch_raw(self, url, case_number=None, fallbacks=False):
+        """Raw field dict for a job page, or None if it can't be read without a browser"""
+        html = self.fetch_html(url, case_number)
+        if html is None:
+            return None
+        with timed('parse_html'):
+            raw = parse_job_page(html, url, keep_html=self.archive is not None, fallbacks=fallbacks)
+        if raw and self.archive is not None:
+            self.archive.save(case_number or case_number_from_url(url), raw.pop('html'))
+        # INACTIVE postings never change again: keep them out of revalidation
+        if raw and self.cache and case_number and raw.get('status') == 'INACTIVE':
+            self.cache.mark_final(case_number)
+        return raw
+
+    def extract_job_data(self, case_number):
+        """Same record as SeasonalJobsSimpleScraper.extract_job_data, or None"""
+        raw = self.fetch_raw(f"{self.base_url}{case_number}", case_number)
+        return build_job_data(raw, case_number) if raw else None
+
+    def extract_listing_data(self, job_url, fallbacks=False):
+        """Same record as JobListScraper.extract_job_data (without `url`), or None"""
+        raw = self.fetch_raw(job_url, case_number_from_url(job_url), fallbacks=fallbacks)
+        return build_listing_data(raw) if raw else None
+
+    def close(self):
+        """Close the connections of every thread (pool workers included)"""
+        with self.lock:
+            connections, self.open_connections = self.open_connections, set()
+        for connection in connections:
+            connection.close()
+        self.local.connections = {}
@@ -0,0 +1,106 @@
+"""Field mappings shared by every extraction backend.
+
+Backends (Selenium, HTTP) collect a "raw" dict from a job detail page:
+
+    title, company, location, salary, begin_date, end_date, phone, email,
+    website, status  -> text or None when the element is missing
+    pairs            -> {dt text: dd text} for every dt/dd pair
+
+The builders below turn it into the record schemas the scrapers save.
+"""
+
+# dt label -> record field (case-number scraper, lista_randomizada.py)
+DT_DD_MAPPINGS = {
+    'Experience Required:': 'experience_required',
+    'Months of Experience Required:': 'months_experience',
+    'Job Duties:': 'job_duties',
+    'Number of Workers Requested:': 'workers_requested',
+    'Number of Hours Per Week:': 'hours_per_week',
+    'Work Schedule (Start/End time):': 'work_schedule',
+    'Special Requirements:': 'special_requirements',
+    'Job Classification:': 'job_classification',
+    'Full Time:': 'full_time',
+    'Multiple Worksites:': 'multiple_worksites',
+    'Additional Wage Information:': 'additional_wage_info'
+}
+
+JOB_DUTIES_LIMIT = 500
+
+
+def truncate_duties(value):
+    """Job duties are cut at 500 characters, like the scrapers always did"""
+    if len(value) > JOB_DUTIES_LIMIT:
+        return value[:JOB_DUTIES_LIMIT] + "..."
+    return value
+
+
+def find_pair(pairs, label):
+    """dd text for the first dt containing `label` (same match as `label in dt.text`)"""
+    for dt_text, dd_text in pairs.items():
+        if label in dt_text:
+            return dd_text
+    return None
+
+
+def _pair_or_na(pairs, label):
+    value = find_pair(pairs, label)
+    return "N/A" if value is None else value
+
+
+def _value(raw, key):
+    value = raw.get(key)
+    return "N/A" if value is None else value
+
+
+def build_job_data(raw, case_number):
+    """Record schema of SeasonalJobsSimpleScraper.extract_job_data"""
+    job_data = {'caseNumber': case_number}
+    for key, field in (('title', 'jobTitle'), ('company', 'company'), ('location', 'location'),
+                       ('salary', 'salary'), ('begin_date', 'begin_date'), ('end_date', 'end_date'),
+                       ('phone', 'phone'), ('email', 'email'), ('website', 'website')):
+        job_data[field] = _value(raw, key)
+
+    pairs = raw.get('pairs') or {}
+    for dt_text, field in DT_DD_MAPPINGS.items():
+        value = pairs.get(dt_text)
+        if value is None:
+            job_data[field] = "N/A"
+        elif field == 'job_duties':
+            job_data[field] = truncate_duties(value)
+        else:
+            job_data[field] = value
+
+    job_data['status'] = raw.get('status') or "ACTIVE"
+    return job_data
+
+
+def build_listing_data(raw):
+    """Record schema of the listing scrapers (scraper_v2/v3) and t.py"""
+    pairs = raw.get('pairs') or {}
+    job_duties = find_pair(pairs, "Job Duties:")
+
+    return {
+        'jobTitle': _value(raw, 'title'),
+        'recApplyEmail': _value(raw, 'email'),
+        'experience_required': _pair_or_na(pairs, "Experience Required:"),
+        'company': _value(raw, 'company'),
+        'location': _value(raw, 'location'),
+        'salary': _value(raw, 'salary'),
+        'begin_date': _value(raw, 'begin_date'),
+        'end_date': _value(raw, 'end_date'),
+        'phone': _value(raw, 'phone'),
+        'caseNumber': _pair_or_na(pairs, "ETA Case Number:"),
+        'job_duties': "N/A" if job_duties is None else truncate_duties(job_duties),
+    }
+
+
+def build_card_data(card):
+    """Listing record from a card summary (dom_extractor.harvest_cards).
+
+    Fields that only the detail page shows are "N/A"; merging the detail
+    record over it (`{**card_record, **detail_record}`) completes it.
+    """
+    raw = {key: card.get(key) for key in ('title', 'company', 'location', 'salary', 'begin_date', 'end_date')}
+    job_data = build_listing_data(raw)
+    job_data['caseNumber'] = _value(card, 'caseNumber')
+    return job_data
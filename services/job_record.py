@@ -0,0 +1,229 @@
+"""Typed, normalized job record.
+
+The scrapers write free-form dicts ("N/A" for missing values, salary and
+dates as display text). JobRecord parses such a dict once into typed
+fields (hourly wage as a float, dates as `date`, the state code split
+out of `location`, enums for status and experience, None for missing
+values), so filters and diffs don't re-parse strings per use. Unknown
+keys (category, job_index, url, ...) are kept in `extra`.
+
+    record = JobRecord.from_scraped(job_dict)
+    record.to_dict() / JobRecord.from_dict(...)   # normalized JSON form
+    record.to_row() / JobRecord.from_row(...)     # positional, for compact storage
+"""
+from snapshot_store import iter_records
+from datetime import date, datetime
+from enum import Enum
+import re
+
+WAGE_PATTERN = re.compile(r'\$\s*([\d,]+(?:\.\d+)?)')
+STATE_PATTERN = re.compile(r',\s*([A-Z]{2})\s*$')
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+# Hours per pay period, to turn weekly/monthly/yearly rates into hourly ones
+HOURS_PER_PERIOD = (('hour', 1), ('week', 40), ('month', 2080 / 12), ('year', 2080))
+
+
+class Status(Enum):
+    ACTIVE = 'ACTIVE'
+    INACTIVE = 'INACTIVE'
+
+
+class Experience(Enum):
+    YES = 'Yes'
+    NO = 'No'
+
+
+def _text(value):
+    """None for missing / "N/A" / blank values, stripped text otherwise"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return None if value in ('', 'N/A') else value
+
+
+def parse_wage(salary):
+    """'$15.87 per hour' -> 15.87 (None when there is no amount)"""
+    match = WAGE_PATTERN.search(salary or '')
+    return float(match.group(1).replace(',', '')) if match else None
+
+
+def parse_hourly_wage(salary):
+    """'$15.87 per hour' -> 15.87, '$3,200 per month' -> 18.46 (no unit: taken as hourly)"""
+    amount = parse_wage(salary)
+    if amount is None:
+        return None
+    text = salary.lower()
+    for period, hours in HOURS_PER_PERIOD:
+        if f'per {period}' in text or f'/{period}' in text:
+            return round(amount / hours, 2)
+    return amount
+
+
+def parse_date(text):
+    """'7/7/2025' -> date (None for 'N/A' or unknown formats)"""
+    try:
+        return datetime.strptime((text or '').strip(), '%m/%d/%Y').date()
+    except ValueError:
+        return None
+
+
+def parse_state(location):
+    """'Edmonton, KY' -> 'KY'"""
+    match = STATE_PATTERN.search(location or '')
+    return match.group(1) if match else None
+
+
+def parse_number(text, kind=int):
+    """First number in the text ('40 hours' -> 40), None when there is none"""
+    match = NUMBER_PATTERN.search(text or '')
+    return kind(float(match.group())) if match else None
+
+
+def parse_experience(text):
+    text = (text or '').strip().lower()
+    if text.startswith('y'):
+        return Experience.YES
+    if text.startswith('n') and text != 'n/a':
+        return Experience.NO
+    return None
+
+
+def parse_status(text):
+    try:
+        return Status((text or '').strip().upper())
+    except ValueError:
+        return None
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+# JobRecord fields, in constructor and to_row order
+ROW_FIELDS = (
+    'case_number', 'title', 'company', 'location', 'state', 'salary', 'wage',
+    'begin_date', 'end_date', 'phone', 'email', 'website', 'experience',
+    'months_experience', 'workers_requested', 'hours_per_week', 'job_duties',
+    'status', 'extra',
+)
+_BEGIN_DATE = ROW_FIELDS.index('begin_date')
+_END_DATE = ROW_FIELDS.index('end_date')
+_EXPERIENCE = ROW_FIELDS.index('experience')
+_STATUS = ROW_FIELDS.index('status')
+
+
+class JobRecord:
+    """One job posting with parsed, typed fields"""
+    __slots__ = ROW_FIELDS
+
+    # Scraped keys consumed by from_scraped (everything else goes to `extra`)
+    SCRAPED_KEYS = {
+        'caseNumber', 'jobTitle', 'company', 'location', 'salary', 'begin_date', 'end_date',
+        'phone', 'email', 'recApplyEmail', 'website', 'experience_required', 'months_experience',
+        'workers_requested', 'hours_per_week', 'job_duties', 'status',
+    }
+
+    def __init__(self, case_number=None, title=None, company=None, location=None, state=None,
+                 salary=None, wage=None, begin_date=None, end_date=None, phone=None, email=None,
+                 website=None, experience=None, months_experience=None, workers_requested=None,
+                 hours_per_week=None, job_duties=None, status=None, extra=None):
+        self.case_number = case_number
+        self.title = title
+        self.company = company
+        self.location = location
+        self.state = state
+        self.salary = salary
+        self.wage = wage
+        self.begin_date = begin_date
+        self.end_date = end_date
+        self.phone = phone
+        self.email = email
+        self.website = website
+        self.experience = experience
+        self.months_experience = months_experience
+        self.workers_requested = workers_requested
+        self.hours_per_week = hours_per_week
+        self.job_duties = job_duties
+        self.status = status
+        self.extra = extra
+
+    @classmethod
+    def from_scraped(cls, job):
+        """Parse a dict written by any scraper (case-number or listing schema)"""
+        location = _text(job.get('location'))
+        salary = _text(job.get('salary'))
+        extra = {key: (None if value == "N/A" else value)
+                 for key, value in job.items() if key not in cls.SCRAPED_KEYS}
+        return cls(
+            case_number=_text(job.get('caseNumber')),
+            title=_text(job.get('jobTitle')),
+            company=_text(job.get('company')),
+            location=location,
+            state=parse_state(location),
+            salary=salary,
+            wage=parse_hourly_wage(salary),
+            begin_date=parse_date(job.get('begin_date')),
+            end_date=parse_date(job.get('end_date')),
+            phone=_text(job.get('phone')),
+            email=_text(job.get('recApplyEmail')) or _text(job.get('email')),
+            website=_text(job.get('website')),
+            experience=parse_experience(job.get('experience_required')),
+            months_experience=parse_number(_text(job.get('months_experience'))),
+            workers_requested=parse_number(_text(job.get('workers_requested'))),
+            hours_per_week=parse_number(_text(job.get('hours_per_week')), float),
+            job_duties=_text(job.get('job_duties')),
+            status=parse_status(job.get('status')),
+            extra=extra or None,
+        )
+
+    def to_dict(self):
+        """Normalized JSON form: real nulls, ISO dates, enum values"""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['begin_date'] = _iso(self.begin_date)
+        data['end_date'] = _iso(self.end_date)
+        data['experience'] = self.experience.value if self.experience else None
+        data['status'] = self.status.value if self.status else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict"""
+        values = dict(data)
+        values['begin_date'] = date.fromisoformat(data['begin_date']) if data.get('begin_date') else None
+        values['end_date'] = date.fromisoformat(data['end_date']) if data.get('end_date') else None
+        values['experience'] = Experience(data['experience']) if data.get('experience') else None
+        values['status'] = Status(data['status']) if data.get('status') else None
+        return cls(**{name: values.get(name) for name in cls.__slots__})
+
+    def to_row(self):
+        """Positional form (field order of ROW_FIELDS), dates as ordinals"""
+        row = [getattr(self, name) for name in ROW_FIELDS]
+        row[_BEGIN_DATE] = self.begin_date.toordinal() if self.begin_date else None
+        row[_END_DATE] = self.end_date.toordinal() if self.end_date else None
+        row[_EXPERIENCE] = self.experience.value if self.experience else None
+        row[_STATUS] = self.status.value if self.status else None
+        return row
+
+    @classmethod
+    def from_row(cls, row):
+        row = list(row)
+        for index, parse in ((_BEGIN_DATE, date.fromordinal), (_END_DATE, date.fromordinal),
+                             (_EXPERIENCE, Experience), (_STATUS, Status)):
+            if row[index] is not None:
+                row[index] = parse(row[index])
+        return cls(*row)
+
+    def __eq__(self, other):
+        if not isinstance(other, JobRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"JobRecord({self.case_number!r}, {self.title!r}, wage={self.wage!r}, state={self.state!r})"
+
+
+def iter_job_records(filename, columns=None):
+    """Stream any snapshot (JSON, JSONL, Parquet) as JobRecords"""
+    for job in iter_records(filename, columns):
+        yield JobRecord.from_scraped(job)
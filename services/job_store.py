@@ -0,0 +1,525 @@
+"""SQLite store of every job record, keyed on caseNumber.
+
+Each scraper writes through an upsert: the stored record is merged with
+the new one (so a listing record and a case-number record of the same
+job add up), typed copies of the filter fields are indexed (state,
+category, experience_required, begin_date, status, plus wage and title)
+and every change is kept as a version tagged with the run that produced
+it. The database runs in WAL mode; StoreWriter batches the upserts in a
+background thread so the scraping loop never waits on the disk.
+
+    python services/job_store.py import backup/jobs_*.json   # load old snapshots
+    python services/job_store.py show H-300-25181-139734      # everything known about a case
+    python services/job_store.py stats
+
+Titles, companies and job duties also go into an FTS5 full-text index
+(porter stemming) kept up to date by the same upserts, so keyword
+searches are ranked index lookups instead of substring scans:
+
+    python services/job_store.py search 'forklift OR "hand harvest"'
+    python services/job_store.py search 'tobacco NOT title:supervisor' --limit 50
+"""
+from job_record import JobRecord, parse_experience
+from snapshot_store import iter_records, open_snapshot_writer
+from datetime import date, datetime
+import argparse
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+
+# Fields that change on every run without the job changing
+VOLATILE_KEYS = {'job_index', 'extracted_at', 'extraction_index', 'duplicate_group'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scraper TEXT NOT NULL,
+    source TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    records INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    case_number TEXT PRIMARY KEY,
+    title TEXT,
+    company TEXT,
+    state TEXT,
+    wage REAL,
+    begin_date TEXT,
+    end_date TEXT,
+    experience_required TEXT,
+    status TEXT,
+    category TEXT,
+    record_hash BLOB NOT NULL,
+    data TEXT NOT NULL,
+    first_run INTEGER NOT NULL REFERENCES runs(run_id),
+    last_run INTEGER NOT NULL REFERENCES runs(run_id),
+    changed_run INTEGER NOT NULL REFERENCES runs(run_id)
+);
+CREATE TABLE IF NOT EXISTS job_versions (
+    case_number TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    record_hash BLOB NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (case_number, run_id)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state);
+CREATE INDEX IF NOT EXISTS jobs_category ON jobs(category);
+CREATE INDEX IF NOT EXISTS jobs_experience ON jobs(experience_required);
+CREATE INDEX IF NOT EXISTS jobs_begin_date ON jobs(begin_date);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS jobs_title ON jobs(title);
+CREATE INDEX IF NOT EXISTS jobs_wage ON jobs(wage);
+"""
+
+# Full-text index; rowid is the rowid of the job in `jobs`
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, company, job_duties, tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+SCHEMA_VERSION = 2
+
+# bm25 column weights: a match in the title counts more than one in the duties
+SEARCH_WEIGHTS = (5.0, 1.0, 1.0)
+
+UPSERT_JOB = """
+INSERT INTO jobs (case_number, title, company, state, wage, begin_date, end_date, experience_required,
+                  status, category, record_hash, data, first_run, last_run, changed_run)
+VALUES (:case_number, :title, :company, :state, :wage, :begin_date, :end_date, :experience_required,
+        :status, :category, :record_hash, :data, :run_id, :run_id, :run_id)
+ON CONFLICT(case_number) DO UPDATE SET
+    title = excluded.title, company = excluded.company, state = excluded.state, wage = excluded.wage,
+    begin_date = excluded.begin_date, end_date = excluded.end_date,
+    experience_required = excluded.experience_required, status = excluded.status,
+    category = excluded.category, data = excluded.data, record_hash = excluded.record_hash,
+    last_run = excluded.last_run,
+    changed_run = CASE WHEN jobs.record_hash = excluded.record_hash THEN jobs.changed_run ELSE excluded.changed_run END
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def record_hash(record):
+    """Hash of the record without its volatile fields"""
+    stable = {key: value for key, value in record.items() if key not in VOLATILE_KEYS}
+    text = json.dumps(stable, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def _row(record, run_id):
+    """Column values of a (merged) record"""
+    job = JobRecord.from_scraped(record)
+    categories = record.get('categories')
+    category = record.get('category') or (categories[0] if isinstance(categories, list) and categories else None)
+    return {
+        'case_number': job.case_number,
+        'title': job.title,
+        'company': job.company,
+        'state': job.state,
+        'wage': job.wage,
+        'begin_date': job.begin_date.isoformat() if job.begin_date else None,
+        'end_date': job.end_date.isoformat() if job.end_date else None,
+        'experience_required': job.experience.value if job.experience else None,
+        # Records scraped before status existed only come from active listings
+        'status': job.status.value if job.status else 'ACTIVE',
+        'category': category,
+        'record_hash': record_hash(record),
+        'data': json.dumps(record, ensure_ascii=False),
+        'run_id': run_id,
+        'job_duties': job.job_duties,
+    }
+
+
+def _as_list(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [part.strip() for part in value.split('|') if part.strip()]
+    return list(value)
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+class JobStore:
+    """jobs / job_versions / runs tables in one SQLite file (safe to share between threads)"""
+
+    def __init__(self, filename='data/jobs.sqlite'):
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+        self.has_search = self._create_search_index()
+
+    def _create_search_index(self):
+        """Create the FTS5 table (filled from `jobs` on first use); False without FTS5"""
+        try:
+            self.connection.executescript(SEARCH_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self.rebuild_search_index()
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return True
+
+    def rebuild_search_index(self):
+        """Re-index every job (after an import from an older store, or to compact the index)"""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM jobs_fts")
+            for rowid, data in self.connection.execute("SELECT rowid, data FROM jobs").fetchall():
+                job = JobRecord.from_scraped(json.loads(data))
+                self._index(rowid, job.title, job.company, job.job_duties)
+
+    def _index(self, rowid, title, company, job_duties):
+        self.connection.execute("DELETE FROM jobs_fts WHERE rowid = ?", (rowid,))
+        self.connection.execute(
+            "INSERT INTO jobs_fts (rowid, title, company, job_duties) VALUES (?, ?, ?, ?)",
+            (rowid, title, company, job_duties)
+        )
+
+    def start_run(self, scraper, source=None):
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (scraper, source, started_at) VALUES (?, ?, ?)", (scraper, source, _now())
+            )
+            self.connection.commit()
+            return cursor.lastrowid
+
+    def finish_run(self, run_id, records):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE runs SET finished_at = ?, records = ? WHERE run_id = ?", (_now(), records, run_id)
+            )
+            self.connection.commit()
+
+    def upsert_many(self, records, run_id):
+        """Merge `records` into the store in one transaction; returns how many were new or changed"""
+        records = [record for record in records if record.get('caseNumber') not in (None, '', 'N/A')]
+        if not records:
+            return 0
+        with self.lock, self.connection:
+            stored = {}
+            cases = list(dict.fromkeys(record['caseNumber'] for record in records))
+            for start in range(0, len(cases), 500):
+                chunk = cases[start:start + 500]
+                rows = self.connection.execute(
+                    f"SELECT case_number, data, record_hash FROM jobs WHERE case_number IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                stored.update((case, (json.loads(data), stored_hash)) for case, data, stored_hash in rows)
+
+            # Later records of the same case in the batch win, merged like across runs
+            current = {}
+            for record in records:
+                case = record['caseNumber']
+                base = current.get(case) or stored.get(case, ({}, None))[0]
+                current[case] = {**base, **record}
+
+            changed = 0
+            for case, record in current.items():
+                row = _row(record, run_id)
+                if case in stored and stored[case][1] == row['record_hash']:
+                    self.connection.execute(
+                        "UPDATE jobs SET last_run = ? WHERE case_number = ?", (run_id, case)
+                    )
+                    continue
+                changed += 1
+                self.connection.execute(UPSERT_JOB, row)
+                if self.has_search:
+                    rowid = self.connection.execute(
+                        "SELECT rowid FROM jobs WHERE case_number = ?", (case,)
+                    ).fetchone()[0]
+                    self._index(rowid, row['title'], row['company'], row['job_duties'])
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO job_versions (case_number, run_id, record_hash, data) VALUES (?, ?, ?, ?)",
+                    (case, run_id, row['record_hash'], row['data'])
+                )
+            return changed
+
+    def writer(self, scraper, source=None, batch_size=500, flush_interval=1.0):
+        """Background StoreWriter for one run of `scraper`"""
+        return StoreWriter(self.filename, scraper, source, batch_size, flush_interval)
+
+    def import_snapshot(self, filename, scraper='import', batch_size=1000):
+        """Load a snapshot file (any format) as one run; returns the number of records"""
+        run_id = self.start_run(scraper, filename)
+        batch = []
+        count = 0
+        for record in iter_records(filename):
+            batch.append(record)
+            count += 1
+            if len(batch) >= batch_size:
+                self.upsert_many(batch, run_id)
+                batch = []
+        self.upsert_many(batch, run_id)
+        self.finish_run(run_id, count)
+        return count
+
+    def get(self, case_number):
+        """Current record of a case with its provenance and versions, or None"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT data, first_run, last_run, changed_run FROM jobs WHERE case_number = ?", (case_number,)
+            ).fetchone()
+            if row is None:
+                return None
+            versions = self.connection.execute(
+                "SELECT v.run_id, r.scraper, r.source, r.started_at, v.data FROM job_versions v"
+                " JOIN runs r ON r.run_id = v.run_id WHERE v.case_number = ? ORDER BY v.run_id",
+                (case_number,)
+            ).fetchall()
+        return {
+            'record': json.loads(row[0]),
+            'first_run': row[1],
+            'last_run': row[2],
+            'changed_run': row[3],
+            'versions': [
+                {'run_id': run_id, 'scraper': scraper, 'source': source, 'started_at': started_at,
+                 'record': json.loads(data)}
+                for run_id, scraper, source, started_at, data in versions
+            ],
+        }
+
+    def query(self, state=None, category=None, experience=None, status=None, titles=None,
+              begin_from=None, begin_to=None, wage_min=None, wage_max=None):
+        """Records matching every given filter, through the column indexes.
+
+        state, category, status and titles take one value, a list or an
+        'A|B' string; experience is yes/no; begin_* are dates or ISO strings.
+        """
+        clauses, params = self._filter_clauses(state, category, experience, status, titles,
+                                               begin_from, begin_to, wage_min, wage_max)
+        sql = "SELECT data FROM jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY rowid"
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    @staticmethod
+    def _filter_clauses(state=None, category=None, experience=None, status=None, titles=None,
+                        begin_from=None, begin_to=None, wage_min=None, wage_max=None):
+        clauses, params = [], []
+        for column, values in (('state', _as_list(state)), ('category', _as_list(category)),
+                               ('status', _as_list(status)), ('title', _as_list(titles))):
+            if values is not None:
+                if column in ('state', 'status'):
+                    values = [value.upper() for value in values]
+                clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        if experience is not None:
+            value = parse_experience(experience)
+            if value is None:
+                raise ValueError(f"Unknown experience {experience!r}")
+            clauses.append("experience_required = ?")
+            params.append(value.value)
+        for condition, value in (("begin_date >= ?", _iso(begin_from)), ("begin_date <= ?", _iso(begin_to)),
+                                 ("wage >= ?", wage_min), ("wage <= ?", wage_max)):
+            if value is not None:
+                clauses.append(condition)
+                params.append(value)
+        return clauses, params
+
+    def search(self, text, limit=20, **filters):
+        """Full-text search, best matches first.
+
+        `text` uses the FTS5 syntax: words (stemmed: "harvesting" finds
+        "harvest"), "exact phrases", AND / OR / NOT, prefix*, NEAR(a b, 5)
+        and column filters like title:welder. Keyword filters are the ones
+        of query(). Returns dicts with caseNumber, jobTitle, company, score
+        and a highlighted snippet of the duties.
+        """
+        if not self.has_search:
+            raise RuntimeError("This SQLite build has no FTS5; full-text search is unavailable")
+        clauses, params = self._filter_clauses(**filters)
+        sql = (
+            "SELECT j.case_number, j.title, j.company, bm25(jobs_fts, ?, ?, ?) AS score,"
+            " snippet(jobs_fts, 2, '[', ']', '…', 16)"
+            " FROM jobs_fts JOIN jobs j ON j.rowid = jobs_fts.rowid WHERE jobs_fts MATCH ?"
+        )
+        sql += ''.join(f" AND j.{clause}" for clause in clauses)
+        sql += " ORDER BY score LIMIT ?"
+        try:
+            with self.lock:
+                rows = self.connection.execute(sql, [*SEARCH_WEIGHTS, text, *params, limit]).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search '{text}': {e}")
+        # bm25 is lower for better matches; flip it so higher means more relevant
+        return [
+            {'caseNumber': case, 'jobTitle': title, 'company': company, 'score': round(-score, 3), 'snippet': snippet}
+            for case, title, company, score, snippet in rows
+        ]
+
+    def export_query(self, filename, indent=2, **filters):
+        """Write the records of query(**filters) to a snapshot file; returns the count"""
+        writer = open_snapshot_writer(filename, indent=indent)
+        count = 0
+        try:
+            for record in self.query(**filters):
+                writer.append(record)
+                count += 1
+        finally:
+            writer.close()
+        return count
+
+    def stats(self):
+        with self.lock:
+            jobs = self.connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            versions = self.connection.execute("SELECT COUNT(*) FROM job_versions").fetchone()[0]
+            runs = self.connection.execute(
+                "SELECT run_id, scraper, source, started_at, finished_at, records FROM runs ORDER BY run_id"
+            ).fetchall()
+            by_status = dict(self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {'jobs': jobs, 'versions': versions, 'by_status': by_status, 'runs': runs}
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class StoreWriter:
+    """append(record) / close() sink that upserts into the store from a background thread.
+
+    Records are committed in batches of `batch_size`, or every
+    `flush_interval` seconds when they come in slowly. The run is opened
+    in the background thread and closed by close(). The store is a
+    secondary output: if the writer fails, the error is printed once,
+    later records are dropped and close() reports how many were lost.
+    """
+
+    def __init__(self, filename, scraper, source=None, batch_size=500, flush_interval=1.0):
+        self.filename = filename
+        self.scraper = scraper
+        self.source = source
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.records = queue.Queue()
+        self.count = 0
+        self.dropped = 0
+        self.written = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def append(self, record):
+        if self.error:
+            self.dropped += 1
+            return
+        self.count += 1
+        self.records.put(dict(record))
+
+    def _run(self):
+        store = None
+        batch = []
+        try:
+            store = JobStore(self.filename)
+            run_id = store.start_run(self.scraper, self.source)
+            finished = False
+            while not finished:
+                try:
+                    record = self.records.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    record = False
+                if record is None:
+                    finished = True
+                elif record:
+                    batch.append(record)
+                if batch and (finished or record is False or len(batch) >= self.batch_size):
+                    store.upsert_many(batch, run_id)
+                    self.written += len(batch)
+                    batch = []
+            store.finish_run(run_id, self.written)
+        except Exception as e:
+            self.error = e
+            print(f"✗ Job store writer stopped, records are no longer stored in {self.filename}: {e}")
+        finally:
+            if store is not None:
+                store.close()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.records.put(None)
+            self.thread.join()
+        if self.error:
+            lost = self.count + self.dropped - self.written
+            print(f"⚠️ Job store writer failed ({self.error}); {lost} record(s) not stored")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_to_store(jobs_data, scraper_name, filename='data/jobs.sqlite'):
+    """Upsert a scraper's final records as one run of `scraper_name`"""
+    with StoreWriter(filename, scraper_name) as sink:
+        for job in jobs_data:
+            sink.append(job)
+    if not sink.error:
+        print(f"✓ {sink.written} jobs stored in {filename}")
+
+
+def print_stats(store):
+    stats = store.stats()
+    print(f"📦 {stats['jobs']} jobs, {stats['versions']} versions, by status: {stats['by_status']}")
+    for run_id, scraper, source, started_at, finished_at, records in stats['runs']:
+        print(f"   run {run_id}: {scraper} {source or ''} {started_at} -> {finished_at or 'unfinished'}, {records} records")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite job store")
+    parser.add_argument('--db', default='data/jobs.sqlite')
+    commands = parser.add_subparsers(dest='command', required=True)
+    load = commands.add_parser('import', help="load snapshot files, one run each")
+    load.add_argument('files', nargs='+')
+    load.add_argument('--scraper', default='import')
+    show = commands.add_parser('show', help="current record, provenance and versions of a case")
+    show.add_argument('case_number')
+    commands.add_parser('stats', help="jobs, versions and runs")
+    search = commands.add_parser('search', help="ranked full-text search over titles, companies and duties")
+    search.add_argument('text', help="FTS5 query: words, \"phrases\", AND/OR/NOT, prefix*, title:word")
+    search.add_argument('--limit', type=int, default=20)
+    search.add_argument('--state', default=None, help="e.g. KY|TN")
+    args = parser.parse_args()
+
+    store = JobStore(args.db)
+    try:
+        if args.command == 'import':
+            for filename in args.files:
+                print(f"✓ {filename}: {store.import_snapshot(filename, args.scraper)} records")
+        elif args.command == 'search':
+            try:
+                hits = store.search(args.text, limit=args.limit, state=args.state)
+            except (ValueError, RuntimeError) as e:
+                print(f"✗ {e}")
+                return
+            for hit in hits:
+                print(f"{hit['score']:>7.2f}  {hit['caseNumber']}  {hit['jobTitle']} ({hit['company']})")
+                print(f"         {hit['snippet']}")
+        elif args.command == 'show':
+            known = store.get(args.case_number)
+            if known is None:
+                print(f"✗ {args.case_number} is not in {args.db}")
+            else:
+                print(json.dumps(known, indent=2, ensure_ascii=False))
+        else:
+            print_stats(store)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,18 @@
+import argparse
 import json
+import hashlib
+import os
+from snapshot_store import read_snapshot, iter_records, open_snapshot_writer
+from job_record import JobRecord
 
-def carregar_json(caminho):
-    with open(caminho, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# Campos cuja mudança faz um registro contar como "alterado"
+CAMPOS_MUDANCA = ('salary', 'begin_date', 'end_date', 'status', 'workers_requested')
+# Os mesmos campos já normalizados no JobRecord (valor por hora, datas, enum)
+ATRIBUTOS_MUDANCA = ('wage', 'begin_date', 'end_date', 'status', 'workers_requested')
+
+def carregar_json(caminho, colunas=None):
+    # Aceita snapshots JSON, JSONL ou Parquet; `colunas` limita os campos lidos
+    return read_snapshot(caminho, colunas)
 
 def salvar_json(dados, caminho):
     with open(caminho, 'w', encoding='utf-8') as f:
@@ -14,21 +24,105 @@ def extrair_novos_registros(ontem, hoje):
 
     # Filtrar registros novos (que estão em hoje mas não estavam ontem)
     novos = [item for item in hoje if item["caseNumber"] not in cases_ontem]
-    
+
     return novos
 
-def main():
-    arquivo_ontem = 'backup/jobs_2025-08-13.json'
-    arquivo_hoje = 'backup/jobs_2025-08-18.json'
-    arquivo_novos = 'data/compared.json'
+def hash_registro(item):
+    # Hash compacto (8 bytes) só dos campos que importam para "alterado",
+    # normalizados: "$15.00 per hour" e "$15 per hour" ou "N/A" e ausente não contam como mudança
+    registro = JobRecord.from_scraped(item)
+    valores = '\x1f'.join(str(getattr(registro, atributo)) for atributo in ATRIBUTOS_MUDANCA)
+    return hashlib.blake2b(valores.encode('utf-8'), digest_size=8).digest()
+
+def indexar_snapshot(caminho):
+    # caseNumber -> hash, lendo o snapshot em streaming (memória proporcional ao número de chaves)
+    colunas = ('caseNumber',) + CAMPOS_MUDANCA
+    indice = {}
+    for item in iter_records(caminho, list(colunas)):
+        indice.setdefault(item.get("caseNumber"), hash_registro(item))
+    return indice
+
+def comparar_snapshots(arquivo_ontem, arquivo_hoje, prefixo_saida, indice_ontem=None):
+    """Diff em streaming: grava novos, removidos e alterados e devolve (contagens, índice de hoje).
+
+    Só o mapa caseNumber -> hash de ontem fica em memória; o índice de hoje
+    devolvido pode ser reaproveitado como `indice_ontem` do próximo par.
+    """
+    if indice_ontem is None:
+        indice_ontem = indexar_snapshot(arquivo_ontem)
+
+    saidas = {tipo: f"{prefixo_saida}{sufixo}" for tipo, sufixo in
+              (('novos', '.json'), ('removidos', '_removidos.json'), ('alterados', '_alterados.json'))}
+    escritores = {tipo: open_snapshot_writer(caminho) for tipo, caminho in saidas.items()}
+    contagens = dict.fromkeys(saidas, 0)
+    indice_hoje = {}
 
-    ontem = carregar_json(arquivo_ontem)
-    hoje = carregar_json(arquivo_hoje)
+    try:
+        for item in iter_records(arquivo_hoje):
+            case = item.get("caseNumber")
+            if case in indice_hoje:
+                continue  # caseNumber repetido no mesmo snapshot
+            indice_hoje[case] = hash_registro(item)
 
-    novos = extrair_novos_registros(ontem, hoje)
-    salvar_json(novos, arquivo_novos)
+            hash_antigo = indice_ontem.get(case)
+            if hash_antigo is None:
+                tipo = 'novos'
+            elif hash_antigo != indice_hoje[case]:
+                tipo = 'alterados'
+            else:
+                continue
+            escritores[tipo].append(item)
+            contagens[tipo] += 1
 
-    print(f"{len(novos)} novos registros salvos em {arquivo_novos}")
+        # Removidos: segunda passada em ontem, só para os registros que sumiram
+        removidos = {case for case in indice_ontem if case not in indice_hoje}
+        if removidos:
+            for item in iter_records(arquivo_ontem):
+                case = item.get("caseNumber")
+                if case in removidos:
+                    removidos.discard(case)
+                    escritores['removidos'].append(item)
+                    contagens['removidos'] += 1
+    finally:
+        for escritor in escritores.values():
+            escritor.close()
+
+    return contagens, indice_hoje
+
+def comparar_serie(arquivos, pasta_saida='data'):
+    # Compara cada snapshot com o anterior, indexando cada arquivo uma única vez
+    indice = None
+    for arquivo_ontem, arquivo_hoje in zip(arquivos, arquivos[1:]):
+        nome = os.path.splitext(os.path.basename(arquivo_hoje))[0]
+        prefixo = os.path.join(pasta_saida, f"compared_{nome}")
+        contagens, indice = comparar_snapshots(arquivo_ontem, arquivo_hoje, prefixo, indice)
+        print(f"{arquivo_ontem} -> {arquivo_hoje}: {contagens['novos']} novos, "
+              f"{contagens['removidos']} removidos, {contagens['alterados']} alterados ({prefixo}*.json)")
+
+def comparar(arquivos, prefixo_saida='data/compared', pasta_saida='data'):
+    # Dois snapshots: grava em prefixo_saida*.json; três ou mais: compara a série em pasta_saida
+    if len(arquivos) > 2:
+        comparar_serie(arquivos, pasta_saida)
+        return
+
+    arquivo_ontem, arquivo_hoje = arquivos
+    contagens, _ = comparar_snapshots(arquivo_ontem, arquivo_hoje, prefixo_saida)
+
+    print(f"{contagens['novos']} novos registros salvos em {prefixo_saida}.json")
+    print(f"{contagens['removidos']} removidos salvos em {prefixo_saida}_removidos.json")
+    print(f"{contagens['alterados']} alterados salvos em {prefixo_saida}_alterados.json")
+
+def main():
+    # python services/json_compare.py backup/jobs_2025-08-13.json backup/jobs_2025-08-18.json [--saida data/compared]
+    parser = argparse.ArgumentParser(description="Compara snapshots: novos, removidos e alterados")
+    parser.add_argument('arquivos', nargs='+', metavar='snapshot',
+                        help="snapshot de ontem e de hoje; com três ou mais, compara a série em ordem")
+    parser.add_argument('--saida', default='data/compared', help="prefixo dos arquivos de saída (dois snapshots)")
+    parser.add_argument('--pasta', default='data', help="pasta dos arquivos compared_<snapshot>*.json (série)")
+    args = parser.parse_args()
+    if len(args.arquivos) < 2:
+        parser.error("informe pelo menos dois snapshots (ontem e hoje)")
+    comparar(args.arquivos, args.saida, args.pasta)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,96 @@
+from checkpoint import atomic_open
+import json
+import os
+
+
+class JsonlWriter:
+    """Append-only JSONL writer that fsyncs every `fsync_every` records"""
+
+    def __init__(self, filename, fsync_every=50):
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        self.filename = filename
+        self.fsync_every = fsync_every
+        self.pending = 0
+        drop_torn_line(filename)
+        self.file = open(filename, 'a', encoding='utf-8')
+
+    def append(self, record):
+        """Write one record as a single line"""
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        # Flush to the OS on every record so a crashed process loses nothing;
+        # the (slower) fsync to disk only happens once per batch
+        self.file.flush()
+        self.pending += 1
+        if self.pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        """Force pending records to disk"""
+        if self.pending:
+            os.fsync(self.file.fileno())
+            self.pending = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def drop_torn_line(filename):
+    """Truncate a partial last line left by a crash so appends start clean"""
+    if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+        return
+
+    with open(filename, 'rb+') as file:
+        file.seek(-1, os.SEEK_END)
+        if file.read(1) == b'\n':
+            return
+
+        # Scan backwards for the last newline and cut everything after it
+        position = file.seek(0, os.SEEK_END)
+        while position > 0:
+            step = min(8192, position)
+            position -= step
+            file.seek(position)
+            newline = file.read(step).rfind(b'\n')
+            if newline != -1:
+                file.truncate(position + newline + 1)
+                return
+        file.truncate(0)
+
+
+def iter_jsonl(filename):
+    """Yield records from a JSONL file, skipping a torn last line"""
+    if not os.path.exists(filename):
+        return
+    with open(filename, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Only the final line can be partial (crash mid-write)
+                print(f"Note: Skipping incomplete line in {filename}")
+
+
+def compact_jsonl(jsonl_filename, json_filename, backup_filename=None):
+    """Turn a JSONL file into the pretty-printed JSON array (and backup) once.
+
+    Each target is replaced atomically, so a crash keeps the previous version.
+    """
+    records = list(iter_jsonl(jsonl_filename))
+
+    targets = [json_filename] + ([backup_filename] if backup_filename else [])
+    for target in targets:
+        with atomic_open(target) as file:
+            json.dump(records, file, indent=2, ensure_ascii=False)
+
+    return records
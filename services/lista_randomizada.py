@@ -1,172 +1,93 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from datetime import datetime
-import json
-import time
 import os
-import pandas as pd
+from jsonl_store import JsonlWriter, iter_jsonl, compact_jsonl
+from checkpoint import Checkpoint, RESUME_POLICIES
+from job_store import save_to_store
+from browser_pool import BrowserPool
+from cdp_engine import TabCrawler
+from driver_manager import DriverManager
+from http_backend import HttpJobClient, parse_job_page
+from page_cache import PageCache
+from html_archive import HtmlArchive
+from job_fields import build_job_data
+from dom_extractor import extract_job_fields
+from snapshot_store import write_snapshot, snapshot_filename
+from metrics import timed, print_latency_report, write_metrics
 
 class SeasonalJobsSimpleScraper:
-    def __init__(self, headless=True):
-        self.setup_driver(headless)
-        self.base_url = "https://seasonaljobs.dol.gov/jobs/"
+    def __init__(self, headless=True, use_http=False, cache=None, archive=None,
+                 base_url="https://seasonaljobs.dol.gov/jobs/"):
+        self.headless = headless
+        self.use_http = use_http
+        self.cache = cache
+        # Optional HtmlArchive: keeps #job-detail of every page for html_archive.py reparse
+        self.archive = archive
+        self.base_url = base_url
+        # With the HTTP backend the browser is only started when a page needs it
+        self.http = HttpJobClient(self.base_url, cache=cache, archive=archive) if use_http else None
+        # Light Chrome, recycled every few hundred pages and restarted if it crashes
+        self.drivers = DriverManager(
+            headless, user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        )
+        if not use_http:
+            self.drivers.start()
+        self.jsonl_filename = 'data/jobs_data.jsonl'
+        self.pool_progress_filename = 'data/pool_progress.jsonl'
+        self.dead_letter_filename = 'data/dead_letter.jsonl'
+        self.checkpoint_filename = 'data/checkpoint.json'
+        # Shared AdaptiveRateLimiter for the pool (default: start at 1 request/s)
+        self.limiter = None
 
-    def setup_driver(self, headless):
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 15)
+    @property
+    def driver(self):
+        return self.drivers.driver
+
+    @property
+    def wait(self):
+        return self.drivers.wait(15)
 
     def extract_job_data(self, case_number):
         """Extract data from a single job page"""
+        # A fresh cached page needs no network at all (the HTTP client checks it itself)
+        if self.cache and not self.http:
+            cached = self.cache.get(case_number)
+            raw = parse_job_page(cached.html, keep_html=True) if cached and cached.is_fresh(self.cache.ttl) else None
+            if raw:
+                if self.archive:
+                    self.archive.save(case_number, raw['html'])
+                print(f"✓ Extracted {case_number} from cache")
+                return build_job_data(raw, case_number)
+
+        # Fast path: plain HTTP + HTML parser, Selenium is the fallback
+        if self.http:
+            job_data = self.http.extract_job_data(case_number)
+            if job_data:
+                print(f"✓ Successfully extracted data for {case_number} (HTTP)")
+                return job_data
+
         url = f"{self.base_url}{case_number}"
         print(f"Accessing: {url}")
         
         try:
-            self.driver.get(url)
-            time.sleep(2)
+            self.drivers.get(url)
             
             # Wait for the job detail section to load
-            self.wait.until(EC.presence_of_element_located((By.ID, "job-detail")))
-            
-            job_data = {'caseNumber': case_number}
-            
-            # Job Title
-            try:
-                job_data['jobTitle'] = self.driver.find_element(
-                    By.CSS_SELECTOR, "#job-detail h2"
-                ).text.strip()
-            except NoSuchElementException:
-                job_data['jobTitle'] = "N/A"
-            
-            # Company Name
-            try:
-                company_elements = self.driver.find_elements(
-                    By.CSS_SELECTOR, "#job-detail p.text-gray-500"
-                )
-                job_data['company'] = company_elements[0].text.strip() if company_elements else "N/A"
-            except (NoSuchElementException, IndexError):
-                job_data['company'] = "N/A"
-            
-            # Location
-            try:
-                location_elements = self.driver.find_elements(
-                    By.CSS_SELECTOR, "#job-detail p.text-gray-500"
-                )
-                job_data['location'] = location_elements[1].text.strip() if len(location_elements) > 1 else "N/A"
-            except (NoSuchElementException, IndexError):
-                job_data['location'] = "N/A"
-            
-            # Salary
-            try:
-                salary_element = self.driver.find_element(
-                    By.XPATH, "//*[contains(text(), 'per hour')]"
-                )
-                job_data['salary'] = salary_element.text.strip()
-            except NoSuchElementException:
-                job_data['salary'] = "N/A"
+            with timed('detail_ready'):
+                self.wait.until(EC.presence_of_element_located((By.ID, "job-detail")))
             
-            # Begin Date
-            try:
-                begin_date = self.driver.find_element(
-                    By.XPATH, "//time[contains(text(), 'Begin date:')]"
-                )
-                job_data['begin_date'] = begin_date.text.replace('Begin date: ', '').strip()
-            except NoSuchElementException:
-                job_data['begin_date'] = "N/A"
+            # Every field in a single execute_script round-trip
+            with timed('extract_fields'):
+                raw = extract_job_fields(self.driver, include_html=self.archive is not None)
+            job_data = build_job_data(raw, case_number)
+            if self.archive:
+                self.archive.save(case_number, raw.get('html'))
             
-            # End Date
-            try:
-                end_date = self.driver.find_element(
-                    By.XPATH, "//time[contains(text(), 'End date:')]"
-                )
-                job_data['end_date'] = end_date.text.replace('End date: ', '').strip()
-            except NoSuchElementException:
-                job_data['end_date'] = "N/A"
-            
-            # Phone
-            try:
-                job_data['phone'] = self.driver.find_element(
-                    By.CSS_SELECTOR, "a[href^='tel:']"
-                ).text.strip()
-            except NoSuchElementException:
-                job_data['phone'] = "N/A"
-            
-            # Email
-            try:
-                job_data['email'] = self.driver.find_element(
-                    By.CSS_SELECTOR, "a[href^='mailto:']"
-                ).text.strip()
-            except NoSuchElementException:
-                job_data['email'] = "N/A"
-            
-            # Website
-            try:
-                website_elements = self.driver.find_elements(
-                    By.XPATH, "//dt[contains(text(), 'Web address to Apply:')]/following-sibling::dd[1]//a"
-                )
-                job_data['website'] = website_elements[0].get_attribute('href') if website_elements else "N/A"
-            except (NoSuchElementException, IndexError):
-                job_data['website'] = "N/A"
-            
-            # Extract data from dt/dd pairs
-            dt_dd_mappings = {
-                'Experience Required:': 'experience_required',
-                'Months of Experience Required:': 'months_experience',
-                'Job Duties:': 'job_duties',
-                'Number of Workers Requested:': 'workers_requested',
-                'Number of Hours Per Week:': 'hours_per_week',
-                'Work Schedule (Start/End time):': 'work_schedule',
-                'Special Requirements:': 'special_requirements',
-                'Job Classification:': 'job_classification',
-                'Full Time:': 'full_time',
-                'Multiple Worksites:': 'multiple_worksites',
-                'Additional Wage Information:': 'additional_wage_info'
-            }
-            
-            try:
-                dt_elements = self.driver.find_elements(By.TAG_NAME, "dt")
-                for dt in dt_elements:
-                    dt_text = dt.text.strip()
-                    if dt_text in dt_dd_mappings:
-                        try:
-                            dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                            field_name = dt_dd_mappings[dt_text]
-                            value = dd_element.text.strip()
-                            
-                            # Truncate job duties if too long
-                            if field_name == 'job_duties' and len(value) > 500:
-                                value = value[:500] + "..."
-                            
-                            job_data[field_name] = value
-                        except NoSuchElementException:
-                            job_data[dt_dd_mappings[dt_text]] = "N/A"
-            except Exception as e:
-                print(f"Error extracting dt/dd data: {e}")
-            
-            # Set default values for fields that weren't found
-            for field in dt_dd_mappings.values():
-                if field not in job_data:
-                    job_data[field] = "N/A"
-            
-            # Job Status (INACTIVE/ACTIVE)
-            try:
-                status_element = self.driver.find_element(
-                    By.CSS_SELECTOR, "span.text-red-700"
-                )
-                job_data['status'] = status_element.text.strip()
-            except NoSuchElementException:
-                job_data['status'] = "ACTIVE"
+            # Keep the rendered page for the next run and for offline re-extraction
+            if self.cache:
+                self.cache.put(case_number, self.driver.page_source, final=job_data['status'] == 'INACTIVE')
             
             print(f"✓ Successfully extracted data for {case_number}")
             return job_data
@@ -178,85 +99,118 @@ class SeasonalJobsSimpleScraper:
             print(f"✗ Error extracting data for {case_number}: {e}")
             return None
 
-    def scrape_multiple_jobs(self, case_numbers, start_index=0):
-        """Scrape multiple jobs from a list of case numbers"""
-        all_jobs_data = []
-        
-        # Load existing data if any
-        existing_data = self.load_existing_data()
-        if existing_data:
-            all_jobs_data = existing_data
-            print(f"✓ Loaded {len(existing_data)} existing jobs from file")
-        
-        total = len(case_numbers)
-        
-        for i in range(start_index, total):
-            case_number = case_numbers[i]
-            print(f"\nProcessing {i+1}/{total}: {case_number}")
-            
-            job_data = self.extract_job_data(case_number)
-            
-            if job_data:
-                all_jobs_data.append(job_data)
-                # Save after each successful scrape
-                self.save_to_json(all_jobs_data)
-                # Save progress index
-                self.save_progress(i + 1)
-            
-            # Small delay between requests to be respectful
-            time.sleep(1)
-        
-        return all_jobs_data
+    def scrape_multiple_jobs(self, case_numbers, workers=1, checkpoint=None, retry_failed=True, tabs=0):
+        """Scrape multiple jobs from a list of case numbers.
+
+        With a Checkpoint, cases it has completed are skipped (and failed
+        ones too unless retry_failed) and every outcome is recorded in it.
+        With `tabs` (and no HTTP backend) a single Chrome loads that many
+        pages at once over DevTools instead of `workers` browsers.
+        """
+        pending = checkpoint.pending(case_numbers, retry_failed) if checkpoint else list(case_numbers)
+        total = len(pending)
+        if checkpoint and total < len(case_numbers):
+            print(f"📍 Resuming: {len(case_numbers) - total} cases already done, {total} to go")
+
+        # Same pacing, retries and dead letter as the pool, in one browser
+        if tabs and not self.use_http:
+            crawler = TabCrawler(tabs, headless=self.headless, base_url=self.base_url, limiter=self.limiter,
+                                 dead_letter_file=self.dead_letter_filename, archive=self.archive,
+                                 drivers=self.drivers)
+            try:
+                return self._collect(crawler.imap(pending), total, checkpoint)
+            finally:
+                crawler.close()
+
+        # This scraper is worker 1; extra workers get their own browser.
+        # The pool starts at one request per second globally and adapts to the
+        # site's latency and errors; failed cases are retried with backoff and
+        # end up in data/dead_letter.jsonl when they run out of attempts.
+        pool = BrowserPool(
+            lambda: SeasonalJobsSimpleScraper(headless=self.headless, use_http=self.use_http,
+                                              cache=self.cache, archive=self.archive,
+                                              base_url=self.base_url),
+            workers=workers,
+            min_interval=1.0,
+            limiter=self.limiter,
+            primary=self,
+            progress_file=self.pool_progress_filename,
+            dead_letter_file=self.dead_letter_filename,
+        )
+        return self._collect(pool.imap(pending, lambda scraper, case: scraper.extract_job_data(case)),
+                             total, checkpoint)
 
-    def load_existing_data(self, filename='data/jobs_data.json'):
-        """Load existing scraped data if available"""
+    def _collect(self, results, total, checkpoint):
+        """Append the (index, case, job_data) results to the JSONL file and checkpoint"""
+        scraped_count = 0
         try:
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as file:
-                    return json.load(file)
-        except Exception as e:
-            print(f"Note: Could not load existing data: {e}")
-        return []
+            with JsonlWriter(self.jsonl_filename) as sink:
+                for done, (_, case_number, job_data) in enumerate(results, 1):
+                    print(f"Processed {done}/{total}: {case_number}")
 
-    def save_progress(self, index, filename='data/progress.txt'):
-        """Save the current progress index"""
+                    if job_data:
+                        # Append one line instead of re-dumping the whole dataset
+                        with timed('jsonl_append'):
+                            sink.append(job_data)
+                        scraped_count += 1
+                        # Recorded after the data line, so the checkpoint never runs ahead of it
+                        if checkpoint:
+                            checkpoint.mark_completed(case_number)
+                    elif checkpoint:
+                        checkpoint.mark_failed(case_number)
+        finally:
+            if checkpoint:
+                checkpoint.save()
+
+        return scraped_count
+
+    def load_checkpoint(self):
+        """Checkpoint of the current run, completed with every case already in the JSONL file.
+
+        The JSONL line is written before the checkpoint is saved, so a crash
+        in between only costs a re-read here, never a duplicate or a gap.
+        """
+        checkpoint = Checkpoint(self.checkpoint_filename)
         try:
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
-            with open(filename, 'w') as file:
-                file.write(str(index))
+            in_data = {job.get('caseNumber') for job in iter_jsonl(self.jsonl_filename)}
         except Exception as e:
-            print(f"Warning: Could not save progress: {e}")
+            print(f"Note: Could not load existing data: {e}")
+            in_data = set()
+        for case_number in in_data - checkpoint.completed - {None}:
+            checkpoint.mark_completed(case_number)
+        return checkpoint
 
-    def load_progress(self, filename='data/progress.txt'):
-        """Load the last saved progress index"""
-        try:
+    def reset_output(self):
+        """Discard the JSONL, checkpoint and worker progress files of a previous run"""
+        for filename in (self.jsonl_filename, self.pool_progress_filename, self.checkpoint_filename):
             if os.path.exists(filename):
-                with open(filename, 'r') as file:
-                    return int(file.read().strip())
-        except Exception as e:
-            print(f"Note: Could not load progress: {e}")
-        return 0
+                os.remove(filename)
 
-    def save_to_json(self, data, filename='data/jobs_data.json'):
-        """Save data to JSON file with backup"""
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        
+    def compact(self, backup_filename, filename='data/jobs_data.json'):
+        """Write the final JSON file and backup snapshot from the JSONL file"""
         try:
-            # Save main file
-            with open(filename, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=2, ensure_ascii=False)
-            
+            with timed('save_json'):
+                jobs_data = compact_jsonl(self.jsonl_filename, filename)
+                write_snapshot(jobs_data, backup_filename)
+            return jobs_data
         except Exception as e:
             print(f"✗ Error saving JSON: {e}")
+            return []
 
     def close(self):
-        """Close the browser"""
-        if self.driver:
-            self.driver.quit()
+        """Close the browser and HTTP connections"""
+        if self.http:
+            self.http.close()
+        self.drivers.quit()
 
 
 def read_case_numbers_from_excel(file_path, column_name='Case Number'):
     """Read case numbers from an Excel file"""
+    # pandas is only needed here, so the rest of the tooling starts without it
+    try:
+        import pandas as pd
+    except ImportError:
+        raise RuntimeError("Reading the Excel list needs pandas: pip install pandas openpyxl")
     try:
         # Read the Excel file
         df = pd.read_excel(file_path)
@@ -284,55 +238,83 @@ def read_case_numbers_from_excel(file_path, column_name='Case Number'):
         return []
 
 
-def main():
-    # Path to your Excel file
-    excel_file = "lista_randomizada_2026.xlsx"  # Change this to your file path
-    
+def main(excel_file="lista_randomizada_2026.xlsx", workers=4, tabs=0, use_http=False, resume_policy=None,
+         prometheus_file=None):
+    """Scrape every case number of the Excel list (see services/cli.py scrape cases).
+
+    excel_file: list with a 'Case Number' column
+    workers: number of parallel headless browsers
+    tabs: with use_http = False, one Chrome loading this many tabs at once (over
+        DevTools, needs websockets) instead of `workers` browsers; 0 keeps the pool
+    use_http: fetch pages over plain HTTP first, Selenium only for pages that need it
+        (experimental: the live site renders job pages client-side)
+    resume_policy: what to do with the checkpoint of an unfinished run (no prompt, so
+        it can run under cron): 'resume' skips completed cases and retries failed
+        ones, 'skip-failed' skips both, 'restart' starts from scratch; defaults to
+        the SCRAPER_RESUME env var, then 'resume'
+    prometheus_file: run metrics go to data/metrics.json; a path also writes Prometheus text
+    """
+    # Check the arguments before touching the Excel file or opening anything
+    resume_policy = resume_policy or os.environ.get('SCRAPER_RESUME', 'resume')
+    if resume_policy not in RESUME_POLICIES:
+        print(f"✗ Unknown resume policy '{resume_policy}' (use one of: {', '.join(RESUME_POLICIES)})")
+        return
+
     # Read case numbers from Excel
-    case_numbers = read_case_numbers_from_excel(excel_file, column_name='Case Number')
-    
+    try:
+        case_numbers = read_case_numbers_from_excel(excel_file, column_name='Case Number')
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return
+
     if not case_numbers:
         print("\n⚠️ No case numbers found. Please check your Excel file.")
         print("Make sure the file exists and has a column named 'Case Number'")
         return
-    
+
+    # Reuse pages from earlier runs (data/page_cache.sqlite)
+    cache = PageCache()
+    # Keep the #job-detail markup (data/html) so a schema change can be re-parsed offline
+    archive = HtmlArchive()
     scraper = None
     try:
         print("=== Starting Seasonal Jobs Scraper ===")
-        scraper = SeasonalJobsSimpleScraper(headless=True)
+        scraper = SeasonalJobsSimpleScraper(headless=True, use_http=use_http, cache=cache, archive=archive)
         
-        # Check if there's a saved progress
-        start_index = scraper.load_progress()
+        if resume_policy == 'restart':
+            scraper.reset_output()
+            print("Starting from beginning...")
+        checkpoint = scraper.load_checkpoint()
         
-        if start_index > 0:
-            print(f"\n📍 Resuming from index {start_index} (job #{start_index + 1})")
-            user_input = input("Continue from last progress? (y/n): ").strip().lower()
-            if user_input != 'y':
-                start_index = 0
-                print("Starting from beginning...")
+        # Scrape all pending jobs (appends each one to data/jobs_data.jsonl)
+        scraper.scrape_multiple_jobs(case_numbers, workers=workers, checkpoint=checkpoint,
+                                     retry_failed=resume_policy != 'skip-failed', tabs=tabs)
         
-        # Scrape all jobs (saves after each one)
-        jobs_data = scraper.scrape_multiple_jobs(case_numbers, start_index=start_index)
+        # Compact into the final JSON file and backup once, when complete
+        date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        backup_filename = snapshot_filename(f'backup/jobs_{date_str}')
+        jobs_data = scraper.compact(backup_filename)
         
-        # Create final backup when complete
         if jobs_data:
-            os.makedirs('backup', exist_ok=True)
-            date_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            backup_filename = f'backup/jobs_{date_str}.json'
-            with open(backup_filename, 'w', encoding='utf-8') as backup_file:
-                json.dump(jobs_data, backup_file, indent=2, ensure_ascii=False)
-            
             print(f"\n✅ Successfully scraped {len(jobs_data)} jobs")
             print(f"✓ Data saved to data/jobs_data.json")
             print(f"✓ Final backup saved to {backup_filename}")
+            # Upsert every record into the job database (data/jobs.sqlite)
+            save_to_store(jobs_data, 'lista_randomizada')
+            if os.path.exists(scraper.dead_letter_filename):
+                print(f"⚠️ Cases that failed every retry: {scraper.dead_letter_filename}")
             
-            # Clear progress file when complete
-            try:
-                if os.path.exists('data/progress.txt'):
-                    os.remove('data/progress.txt')
-                    print("✓ Progress file cleared")
-            except:
-                pass
+            # Start the next run from scratch once every case is in; otherwise keep
+            # the checkpoint so the next run only retries what is missing
+            remaining = checkpoint.pending(case_numbers)
+            if remaining:
+                print(f"📍 {len(remaining)} cases still missing; checkpoint kept in {scraper.checkpoint_filename}")
+            else:
+                try:
+                    scraper.reset_output()
+                    print("✓ Checkpoint cleared")
+                except OSError:
+                    pass
         else:
             print("\n⚠️ No data was extracted")
             
@@ -342,6 +324,8 @@ def main():
         if scraper:
             scraper.close()
             print("\n=== Scraper closed ===")
+        print_latency_report()
+        write_metrics(prometheus_file=prometheus_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+"""Run instrumentation: stage latencies, counters and gauges.
+
+Stages are timed with `with timed('stage'):` and counted with
+increment('name'). At the end of a run write_metrics() dumps everything
+to a JSON file (and, optionally, Prometheus text format for a
+node_exporter textfile collector), so a run shows whether its time goes
+to the network, the DOM or the disk.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+import threading
+import time
+
+RUN_STARTED = time.time()
+_lock = threading.Lock()
+
+
+class LatencyHistogram:
+    """Latency samples (seconds) of one stage, summarized as percentiles"""
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = []
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        if not self.samples:
+            return f"{self.name}: no samples"
+        return (
+            f"{self.name}: n={len(self.samples)} "
+            f"p50={self.percentile(50):.2f}s p95={self.percentile(95):.2f}s p99={self.percentile(99):.2f}s "
+            f"max={max(self.samples):.2f}s total={sum(self.samples):.1f}s"
+        )
+
+    def to_dict(self):
+        samples = list(self.samples)
+        return {
+            'count': len(samples),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': max(samples) if samples else 0.0,
+            'total': sum(samples),
+        }
+
+
+HISTOGRAMS = {}
+COUNTERS = {}
+GAUGES = {}
+
+
+def histogram(name):
+    """Get (or create) the histogram for a stage"""
+    if name not in HISTOGRAMS:
+        # setdefault keeps this safe when several scraper threads race here
+        HISTOGRAMS.setdefault(name, LatencyHistogram(name))
+    return HISTOGRAMS[name]
+
+
+@contextmanager
+def timed(name):
+    """Record how long the block takes in the `name` histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram(name).observe(time.perf_counter() - start)
+
+
+def increment(name, amount=1):
+    with _lock:
+        COUNTERS[name] = COUNTERS.get(name, 0) + amount
+
+
+def set_gauge(name, value):
+    with _lock:
+        GAUGES[name] = value
+
+
+def max_gauge(name, value):
+    """Keep the highest value seen (e.g. peak driver RSS)"""
+    with _lock:
+        GAUGES[name] = max(GAUGES.get(name, value), value)
+
+
+def throughput(counter='jobs_scraped'):
+    """`counter` per minute since the run started"""
+    minutes = (time.time() - RUN_STARTED) / 60
+    return COUNTERS.get(counter, 0) / minutes if minutes > 0 else 0.0
+
+
+def metrics_snapshot():
+    with _lock:
+        counters = dict(COUNTERS)
+        gauges = dict(GAUGES)
+    return {
+        'started_at': datetime.fromtimestamp(RUN_STARTED).isoformat(timespec='seconds'),
+        'elapsed_seconds': time.time() - RUN_STARTED,
+        'jobs_per_minute': throughput(),
+        'stages': {name: HISTOGRAMS[name].to_dict() for name in sorted(HISTOGRAMS)},
+        'counters': counters,
+        'gauges': gauges,
+    }
+
+
+def prometheus_text(prefix='scraper'):
+    """The snapshot in Prometheus exposition format"""
+    snapshot = metrics_snapshot()
+    lines = [f"# TYPE {prefix}_stage_seconds summary"]
+    for stage, stats in snapshot['stages'].items():
+        for quantile in ('p50', 'p95', 'p99'):
+            value = stats[quantile]
+            lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="0.{quantile[1:]}"}} {value:.6f}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["total"]:.6f}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+    for name, value in sorted(snapshot['counters'].items()):
+        lines.append(f"# TYPE {prefix}_{name}_total counter")
+        lines.append(f"{prefix}_{name}_total {value}")
+    for name, value in sorted(snapshot['gauges'].items()):
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.append(f"{prefix}_{name} {value}")
+    lines.append(f"# TYPE {prefix}_jobs_per_minute gauge")
+    lines.append(f"{prefix}_jobs_per_minute {snapshot['jobs_per_minute']:.3f}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics(filename='data/metrics.json', prometheus_file=None):
+    """Write the run metrics as JSON (and as Prometheus text if asked)"""
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    with open(filename, 'w', encoding='utf-8') as file:
+        json.dump(metrics_snapshot(), file, indent=2)
+    if prometheus_file:
+        os.makedirs(os.path.dirname(prometheus_file) or '.', exist_ok=True)
+        with open(prometheus_file, 'w', encoding='utf-8') as file:
+            file.write(prometheus_text())
+
+
+def print_latency_report():
+    if not HISTOGRAMS:
+        return
+    print("\n⏱️ Latências observadas:")
+    for name in sorted(HISTOGRAMS):
+        print(f"   {HISTOGRAMS[name].summary()}")
+    if COUNTERS.get('jobs_scraped'):
+        print(f"   throughput: {throughput():.1f} jobs/min")
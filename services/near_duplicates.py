@@ -0,0 +1,217 @@
+"""Near-duplicate postings: MinHash signatures + locality-sensitive hashing.
+
+Employers (and agents filing for many of them) re-file the same posting
+under new case numbers with the same boilerplate duties. Each record is
+turned into a set of features (word shingles of job_duties plus the
+title and company words), hashed into a MinHash signature, and the
+signatures are split into LSH bands: only records sharing a band bucket
+are compared, so grouping stays close to linear instead of comparing
+every pair. Candidates whose estimated Jaccard similarity reaches the
+threshold are merged into one group.
+
+Every record gets a `duplicate_group` key, the caseNumber of the group's
+representative (the first record of the group in input order; a record
+without near-copies is its own representative):
+
+    python services/near_duplicates.py data/seasonal_jobs_scraped.json \
+        --output data/jobs_grouped.json --representatives data/representatives.json
+
+Needs numpy (pip install numpy).
+"""
+from snapshot_store import iter_records, open_snapshot_writer
+import argparse
+import re
+import zlib
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+# Prime just above 2**32: hashes are crc32 values, so (a * x + b) fits in 64 bits
+PRIME = (1 << 32) + 15
+MAX_HASH = (1 << 32) - 1
+SHINGLE_MULTIPLIER = 1000003
+
+
+def _numpy():
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        raise RuntimeError("Near-duplicate detection needs numpy: pip install numpy")
+
+
+def _words(text):
+    text = '' if text in (None, 'N/A') else str(text)
+    return WORD_PATTERN.findall(text.lower())
+
+
+def _crc32s(np, words, prefix=''):
+    return np.fromiter((zlib.crc32((prefix + word).encode('utf-8')) for word in words),
+                       dtype=np.uint64, count=len(words))
+
+
+def feature_hashes(job, shingle_size=3):
+    """32-bit hashes of a scraped record's features: duty shingles, title and company words.
+
+    Each duty word is hashed once and the shingles are combined from those
+    hashes with numpy, instead of building and hashing every shingle string.
+    """
+    np = _numpy()
+    words = _crc32s(np, _words(job.get('job_duties')))
+    if len(words) >= shingle_size:
+        shingles = np.zeros(len(words) - shingle_size + 1, dtype=np.uint64)
+        for offset in range(shingle_size):
+            shingles = (shingles * SHINGLE_MULTIPLIER + words[offset:len(shingles) + offset]) & MAX_HASH
+    else:
+        shingles = words
+    return np.unique(np.concatenate((
+        shingles,
+        _crc32s(np, _words(job.get('jobTitle')), 'title:'),
+        _crc32s(np, _words(job.get('company')), 'company:'),
+    )))
+
+
+def lsh_params(num_perm, threshold):
+    """(bands, rows) with bands * rows == num_perm and the S-curve midpoint just below `threshold`.
+
+    Pairs above the midpoint very likely share a bucket; erring low trades a
+    few extra candidate checks for fewer missed near-copies.
+    """
+    candidates = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    midpoint = lambda params: (1 / params[0]) ** (1 / params[1])
+    below = [params for params in candidates if midpoint(params) <= threshold]
+    return max(below, key=midpoint) if below else min(candidates, key=midpoint)
+
+
+class MinHasher:
+    """num_perm universal hash functions (a * x + b) mod p over crc32 feature hashes"""
+
+    def __init__(self, num_perm=128, seed=1):
+        np = _numpy()
+        generator = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = generator.integers(1, MAX_HASH, size=(num_perm, 1), dtype=np.uint64)
+        self.b = generator.integers(0, MAX_HASH, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, hashes):
+        """Signature of a non-empty array of feature hashes"""
+        return ((self.a * hashes + self.b) % PRIME).min(axis=1)
+
+
+class NearDuplicateIndex:
+    """Incremental grouping: add() records one by one, read the groups at any time"""
+
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=3, seed=1):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.keys = []
+        self.signatures = []
+        self.parent = []
+
+    def _find(self, index):
+        root = index
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[index] != root:
+            self.parent[index], index = root, self.parent[index]
+        return root
+
+    def _union(self, first, second):
+        first, second = self._find(first), self._find(second)
+        # The earlier record stays the representative
+        if first != second:
+            self.parent[max(first, second)] = min(first, second)
+
+    def similarity(self, first, second):
+        """Estimated Jaccard similarity of two added records (by position)"""
+        return int((self.signatures[first] == self.signatures[second]).sum()) / self.hasher.num_perm
+
+    def add(self, key, job):
+        """Add a scraped record under `key` (its caseNumber); returns its group's key"""
+        index = len(self.keys)
+        self.keys.append(key)
+        self.parent.append(index)
+        hashes = feature_hashes(job, self.shingle_size)
+        if not len(hashes):
+            # Nothing to compare on: a group of its own
+            self.signatures.append(None)
+            return key
+        signature = self.hasher.signature(hashes)
+        self.signatures.append(signature)
+        for band, buckets in enumerate(self.buckets):
+            bucket = buckets.setdefault(signature[band * self.rows:(band + 1) * self.rows].tobytes(), [])
+            root = self._find(index)
+            for other in bucket:
+                if self._find(other) != root and self.similarity(index, other) >= self.threshold:
+                    self._union(index, other)
+                    root = self._find(index)
+            bucket.append(index)
+        return self.group_at(index)
+
+    def group_at(self, index):
+        """Group key of the index-th added record"""
+        return self.keys[self._find(index)]
+
+    def groups(self):
+        """{key: group key} of every record added so far"""
+        return {key: self.group_at(index) for index, key in enumerate(self.keys)}
+
+
+def assign_groups(records, threshold=0.8, num_perm=128, shingle_size=3):
+    """Set `duplicate_group` on every record (in place); returns the records"""
+    index = NearDuplicateIndex(threshold, num_perm, shingle_size)
+    for position, job in enumerate(records):
+        index.add(job.get('caseNumber') or f"#{position}", job)
+    for position, job in enumerate(records):
+        job['duplicate_group'] = index.group_at(position)
+    return records
+
+
+def representatives(records):
+    """First record of each group (records without a duplicate_group are kept)"""
+    seen = set()
+    selected = []
+    for job in records:
+        group = job.get('duplicate_group')
+        if group is None or group not in seen:
+            seen.add(group)
+            selected.append(job)
+    return selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group near-duplicate postings (MinHash/LSH)")
+    parser.add_argument('input', help="snapshot file (.json, .jsonl or .parquet)")
+    parser.add_argument('--threshold', type=float, default=0.8, help="estimated Jaccard similarity to group")
+    parser.add_argument('--num-perm', type=int, default=128)
+    parser.add_argument('--shingle-size', type=int, default=3, help="words per duty shingle")
+    parser.add_argument('--output', default=None, help="every record with its duplicate_group")
+    parser.add_argument('--representatives', default=None, help="one record per group")
+    parser.add_argument('--show', type=int, default=10, help="largest groups to print")
+    args = parser.parse_args()
+
+    records = assign_groups(list(iter_records(args.input)), args.threshold, args.num_perm, args.shingle_size)
+    sizes = {}
+    for job in records:
+        sizes.setdefault(job['duplicate_group'], []).append(job)
+    repeated = sorted((members for members in sizes.values() if len(members) > 1), key=len, reverse=True)
+    print(f"🔎 {len(records)} records, {len(sizes)} groups, "
+          f"{sum(len(members) for members in repeated)} records in {len(repeated)} groups with near-copies")
+    for members in repeated[:args.show]:
+        first = members[0]
+        print(f"  {len(members):>4} × {first.get('jobTitle')} ({first.get('company')}) → {first['duplicate_group']}")
+
+    for filename, selected in ((args.output, records), (args.representatives, representatives(records))):
+        if filename:
+            writer = open_snapshot_writer(filename)
+            try:
+                for job in selected:
+                    writer.append(job)
+            finally:
+                writer.close()
+            print(f"✓ {len(selected)} records → {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,11 @@
-import json
+from job_store import JobStore
 
-# 1. Ler o arquivo original
-with open('backup/jobs_list_2025-07-09_20-52-39.json', 'r', encoding='utf-8') as file:
-    jobs = json.load(file)
-
-# 2. Filtrar os trabalhos que não exigem experiência
-no_experience_jobs = [
-    job for job in jobs
-    if job.get("experience_required", "").strip().lower() == "no"
-]
-
-# 3. Salvar os resultados filtrados em um novo arquivo
-with open('data/no_experience.json', 'w', encoding='utf-8') as file:
-    json.dump(no_experience_jobs, file, indent=2, ensure_ascii=False)
+# 1 a 3. Consultar no banco de jobs (data/jobs.sqlite) os trabalhos que não exigem
+# experiência, pelo índice de experience_required, e salvar os resultados
+# (snapshots antigos entram com: python services/job_store.py import arquivo.json)
+store = JobStore()
+no_experience_count = store.export_query('data/no_experience.json', experience="no")
+store.close()
 
 # 4. Mensagem de confirmação
-print(f"{len(no_experience_jobs)} trabalho(s) sem exigência de experiência foram salvos em 'filtered_jobs.json'")
+print(f"{no_experience_count} trabalho(s) sem exigência de experiência foram salvos em 'data/no_experience.json'")
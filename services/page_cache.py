@@ -0,0 +1,233 @@
+"""On-disk cache of job detail pages, keyed by case number.
+
+Pages are stored content-addressed (sha256 of the HTML, zlib-compressed)
+in SQLite, with the fetch time and the ETag/Last-Modified validators.
+Entries expire after `ttl` seconds unless marked final (INACTIVE postings
+never change), and the least recently used ones are evicted once the
+payloads exceed `max_bytes`.
+
+    python services/page_cache.py stats
+    python services/page_cache.py replay data/jobs_replayed.json
+"""
+from snapshot_store import open_snapshot_writer
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+
+class CachedPage:
+    __slots__ = ('case_number', 'html', 'content_hash', 'fetched_at', 'etag', 'last_modified', 'final')
+
+    def __init__(self, case_number, html, content_hash, fetched_at, etag, last_modified, final):
+        self.case_number = case_number
+        self.html = html
+        self.content_hash = content_hash
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.final = bool(final)
+
+    def is_fresh(self, ttl):
+        return self.final or (time.time() - self.fetched_at) < ttl
+
+    def validators(self):
+        """Headers for a conditional GET"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """Shared by every worker of a BrowserPool (one connection, one lock)"""
+
+    def __init__(self, filename='data/page_cache.sqlite', ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False, timeout=30)
+        self.connection.executescript(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            " content_hash TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " size INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " case_number TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL REFERENCES blobs(content_hash),"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " final INTEGER NOT NULL DEFAULT 0);"
+            "CREATE INDEX IF NOT EXISTS pages_accessed ON pages(accessed_at);"
+            "CREATE INDEX IF NOT EXISTS pages_hash ON pages(content_hash);"
+        )
+        self.connection.commit()
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def get(self, case_number):
+        """Cached page (fresh or not), or None"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT p.content_hash, b.payload, p.fetched_at, p.etag, p.last_modified, p.final"
+                " FROM pages p JOIN blobs b USING (content_hash) WHERE p.case_number = ?",
+                (case_number,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE pages SET accessed_at = ? WHERE case_number = ?", (time.time(), case_number)
+            )
+            self.connection.commit()
+
+        content_hash, payload, fetched_at, etag, last_modified, final = row
+        html = zlib.decompress(payload).decode('utf-8')
+        return CachedPage(case_number, html, content_hash, fetched_at, etag, last_modified, final)
+
+    def put(self, case_number, html, etag=None, last_modified=None, final=False):
+        """Store a freshly fetched page and evict old ones if over the size limit"""
+        content_hash = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        now = time.time()
+        with self.lock:
+            previous = self.connection.execute(
+                "SELECT content_hash FROM pages WHERE case_number = ?", (case_number,)
+            ).fetchone()
+            exists = self.connection.execute(
+                "SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            if not exists:
+                payload = zlib.compress(html.encode('utf-8'), 6)
+                self.connection.execute(
+                    "INSERT INTO blobs (content_hash, payload, size) VALUES (?, ?, ?)",
+                    (content_hash, payload, len(payload))
+                )
+                self.total_bytes += len(payload)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages"
+                " (case_number, content_hash, fetched_at, accessed_at, etag, last_modified, final)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (case_number, content_hash, now, now, etag, last_modified, int(final))
+            )
+            if previous and previous[0] != content_hash:
+                self._drop_blob_if_orphan(previous[0])
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.connection.commit()
+        return content_hash
+
+    def touch(self, case_number):
+        """A conditional GET said 304: the cached page is fresh again"""
+        with self.lock:
+            self.connection.execute(
+                "UPDATE pages SET fetched_at = ? WHERE case_number = ?", (time.time(), case_number)
+            )
+            self.connection.commit()
+
+    def mark_final(self, case_number):
+        """Never expire this page (e.g. INACTIVE postings)"""
+        with self.lock:
+            self.connection.execute("UPDATE pages SET final = 1 WHERE case_number = ?", (case_number,))
+            self.connection.commit()
+
+    def _evict(self):
+        """Drop least recently used pages until the payloads fit in max_bytes"""
+        rows = self.connection.execute(
+            "SELECT case_number, content_hash FROM pages ORDER BY accessed_at"
+        ).fetchall()
+        for case_number, content_hash in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self.connection.execute("DELETE FROM pages WHERE case_number = ?", (case_number,))
+            self._drop_blob_if_orphan(content_hash)
+
+    def _drop_blob_if_orphan(self, content_hash):
+        if self.connection.execute(
+            "SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)
+        ).fetchone():
+            return
+        row = self.connection.execute(
+            "SELECT size FROM blobs WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        if row:
+            self.connection.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+            self.total_bytes -= row[0]
+
+    def iter_pages(self):
+        """Every cached page, for offline re-extraction"""
+        with self.lock:
+            case_numbers = [row[0] for row in self.connection.execute("SELECT case_number FROM pages")]
+        for case_number in case_numbers:
+            page = self.get(case_number)
+            if page:
+                yield page
+
+    def stats(self):
+        with self.lock:
+            pages, final = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(final), 0) FROM pages"
+            ).fetchone()
+            blobs, size = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+        return {'pages': pages, 'final': final, 'blobs': blobs, 'bytes': size}
+
+    def close(self):
+        self.connection.close()
+
+
+def replay(cache, output_file):
+    """Re-run the parser over every cached page and write the dataset"""
+    from http_backend import parse_job_page
+    from job_fields import build_job_data
+
+    writer = open_snapshot_writer(output_file)
+    extracted = failed = 0
+    try:
+        for page in cache.iter_pages():
+            raw = parse_job_page(page.html)
+            if raw is None:
+                failed += 1
+                continue
+            writer.append(build_job_data(raw, page.case_number))
+            extracted += 1
+    finally:
+        writer.close()
+    return extracted, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay the job page cache")
+    parser.add_argument('--cache', default='data/page_cache.sqlite')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('stats')
+    replay_parser = commands.add_parser('replay')
+    replay_parser.add_argument('output', help="output snapshot (.json, .jsonl or .parquet)")
+    args = parser.parse_args()
+
+    cache = PageCache(args.cache)
+    try:
+        if args.command == 'stats':
+            stats = cache.stats()
+            print(f"📦 {stats['pages']} pages ({stats['final']} final), "
+                  f"{stats['blobs']} distinct payloads, {stats['bytes'] / 1024:.0f} KB")
+        else:
+            extracted, failed = replay(cache, args.output)
+            print(f"✓ {extracted} jobs re-extracted to {args.output}")
+            if failed:
+                print(f"✗ {failed} cached pages had no #job-detail section")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Request pacing and retries shared by every scraper.
+
+AdaptiveRateLimiter is a token bucket whose rate follows the site: it
+creeps up while requests succeed quickly and halves when they fail or
+slow down (AIMD). RetryPolicy spaces the attempts of a failed item with
+exponential backoff and full jitter; items that run out of attempts go
+to a dead-letter JSONL file so they can be re-queued later.
+"""
+from datetime import datetime
+from jsonl_store import JsonlWriter, iter_jsonl
+import random
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """Token bucket shared by all workers, adapted from observed latency and errors"""
+
+    def __init__(self, rate=1.0, min_rate=0.2, max_rate=5.0, burst=1,
+                 latency_target=3.0, increase=0.1, decrease=0.5, cooldown=5.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.last_decrease = 0.0
+        self.latency = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_interval(cls, min_interval, **kwargs):
+        """Limiter starting at one request per `min_interval` seconds"""
+        limiter = cls(**kwargs)
+        if min_interval > 0:
+            limiter.rate = min(limiter.max_rate, 1.0 / min_interval)
+        return limiter
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may start"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def record(self, latency, ok=True):
+        """Feed back one request: speed up on fast successes, back off otherwise"""
+        with self.lock:
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            now = time.monotonic()
+            if ok and self.latency <= self.latency_target:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            elif now - self.last_decrease >= self.cooldown:
+                # One cut per cooldown: a burst of failures is a single signal
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.last_decrease = now
+
+    def stats(self):
+        with self.lock:
+            return {'rate': self.rate, 'latency': self.latency}
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n waits U(0, base * 2**n), capped"""
+
+    def __init__(self, max_attempts=3, base_delay=2.0, max_delay=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, attempt):
+        """`attempt` is the number of attempts already made"""
+        return attempt < self.max_attempts
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class DeadLetter:
+    """Items that exhausted their retries, one JSON line each"""
+
+    def __init__(self, filename='data/dead_letter.jsonl'):
+        self.filename = filename
+        self.writer = None
+        self.lock = threading.Lock()
+
+    def add(self, item, attempts, error):
+        with self.lock:
+            if self.writer is None:
+                self.writer = JsonlWriter(self.filename, fsync_every=1)
+            self.writer.append({
+                'item': item,
+                'attempts': attempts,
+                'error': error,
+                'failed_at': datetime.now().isoformat(timespec='seconds'),
+            })
+
+    def close(self):
+        with self.lock:
+            if self.writer:
+                self.writer.close()
+                self.writer = None
+
+
+def load_dead_letters(filename='data/dead_letter.jsonl'):
+    """Distinct items of the dead-letter file, in order, to queue them again"""
+    return list(dict.fromkeys(entry['item'] for entry in iter_jsonl(filename)))
@@ -1,11 +1,13 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from job_fields import build_listing_data
+from dom_extractor import extract_job_fields
+from driver_manager import DriverManager
+from waits import article_count_greater_than, LOAD_MORE_TIMEOUT
+from metrics import timed, increment, print_latency_report, write_metrics
+from job_store import save_to_store
 import json
-import time
 
 # ALL "https://seasonaljobs.dol.gov/jobs?search=&location=&start_date=&job_type=all&sort=accepted_date&radius=100&wage=all&facets="
 # Construction laborer https://seasonaljobs.dol.gov/jobs?search=Construction%20Laborers&location=&start_date=&job_type=all&sort=accepted_date&radius=100&wage=all&facets=
@@ -16,22 +18,22 @@ import time
 
 class SeasonalJobsDynamicScraper:
     def __init__(self, headless=False):
-        self.setup_driver(headless)
+        # Chrome leve (carregamento eager, sem imagens/fontes/analytics)
+        self.drivers = DriverManager(headless)
+        self.drivers.start()
         self.base_url = "https://seasonaljobs.dol.gov/jobs?search=farmworker&location=&start_date=&job_type=all&sort=accepted_date&radius=100&wage=all&facets="
         
-    def setup_driver(self, headless):
-        """Configura o driver do Selenium"""
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 15)
+    @property
+    def driver(self):
+        return self.drivers.driver
+
+    @property
+    def wait(self):
+        return self.drivers.wait(15)
+
+    @property
+    def short_wait(self):
+        return self.drivers.wait(5)
         
     def get_job_articles(self):
         """Encontra todos os artigos de jobs na página"""
@@ -66,11 +68,12 @@ class SeasonalJobsDynamicScraper:
                 # Clica no botão usando JavaScript
                 self.driver.execute_script("arguments[0].click();", load_more_button)
                 
-                # Aguarda novos jobs serem carregados
-                time.sleep(2)
-                
-                # Verifica quantos jobs temos agora
-                new_count = len(self.get_job_articles())
+                # Aguarda o número de jobs aumentar em vez de um sleep fixo
+                try:
+                    with timed('load_more'):
+                        new_count = self.drivers.wait(LOAD_MORE_TIMEOUT).until(article_count_greater_than(current_count))
+                except TimeoutException:
+                    new_count = current_count
                 
                 if new_count > current_count:
                     print(f"Carregados {new_count - current_count} novos jobs. Total: {new_count}")
@@ -90,7 +93,6 @@ class SeasonalJobsDynamicScraper:
     def scroll_to_element(self, element):
         """Rola a página até o elemento especificado"""
         self.driver.execute_script("arguments[0].scrollIntoView();", element)
-        time.sleep(0.3)
     
     def click_job_and_extract_data(self, article):
         """Clica em um job e extrai os dados da página de detalhes"""
@@ -102,110 +104,12 @@ class SeasonalJobsDynamicScraper:
             self.driver.execute_script("arguments[0].click();", article)
             
             # Aguarda o elemento de detalhes aparecer
-            self.wait.until(EC.visibility_of_element_located((By.ID, "job-detail")))
-            
-            job_data = {}
-            
-            # Extrai título
-            try:
-                title_element = self.driver.find_element(By.CSS_SELECTOR, "#job-detail h2")
-                job_data['jobTitle'] = title_element.text.strip()
-            except NoSuchElementException:
-                job_data['jobTitle'] = "N/A"
-            
-            # Extrai email
-            try:
-                email_element = self.driver.find_element(By.CSS_SELECTOR, "a[href^='mailto:']")
-                job_data['recApplyEmail'] = email_element.text.strip()
-            except NoSuchElementException:
-                job_data['recApplyEmail'] = "N/A"
-            
-            # Extrai experiência necessária
-            try:
-                # Busca por "Experience Required:" e pega o valor seguinte
-                dt_elements = self.driver.find_elements(By.TAG_NAME, "dt")
-                for dt in dt_elements:
-                    if "Experience Required:" in dt.text:
-                        dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                        job_data['experience_required'] = dd_element.text.strip()
-                        break
-                else:
-                    job_data['experience_required'] = "N/A"
-            except NoSuchElementException:
-                job_data['experience_required'] = "N/A"
-            
-            # Extrai empresa
-            try:
-                company_element = self.driver.find_element(By.CSS_SELECTOR, "#job-detail p.text-gray-500")
-                job_data['company'] = company_element.text.strip()
-            except NoSuchElementException:
-                job_data['company'] = "N/A"
-            
-            # Extrai localização
-            try:
-                location_elements = self.driver.find_elements(By.CSS_SELECTOR, "#job-detail p.text-gray-500")
-                if len(location_elements) > 1:
-                    job_data['location'] = location_elements[1].text.strip()
-                else:
-                    job_data['location'] = "N/A"
-            except NoSuchElementException:
-                job_data['location'] = "N/A"
+            with timed('detail_ready'):
+                self.wait.until(EC.visibility_of_element_located((By.ID, "job-detail")))
             
-            # Extrai salário
-            try:
-                # Busca por padrão de salário
-                salary_text = self.driver.find_element(By.XPATH, "//*[contains(text(), 'per hour')]").text
-                job_data['salary'] = salary_text.strip()
-            except NoSuchElementException:
-                job_data['salary'] = "N/A"
-            
-            # Extrai datas
-            try:
-                begin_date = self.driver.find_element(By.XPATH, "//time[contains(text(), 'Begin date:')]")
-                job_data['begin_date'] = begin_date.text.replace('Begin date: ', '').strip()
-            except NoSuchElementException:
-                job_data['begin_date'] = "N/A"
-            
-            try:
-                end_date = self.driver.find_element(By.XPATH, "//time[contains(text(), 'End date:')]")
-                job_data['end_date'] = end_date.text.replace('End date: ', '').strip()
-            except NoSuchElementException:
-                job_data['end_date'] = "N/A"
-            
-            # Extrai telefone
-            try:
-                phone_element = self.driver.find_element(By.CSS_SELECTOR, "a[href^='tel:']")
-                job_data['phone'] = phone_element.text.strip()
-            except NoSuchElementException:
-                job_data['phone'] = "N/A"
-            
-            # Extrai case number
-            try:
-                dt_elements = self.driver.find_elements(By.TAG_NAME, "dt")
-                for dt in dt_elements:
-                    if "ETA Case Number:" in dt.text:
-                        dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                        job_data['caseNumber'] = dd_element.text.strip()
-                        break
-                else:
-                    job_data['caseNumber'] = "N/A"
-            except NoSuchElementException:
-                job_data['caseNumber'] = "N/A"
-            
-            # Extrai descrição do trabalho
-            try:
-                dt_elements = self.driver.find_elements(By.TAG_NAME, "dt")
-                for dt in dt_elements:
-                    if "Job Duties:" in dt.text:
-                        dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                        job_data['job_duties'] = dd_element.text.strip()[:500] + "..." if len(dd_element.text) > 500 else dd_element.text.strip()
-                        break
-                else:
-                    job_data['job_duties'] = "N/A"
-            except NoSuchElementException:
-                job_data['job_duties'] = "N/A"
-                
-            return job_data
+            # Extrai todos os campos em uma única chamada execute_script
+            with timed('extract_fields'):
+                return build_listing_data(extract_job_fields(self.driver))
             
         except Exception as e:
             print(f"Erro ao extrair dados do job: {e}")
@@ -215,17 +119,19 @@ class SeasonalJobsDynamicScraper:
             try:
                 close_button = self.driver.find_element(By.CSS_SELECTOR, "button[aria-label='Close']")
                 close_button.click()
-                time.sleep(0.5)
+                # Aguarda o painel fechar
+                self.short_wait.until(EC.invisibility_of_element_located((By.ID, "job-detail")))
             except:
                 pass
     
     def scrape_jobs(self, start_index=0, end_index=30):
         """Função principal para fazer scraping dos jobs"""
         print(f"Acessando {self.base_url}")
-        self.driver.get(self.base_url)
         
-        # Aguarda a página carregar
-        time.sleep(3)
+        # Aguarda a página carregar (até os cards aparecerem)
+        with timed('page_ready'):
+            self.drivers.get(self.base_url)
+            self.get_job_articles()
         
         # Carrega jobs até atingir o índice final desejado
         self.load_more_jobs_until(end_index + 1)
@@ -261,23 +167,22 @@ class SeasonalJobsDynamicScraper:
                     job_data['job_index'] = i
                     all_jobs_data.append(job_data)
                     processed_count += 1
+                    increment('jobs_scraped')
                     print(f"✓ Job extraído: {job_data.get('jobTitle', 'N/A')}")
                 else:
                     print(f"✗ Falha ao extrair dados do job {i}")
+                    increment('jobs_failed')
                 
             except Exception as e:
                 print(f"✗ Erro ao processar job {i}: {e}")
                 continue
-            
-            # Delay entre processamentos
-            time.sleep(1)
         
         return all_jobs_data
     
     def save_to_json(self, data, filename='data/seasonal_jobs_scraped.json'):
         """Salva os dados em arquivo JSON"""
         try:
-            with open(filename, 'w', encoding='utf-8') as file:
+            with timed('save_json'), open(filename, 'w', encoding='utf-8') as file:
                 json.dump(data, file, indent=2, ensure_ascii=False)
             print(f"✓ Dados salvos em {filename}")
         except Exception as e:
@@ -285,11 +190,11 @@ class SeasonalJobsDynamicScraper:
     
     def close(self):
         """Fecha o driver"""
-        if self.driver:
-            self.driver.quit()
+        self.drivers.quit()
 
 
-def main():
+def main(start_index=0, end_index=50, output='data/seasonal_jobs_scraped.json'):
+    # start_index: índice do primeiro job (0-based); end_index: índice do último job (inclusive)
     scraper = None
     try:
         print("=== Iniciando Scraper Dinâmico de Empregos Sazonais ===")
@@ -297,16 +202,13 @@ def main():
         # Inicia o scraper
         scraper = SeasonalJobsDynamicScraper(headless=True)
         
-        # Configuração dos jobs a serem extraídos
-        start_index = 0  # Índice do primeiro job (0-based)
-        end_index = 50   # Índice do último job (inclusive)
-        
         # Faz scraping dos jobs no intervalo especificado
         jobs_data = scraper.scrape_jobs(start_index=start_index, end_index=end_index)
         
         if jobs_data:
-            # Salva os dados
-            scraper.save_to_json(jobs_data)
+            # Salva os dados (arquivo JSON e banco data/jobs.sqlite)
+            scraper.save_to_json(jobs_data, filename=output)
+            save_to_store(jobs_data, 'scraper_v2')
             
             print(f"\n=== Scraping Concluído ===")
             print(f"Total de jobs extraídos: {len(jobs_data)}")
@@ -318,6 +220,9 @@ def main():
             
         else:
             print("Nenhum dado foi extraído")
+        
+        print_latency_report()
+        write_metrics('data/seasonal_jobs_metrics.json')
             
     except Exception as e:
         print(f"Erro durante o scraping: {e}")
@@ -1,17 +1,64 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from datetime import datetime
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from job_fields import build_listing_data, build_card_data
+from dom_extractor import extract_job_fields, card_case_numbers, harvest_cards
+from browser_pool import BrowserPool
+from t import JobListScraper
+from case_index import CaseIndex
+from driver_manager import DriverManager
+from html_archive import HtmlArchive
+from concurrent.futures import ThreadPoolExecutor
+from snapshot_store import write_snapshot, snapshot_filename
+from waits import article_count_greater_than, LOAD_MORE_TIMEOUT
+from metrics import timed, increment, print_latency_report, write_metrics
+from scheduler import AdaptiveRateLimiter, RetryPolicy, DeadLetter
+from job_store import save_to_store
 import json
-import time
 import os
+import queue
+import threading
+import time
+
+class CategoryRegistry:
+    """Categorias em que cada caseNumber aparece, compartilhado entre as threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.categories = {}
+
+    def claim(self, case_number, category):
+        """Registra a categoria; True só para a primeira, que deve extrair o job"""
+        with self.lock:
+            owners = self.categories.setdefault(case_number, [])
+            first = not owners
+            if category not in owners:
+                owners.append(category)
+            return first
+
+    def categories_of(self, case_number):
+        with self.lock:
+            return list(self.categories.get(case_number, []))
+
 
 class SeasonalJobsDynamicScraper:
-    def __init__(self, headless=False):
-        self.setup_driver(headless)
+    def __init__(self, headless=False, archive=None):
+        self.headless = headless
+        # HtmlArchive opcional: guarda o #job-detail para html_archive.py reparse --schema listing
+        self.archive = archive
+        # Ritmo dos cliques adaptado ao site (compartilhado entre categorias em scrape_categories)
+        self.limiter = AdaptiveRateLimiter()
+        self.retry = RetryPolicy(max_attempts=3, base_delay=1.0)
+        self.dead_letter = DeadLetter('data/dead_letter_v3.jsonl')
+        # Modo colheita: páginas de detalhe dos cards (por HTTP só com use_http)
+        self.detail_base_url = "https://seasonaljobs.dol.gov/jobs/"
+        self.detail_dead_letter_file = 'data/dead_letter_v3_details.jsonl'
+        # caseNumbers entregues só com o resumo do card (detalhe falhou): ficam fora do CaseIndex
+        self.card_only = set()
+        # Chrome leve; reciclado entre categorias (nunca no meio de uma lista carregada)
+        self.drivers = DriverManager(headless, max_pages=20)
+        self.drivers.start()
 
         # URLs para diferentes categorias de empregos
         self.job_urls = {
@@ -25,17 +72,17 @@ class SeasonalJobsDynamicScraper:
             # "agricultural_operator": "https://seasonaljobs.dol.gov/jobs?search=Ag%20Equip.%20Operators&location=&start_date=&job_type=all&sort=relevancy&radius=100&wage=all&facets="
         }
 
-    def setup_driver(self, headless):
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 15)
+    @property
+    def driver(self):
+        return self.drivers.driver
+
+    @property
+    def wait(self):
+        return self.drivers.wait(15)
+
+    @property
+    def short_wait(self):
+        return self.drivers.wait(5)
 
     def get_job_articles(self):
         try:
@@ -47,19 +94,26 @@ class SeasonalJobsDynamicScraper:
             print("Timeout ao buscar artigos de jobs")
             return []
 
-    def load_more_jobs_until(self, desired_count):
+    def load_more_jobs_until(self, desired_count, stop_when=None):
         current_count = len(self.get_job_articles())
         attempts = 0
 
         while current_count < desired_count and attempts < 5:
+            if stop_when and stop_when():
+                print("Parando paginação: só restam jobs já conhecidos")
+                break
             try:
                 load_more_button = self.wait.until(
                     EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Load More')]"))
                 )
                 self.driver.execute_script("arguments[0].scrollIntoView();", load_more_button)
                 self.driver.execute_script("arguments[0].click();", load_more_button)
-                time.sleep(2)
-                new_count = len(self.get_job_articles())
+                # Espera o número de cards aumentar em vez de um sleep fixo
+                try:
+                    with timed('load_more'):
+                        new_count = self.drivers.wait(LOAD_MORE_TIMEOUT).until(article_count_greater_than(current_count))
+                except TimeoutException:
+                    new_count = current_count
                 if new_count > current_count:
                     print(f"Carregados {new_count - current_count} novos jobs. Total: {new_count}")
                     current_count = new_count
@@ -73,95 +127,20 @@ class SeasonalJobsDynamicScraper:
 
     def scroll_to_element(self, element):
         self.driver.execute_script("arguments[0].scrollIntoView();", element)
-        time.sleep(0.3)
 
     def click_job_and_extract_data(self, article):
         try:
             self.scroll_to_element(article)
             self.driver.execute_script("arguments[0].click();", article)
-            self.wait.until(EC.visibility_of_element_located((By.ID, "job-detail")))
-
-            job_data = {}
-
-            try:
-                job_data['jobTitle'] = self.driver.find_element(By.CSS_SELECTOR, "#job-detail h2").text.strip()
-            except NoSuchElementException:
-                job_data['jobTitle'] = "N/A"
-
-            try:
-                job_data['recApplyEmail'] = self.driver.find_element(By.CSS_SELECTOR, "a[href^='mailto:']").text.strip()
-            except NoSuchElementException:
-                job_data['recApplyEmail'] = "N/A"
-
-            try:
-                dt_elements = self.driver.find_elements(By.TAG_NAME, "dt")
-                for dt in dt_elements:
-                    if "Experience Required:" in dt.text:
-                        dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                        job_data['experience_required'] = dd_element.text.strip()
-                        break
-                else:
-                    job_data['experience_required'] = "N/A"
-            except NoSuchElementException:
-                job_data['experience_required'] = "N/A"
-
-            try:
-                job_data['company'] = self.driver.find_element(By.CSS_SELECTOR, "#job-detail p.text-gray-500").text.strip()
-            except NoSuchElementException:
-                job_data['company'] = "N/A"
-
-            try:
-                location_elements = self.driver.find_elements(By.CSS_SELECTOR, "#job-detail p.text-gray-500")
-                job_data['location'] = location_elements[1].text.strip() if len(location_elements) > 1 else "N/A"
-            except NoSuchElementException:
-                job_data['location'] = "N/A"
-
-            try:
-                salary_text = self.driver.find_element(By.XPATH, "//*[contains(text(), 'per hour')]").text
-                job_data['salary'] = salary_text.strip()
-            except NoSuchElementException:
-                job_data['salary'] = "N/A"
-
-            try:
-                begin_date = self.driver.find_element(By.XPATH, "//time[contains(text(), 'Begin date:')]")
-                job_data['begin_date'] = begin_date.text.replace('Begin date: ', '').strip()
-            except NoSuchElementException:
-                job_data['begin_date'] = "N/A"
-
-            try:
-                end_date = self.driver.find_element(By.XPATH, "//time[contains(text(), 'End date:')]")
-                job_data['end_date'] = end_date.text.replace('End date: ', '').strip()
-            except NoSuchElementException:
-                job_data['end_date'] = "N/A"
-
-            try:
-                job_data['phone'] = self.driver.find_element(By.CSS_SELECTOR, "a[href^='tel:']").text.strip()
-            except NoSuchElementException:
-                job_data['phone'] = "N/A"
-
-            try:
-                dt_elements = self.driver.find_elements(By.TAG_NAME, "dt")
-                for dt in dt_elements:
-                    if "ETA Case Number:" in dt.text:
-                        dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                        job_data['caseNumber'] = dd_element.text.strip()
-                        break
-                else:
-                    job_data['caseNumber'] = "N/A"
-            except NoSuchElementException:
-                job_data['caseNumber'] = "N/A"
-
-            try:
-                for dt in self.driver.find_elements(By.TAG_NAME, "dt"):
-                    if "Job Duties:" in dt.text:
-                        dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                        job_data['job_duties'] = dd_element.text.strip()[:500] + "..." if len(dd_element.text) > 500 else dd_element.text.strip()
-                        break
-                else:
-                    job_data['job_duties'] = "N/A"
-            except NoSuchElementException:
-                job_data['job_duties'] = "N/A"
-
+            with timed('detail_ready'):
+                self.wait.until(EC.visibility_of_element_located((By.ID, "job-detail")))
+
+            # Todos os campos em uma única chamada execute_script
+            with timed('extract_fields'):
+                raw = extract_job_fields(self.driver, include_html=self.archive is not None)
+            job_data = build_listing_data(raw)
+            if self.archive:
+                self.archive.save(job_data['caseNumber'], raw.get('html'))
             return job_data
 
         except Exception as e:
@@ -171,93 +150,338 @@ class SeasonalJobsDynamicScraper:
             try:
                 close_button = self.driver.find_element(By.CSS_SELECTOR, "button[aria-label='Close']")
                 close_button.click()
-                time.sleep(0.5)
+                self.short_wait.until(EC.invisibility_of_element_located((By.ID, "job-detail")))
             except:
                 pass
 
-    def scrape_jobs(self, url, start_index=0, end_index=30):
+    def extract_with_retry(self, article):
+        """Clica e extrai respeitando o limitador; tenta de novo com backoff"""
+        for attempt in range(self.retry.max_attempts):
+            if attempt:
+                increment('retries')
+                time.sleep(self.retry.delay(attempt))
+            self.limiter.acquire()
+            start = time.monotonic()
+            job_data = self.click_job_and_extract_data(article)
+            self.limiter.record(time.monotonic() - start, ok=job_data is not None)
+            if job_data:
+                return job_data
+        return None
+
+    def reached_seen_run(self, case_index, stop_after_seen):
+        """True quando a lista carregada tem `stop_after_seen` jobs já conhecidos seguidos"""
+        cases = card_case_numbers(self.driver)
+        seen = case_index.seen(cases)
+        run = 0
+        for case in cases:
+            run = run + 1 if case in seen else 0
+            if run >= stop_after_seen:
+                return True
+        return False
+
+    def open_listing(self, url, count, stop_when=None):
+        """Abre a lista e carrega cards até `count`; devolve os artigos"""
         print(f"Acessando {url}")
-        self.driver.get(url)
-        time.sleep(3)
-        self.load_more_jobs_until(end_index + 1)
-
-        job_articles = self.get_job_articles()
+        with timed('page_ready'):
+            self.drivers.get(url)
+            # Espera os cards aparecerem em vez de um sleep fixo
+            self.get_job_articles()
+        self.load_more_jobs_until(count, stop_when=stop_when)
+        return self.get_job_articles()
+
+    def scrape_jobs(self, url, start_index=0, end_index=30, case_index=None, stop_after_seen=20, claim=None):
+        # Modo incremental: a lista é ordenada por accepted_date, então uma
+        # sequência de jobs já conhecidos significa que o resto é antigo
+        stop_when = None
+        if case_index is not None:
+            stop_when = lambda: self.reached_seen_run(case_index, stop_after_seen)
+        job_articles = self.open_listing(url, end_index + 1, stop_when=stop_when)
         if not job_articles:
             print("Nenhum job encontrado na página")
             return []
 
+        seen = set()
+        cases = [None] * len(job_articles)
+        if case_index is not None or claim is not None:
+            cases = card_case_numbers(self.driver)
+        if case_index is not None:
+            seen = case_index.seen(cases)
+
         end_index = min(end_index, len(job_articles) - 1)
         print(f"Processando jobs de {start_index} a {end_index}")
         all_jobs_data = []
+        skipped = 0
+        duplicates = 0
 
         for i in range(start_index, end_index + 1):
+            if i >= len(job_articles):
+                # A lista reaberta após uma queda veio menor
+                break
+            if cases[i] in seen:
+                skipped += 1
+                continue
+            # Job já extraído (ou em extração) por outra categoria
+            if claim and cases[i] and not claim(cases[i]):
+                duplicates += 1
+                continue
             print(f"Processando job {i} de {end_index}")
             try:
                 article = job_articles[i]
-                job_data = self.click_job_and_extract_data(article)
+                job_data = self.extract_with_retry(article)
+                if job_data is None and not self.drivers.alive():
+                    # O Chrome caiu: reabre a lista e continua deste mesmo índice
+                    print("♻️ Navegador caiu, reabrindo a lista")
+                    self.drivers.restart()
+                    # Os handles e caseNumbers antigos são da sessão morta: relê os dois
+                    job_articles = self.open_listing(url, end_index + 1)
+                    cases = [None] * len(job_articles)
+                    if case_index is not None or claim is not None:
+                        cases = card_case_numbers(self.driver)
+                    if i < len(job_articles):
+                        job_data = self.extract_with_retry(job_articles[i])
                 if job_data:
                     job_data['job_index'] = i
                     all_jobs_data.append(job_data)
+                    increment('jobs_scraped')
+                else:
+                    increment('jobs_failed')
+                    increment('dead_letters')
+                    self.dead_letter.add(cases[i] or f"{url}#{i}", self.retry.max_attempts, 'no result')
             except Exception as e:
                 print(f"Erro ao processar job {i}: {e}")
-            time.sleep(1)
 
+        if skipped:
+            print(f"⏭️ {skipped} jobs já conhecidos foram pulados")
+        if duplicates:
+            print(f"🔁 {duplicates} jobs já extraídos em outra categoria")
         return all_jobs_data
 
-    def save_to_json(self, data, filename='data/all_jobs.json'):
+    def harvest_listing(self, url, start_index=0, end_index=30, case_index=None, stop_after_seen=20):
+        """Carrega a lista e lê o resumo de todos os cards numa única chamada, sem clicar.
+
+        Devolve os cards de start_index a end_index com 'job_index', sem os
+        já conhecidos pelo case_index e os sem caseNumber.
+        """
+        stop_when = None
+        if case_index is not None:
+            stop_when = lambda: self.reached_seen_run(case_index, stop_after_seen)
+        if not self.open_listing(url, end_index + 1, stop_when=stop_when):
+            print("Nenhum job encontrado na página")
+            return []
+
+        with timed('harvest_cards'):
+            cards = harvest_cards(self.driver)
+        for i, card in enumerate(cards):
+            card['job_index'] = i
+        cards = [card for card in cards[start_index:end_index + 1] if card.get('caseNumber')]
+        if case_index is not None:
+            seen = case_index.seen(card['caseNumber'] for card in cards)
+            if seen:
+                print(f"⏭️ {len(seen)} jobs já conhecidos foram pulados")
+            cards = [card for card in cards if card['caseNumber'] not in seen]
+        print(f"📋 {len(cards)} cards colhidos de {url}")
+        return cards
+
+    def fetch_details(self, cards, workers=4, use_http=False):
+        """Completa os cards com a página de detalhe, em paralelo pelo BrowserPool.
+
+        Cada worker é um JobListScraper (com use_http, HTTP primeiro e Chrome só no
+        fallback; experimental, o site renderiza as páginas no cliente);
+        o ritmo e os retries são os deste scraper. Um card cujo detalhe falha
+        fica só com o resumo (vai para a dead letter do pool e para self.card_only).
+        """
+        pool = BrowserPool(
+            lambda: JobListScraper(headless=self.headless, use_http=use_http, archive=self.archive, fallbacks=False),
+            workers=workers,
+            limiter=self.limiter,
+            retry=self.retry,
+            progress_file=None,
+            dead_letter_file=self.detail_dead_letter_file,
+        )
+        urls = [card.get('url') or self.detail_base_url + card['caseNumber'] for card in cards]
+        jobs = []
+        for position, _, detail in pool.imap(urls, lambda worker, job_url: worker.extract_job_data(job_url)):
+            card = cards[position]
+            job_data = build_card_data(card)
+            if detail:
+                detail.pop('url', None)
+                # A página de detalhe sem um campo não apaga o valor que veio do card
+                job_data.update({key: value for key, value in detail.items() if value not in (None, 'N/A', '')})
+            if job_data['caseNumber'] == "N/A":
+                job_data['caseNumber'] = card['caseNumber']
+            if not detail:
+                self.card_only.add(card['caseNumber'])
+            job_data['job_index'] = card['job_index']
+            jobs.append(job_data)
+        return jobs
+
+    def harvest_categories(self, start_index=0, end_index=30, case_index=None, detail_workers=4, use_http=False):
+        """Modo colheita: lê os cards de cada categoria e busca os detalhes em fila.
+
+        Substitui o ciclo clicar/esperar/fechar de scrape_categories: o
+        navegador só pagina as listas, e cada job aparece uma única vez,
+        com todas as suas categorias em 'categories'.
+        """
+        registry = CategoryRegistry()
+        cards = []
+        for category, url in self.job_urls.items():
+            print(f"\n🔍 Colhendo categoria: {category}")
+            try:
+                harvested = self.harvest_listing(url, start_index, end_index, case_index=case_index)
+            except Exception as e:
+                print(f"❌ Erro na categoria '{category}': {e}")
+                continue
+            for card in harvested:
+                if registry.claim(card['caseNumber'], category):
+                    card['category'] = category
+                    cards.append(card)
+
+        if not cards:
+            return []
+        print(f"\n📋 Buscando o detalhe de {len(cards)} jobs com {detail_workers} worker(s)...")
+        jobs = self.fetch_details(cards, workers=detail_workers, use_http=use_http)
+        for card, job in zip(cards, jobs):
+            job['category'] = card['category']
+            job['categories'] = registry.categories_of(card['caseNumber'])
+        return jobs
+
+    def scrape_categories(self, start_index=0, end_index=30, case_index=None, max_concurrent=2):
+        """Varre as categorias em paralelo, cada uma em seu próprio navegador.
+
+        Um job listado em várias categorias é extraído uma única vez e
+        recebe todas elas em 'categories'.
+        """
+        categories = list(self.job_urls.items())
+        workers = max(1, min(max_concurrent, len(categories)))
+        registry = CategoryRegistry()
+
+        # Este scraper é um dos navegadores; os demais são criados aqui
+        scrapers = queue.Queue()
+        scrapers.put(self)
+        extra_scrapers = []
+
+        def scrape_category(category, url):
+            scraper = scrapers.get()
+            try:
+                print(f"\n🔍 Scraping categoria: {category}")
+                jobs_data = scraper.scrape_jobs(
+                    url, start_index, end_index, case_index=case_index,
+                    claim=lambda case: registry.claim(case, category)
+                )
+                for job in jobs_data:
+                    job['category'] = category
+                return jobs_data
+            except Exception as e:
+                print(f"❌ Erro na categoria '{category}': {e}")
+                return []
+            finally:
+                scrapers.put(scraper)
+
+        try:
+            # Criados dentro do try: se um navegador não sobe, os já abertos são fechados
+            for _ in range(workers - 1):
+                scraper = SeasonalJobsDynamicScraper(headless=self.headless, archive=self.archive)
+                extra_scrapers.append(scraper)
+                scraper.limiter = self.limiter
+                scraper.dead_letter = self.dead_letter
+                scrapers.put(scraper)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(lambda item: scrape_category(*item), categories))
+        finally:
+            for scraper in extra_scrapers:
+                scraper.close()
+
+        all_jobs_combined = []
+        for (category, _), jobs_data in zip(categories, results):
+            if jobs_data:
+                print(f"✅ {len(jobs_data)} jobs extraídos da categoria '{category}'")
+            else:
+                print(f"⚠️ Nenhum dado encontrado para '{category}'")
+            for job in jobs_data:
+                job['categories'] = registry.categories_of(job['caseNumber']) or [category]
+            all_jobs_combined.extend(jobs_data)
+        return all_jobs_combined
+
+    def save_to_json(self, data, filename='data/all_jobs.json', backup=True):
+        # backup=False: só o arquivo principal (execuções incrementais não são snapshots completos)
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         try:
             # Salva o arquivo principal
-            with open(filename, 'w', encoding='utf-8') as file:
+            with timed('save_json'), open(filename, 'w', encoding='utf-8') as file:
                 json.dump(data, file, indent=2, ensure_ascii=False)
             print(f"✓ Dados salvos em {filename}")
+            if not backup:
+                return
 
-            # Cria diretório de backup
-            os.makedirs('backup', exist_ok=True)
+            # Salva o backup com a data (Parquet colunar quando o pyarrow está instalado)
             data_str = datetime.now().strftime("%Y-%m-%d")
-            backup_filename = f'backup/jobs_{data_str}.json'
-
-            # Salva o backup com a data
-            with open(backup_filename, 'w', encoding='utf-8') as backup_file:
-                json.dump(data, backup_file, indent=2, ensure_ascii=False)
+            backup_filename = snapshot_filename(f'backup/jobs_{data_str}')
+            with timed('save_backup'):
+                write_snapshot(data, backup_filename)
             print(f"✓ Backup salvo em {backup_filename}")
 
         except Exception as e:
             print(f"✗ Erro ao salvar JSON: {e}")
 
     def close(self):
-        if self.driver:
-            self.driver.quit()
-
-def main():
+        self.dead_letter.close()
+        self.drivers.quit()
+
+def main(start_index=0, end_index=50, incremental=False, harvest=True, detail_workers=4, max_concurrent=2,
+         output=None, use_http=False):
+    """Varre as categorias (veja services/cli.py scrape categories).
+
+    incremental: só extrai postagens novas, usando o índice persistente de caseNumbers.
+        O resultado não é a lista completa, então vai para data/new_jobs.json e não
+        gera backup/jobs_<data> (json_compare e analytics leem os backups como
+        snapshots completos)
+    output: arquivo de saída; por padrão data/all_jobs.json (data/new_jobs.json no incremental)
+    harvest: lê os cards das listas e busca os detalhes em paralelo;
+        False volta ao modo antigo, que clica em cada card
+    detail_workers: workers da fila de detalhes (modo colheita)
+    use_http: busca os detalhes por HTTP antes do Chrome (experimental)
+    max_concurrent: quantas categorias são varridas ao mesmo tempo no modo antigo (um navegador cada)
+    """
     scraper = None
     try:
         print("=== Iniciando Scraper Dinâmico de Empregos Sazonais ===")
-        scraper = SeasonalJobsDynamicScraper(headless=True)
-
-        start_index = 0
-        end_index = 50
-        all_jobs_combined = []
+        scraper = SeasonalJobsDynamicScraper(headless=True, archive=HtmlArchive())
 
-        for category, url in scraper.job_urls.items():
-            print(f"\n🔍 Scraping categoria: {category}")
-            jobs_data = scraper.scrape_jobs(url, start_index, end_index)
+        case_index = CaseIndex() if incremental else None
+        output = output or ('data/new_jobs.json' if incremental else 'data/all_jobs.json')
 
-            if jobs_data:
-                for job in jobs_data:
-                    job['category'] = category
-                all_jobs_combined.extend(jobs_data)
-                print(f"✅ {len(jobs_data)} jobs extraídos da categoria '{category}'")
-            else:
-                print(f"⚠️ Nenhum dado encontrado para '{category}'")
+        if harvest:
+            all_jobs_combined = scraper.harvest_categories(
+                start_index, end_index, case_index=case_index, detail_workers=detail_workers, use_http=use_http
+            )
+        else:
+            all_jobs_combined = scraper.scrape_categories(
+                start_index, end_index, case_index=case_index, max_concurrent=max_concurrent
+            )
 
         if all_jobs_combined:
-            scraper.save_to_json(all_jobs_combined, filename='data/all_jobs.json')
-            print(f"\n✅ Todos os dados salvos em 'data/all_jobs.json'")
+            scraper.save_to_json(all_jobs_combined, filename=output, backup=not incremental)
+            save_to_store(all_jobs_combined, 'scraper_v3')
+            print(f"\n✅ Todos os dados salvos em '{output}'")
             print(f"📦 Total de jobs extraídos: {len(all_jobs_combined)}")
+
+            # Marca como conhecidos só depois de salvos, e só os com detalhe: os que
+            # ficaram só com o card são buscados de novo na próxima execução
+            if case_index is not None:
+                if scraper.card_only:
+                    print(f"⚠️ {len(scraper.card_only)} jobs sem detalhe ficam fora do índice")
+                for category in scraper.job_urls:
+                    case_index.add_many(
+                        (job['caseNumber'] for job in all_jobs_combined
+                         if job['category'] == category and job['caseNumber'] not in scraper.card_only),
+                        category
+                    )
         else:
             print("⚠️ Nenhum dado foi extraído de nenhuma categoria.")
 
+        print_latency_report()
+        write_metrics('data/all_jobs_metrics.json')
+
     except Exception as e:
         print(f"❌ Erro durante o scraping: {e}")
 
@@ -0,0 +1,237 @@
+"""Snapshot storage: JSON / JSONL for compatibility, Parquet for history.
+
+The format is picked from the file extension. Parquet files are written
+with typed columns and zstd compression and can be read back column by
+column, so a filter or a diff only loads the fields it looks at.
+Parquet needs pyarrow (pip install pyarrow); without it snapshots fall
+back to JSON.
+"""
+from jsonl_store import iter_jsonl, JsonlWriter
+from checkpoint import atomic_open
+import json
+import os
+
+PARQUET_COMPRESSION = 'zstd'
+
+
+def has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("Parquet snapshots need pyarrow: pip install pyarrow")
+
+
+def snapshot_filename(base):
+    """`base` + the preferred extension (.parquet when pyarrow is installed)"""
+    return f"{base}.parquet" if has_pyarrow() else f"{base}.json"
+
+
+def snapshot_format(filename):
+    if filename.endswith('.parquet'):
+        return 'parquet'
+    if filename.endswith('.jsonl'):
+        return 'jsonl'
+    return 'json'
+
+
+def _column_type(pa, values):
+    """Typed column: int64 for indexes, list<string> for tag lists, string otherwise"""
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return pa.int64()
+    if present and all(isinstance(value, list) for value in present):
+        return pa.list_(pa.string())
+    return pa.string()
+
+
+def _to_table(pa, records):
+    columns = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+
+    arrays = {}
+    for key in columns:
+        values = [record.get(key) for record in records]
+        column_type = _column_type(pa, values)
+        if column_type == pa.string():
+            values = [None if value is None else str(value) for value in values]
+        arrays[key] = pa.array(values, type=column_type)
+    return pa.table(arrays)
+
+
+def write_snapshot(records, filename):
+    """Write a list of job dicts in the format given by the extension"""
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    file_format = snapshot_format(filename)
+
+    # Every format is written to a temp file and renamed into place
+    if file_format == 'parquet':
+        pa = _pyarrow()
+        with atomic_open(filename, 'wb') as file:
+            pa.parquet.write_table(_to_table(pa, records), file, compression=PARQUET_COMPRESSION)
+    elif file_format == 'jsonl':
+        with atomic_open(filename) as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    else:
+        with atomic_open(filename) as file:
+            json.dump(records, file, indent=2, ensure_ascii=False)
+
+
+def read_snapshot(filename, columns=None):
+    """List of job dicts; with `columns`, only those fields are loaded"""
+    file_format = snapshot_format(filename)
+
+    if file_format == 'parquet':
+        pa = _pyarrow()
+        available = pa.parquet.read_schema(filename).names
+        wanted = None if columns is None else [column for column in columns if column in available]
+        return pa.parquet.read_table(filename, columns=wanted).to_pylist()
+
+    if file_format == 'jsonl':
+        records = list(iter_jsonl(filename))
+    else:
+        with open(filename, 'r', encoding='utf-8') as file:
+            records = json.load(file)
+    if columns is None:
+        return records
+    return [{column: record[column] for column in columns if column in record} for record in records]
+
+
+def iter_json_array(filename, chunk_size=1 << 16):
+    """Yield the elements of a JSON array file one at a time (bounded memory)"""
+    decoder = json.JSONDecoder()
+    with open(filename, 'r', encoding='utf-8') as file:
+        buffer = file.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{filename} is not a JSON array")
+        position = 1
+        eof = False
+
+        while True:
+            # Skip separators, pulling more text when the buffer runs out
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(buffer):
+                if eof:
+                    raise ValueError(f"{filename}: unterminated JSON array")
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            if buffer[position] == ']':
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            yield record
+            position = end
+
+
+def iter_records(filename, columns=None, batch_size=10000):
+    """Stream the records of any snapshot format without loading it whole"""
+    file_format = snapshot_format(filename)
+
+    if file_format == 'parquet':
+        pa = _pyarrow()
+        parquet_file = pa.parquet.ParquetFile(filename)
+        if columns is not None:
+            columns = [column for column in columns if column in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield from batch.to_pylist()
+        return
+
+    records = iter_jsonl(filename) if file_format == 'jsonl' else iter_json_array(filename)
+    for record in records:
+        if columns is None:
+            yield record
+        else:
+            yield {column: record[column] for column in columns if column in record}
+
+
+class JsonArrayWriter:
+    """Streams records into a JSON array file, formatted like json.dump(indent=...)"""
+
+    def __init__(self, filename, indent=2):
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.indent = indent
+        self.count = 0
+
+    def append(self, record):
+        text = json.dumps(record, indent=self.indent, ensure_ascii=False)
+        padding = ' ' * self.indent
+        self.file.write(('[\n' if self.count == 0 else ',\n') + padding + text.replace('\n', '\n' + padding))
+        self.count += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.write('\n]' if self.count else '[]')
+            self.file.close()
+
+
+class BufferedSnapshotWriter:
+    """Collects records and writes them with write_snapshot on close (Parquet)"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.records = []
+
+    def append(self, record):
+        self.records.append(record)
+
+    def close(self):
+        write_snapshot(self.records, self.filename)
+
+
+def open_snapshot_writer(filename, indent=2):
+    """Writer with append(record)/close() for the format given by the extension"""
+    file_format = snapshot_format(filename)
+    if file_format == 'parquet':
+        return BufferedSnapshotWriter(filename)
+    if file_format == 'jsonl':
+        return JsonlWriter(filename)
+    return JsonArrayWriter(filename, indent=indent)
+
+
+def filter_snapshot(filename, columns, predicate):
+    """Full records for which `predicate(row)` is true.
+
+    The predicate only sees `columns`; for Parquet those columns are read
+    first and the full table is only loaded when some row matches.
+    """
+    if snapshot_format(filename) != 'parquet':
+        return [record for record in read_snapshot(filename) if predicate(record)]
+
+    pa = _pyarrow()
+    rows = read_snapshot(filename, columns)
+    matches = [index for index, row in enumerate(rows) if predicate(row)]
+    if not matches:
+        return []
+    table = pa.parquet.read_table(filename)
+    return table.take(pa.array(matches, type=pa.int64())).to_pylist()
+
+
+def export_json(source, target):
+    """Convert any snapshot to the pretty-printed JSON array"""
+    records = read_snapshot(source)
+    write_snapshot(records, target)
+    return len(records)
@@ -1,137 +1,70 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from datetime import datetime
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from browser_pool import BrowserPool
+from driver_manager import DriverManager
+from http_backend import HttpJobClient, case_number_from_url
+from page_cache import PageCache
+from html_archive import HtmlArchive
+from job_store import save_to_store
+from job_fields import build_listing_data
+from dom_extractor import extract_job_fields
+from snapshot_store import write_snapshot, snapshot_filename
+from metrics import timed, print_latency_report, write_metrics
 import json
-import time
 import os
 import csv
 
 class JobListScraper:
-    def __init__(self, headless=False):
-        self.setup_driver(headless)
-
-    def setup_driver(self, headless):
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 15)
+    def __init__(self, headless=False, use_http=False, cache=None, archive=None, fallbacks=True):
+        self.headless = headless
+        self.use_http = use_http
+        # Seletores alternativos (h1, .company-name, '$', datas fora de <time>) para páginas sem o layout usual
+        self.fallbacks = fallbacks
+        self.cache = cache
+        # HtmlArchive opcional: guarda o #job-detail para html_archive.py reparse --schema listing
+        self.archive = archive
+        # Com o backend HTTP o navegador só é aberto quando uma página precisa dele
+        self.http = HttpJobClient(cache=cache, archive=archive) if use_http else None
+        # Chrome leve, reciclado a cada centenas de páginas e reiniciado se travar
+        self.drivers = DriverManager(headless)
+        if not use_http:
+            self.drivers.start()
+
+    @property
+    def driver(self):
+        return self.drivers.driver
+
+    @property
+    def wait(self):
+        return self.drivers.wait(15)
 
     def extract_job_data(self, job_url):
+        # Caminho rápido: HTTP + parser HTML, Selenium fica como fallback
+        if self.http:
+            job_data = self.http.extract_listing_data(job_url, fallbacks=self.fallbacks)
+            if job_data:
+                return {'url': job_url, **job_data}
+
         try:
             print(f"Acessando: {job_url}")
-            self.driver.get(job_url)
-            time.sleep(3)
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            job_data = {'url': job_url}
-
-            try:
-                job_data['jobTitle'] = self.driver.find_element(By.XPATH, "//h2[contains(@class, 'text-primary-dark')]").text.strip()
-            except NoSuchElementException:
-                try:
-                    job_data['jobTitle'] = self.driver.find_element(By.TAG_NAME, "h1").text.strip()
-                except NoSuchElementException:
-                    job_data['jobTitle'] = "N/A"
-
-            try:
-                job_data['recApplyEmail'] = self.driver.find_element(By.CSS_SELECTOR, "a[href^='mailto:']").text.strip()
-            except NoSuchElementException:
-                job_data['recApplyEmail'] = "N/A"
-
-            try:
-                dt_elements = self.driver.find_elements(By.TAG_NAME, "dt")
-                for dt in dt_elements:
-                    if "Experience Required:" in dt.text:
-                        dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                        job_data['experience_required'] = dd_element.text.strip()
-                        break
-                else:
-                    job_data['experience_required'] = "N/A"
-            except NoSuchElementException:
-                job_data['experience_required'] = "N/A"
-
-            try:
-                job_data['company'] = self.driver.find_element(By.CSS_SELECTOR, "p.text-gray-500").text.strip()
-            except NoSuchElementException:
-                try:
-                    job_data['company'] = self.driver.find_element(By.CSS_SELECTOR, ".company-name").text.strip()
-                except NoSuchElementException:
-                    job_data['company'] = "N/A"
-
-            try:
-                location_elements = self.driver.find_elements(By.CSS_SELECTOR, "p.text-gray-500")
-                job_data['location'] = location_elements[1].text.strip() if len(location_elements) > 1 else "N/A"
-            except (NoSuchElementException, IndexError):
-                job_data['location'] = "N/A"
-
-            try:
-                salary_element = self.driver.find_element(By.XPATH, "//*[contains(text(), 'per hour')]")
-                job_data['salary'] = salary_element.text.strip()
-            except NoSuchElementException:
-                try:
-                    salary_element = self.driver.find_element(By.XPATH, "//*[contains(text(), '$')]")
-                    job_data['salary'] = salary_element.text.strip()
-                except NoSuchElementException:
-                    job_data['salary'] = "N/A"
-
-            try:
-                begin_date = self.driver.find_element(By.XPATH, "//time[contains(text(), 'Begin date:')]")
-                job_data['begin_date'] = begin_date.text.replace('Begin date: ', '').strip()
-            except NoSuchElementException:
-                try:
-                    begin_date = self.driver.find_element(By.XPATH, "//*[contains(text(), 'Begin date:')]")
-                    job_data['begin_date'] = begin_date.text.replace('Begin date: ', '').strip()
-                except NoSuchElementException:
-                    job_data['begin_date'] = "N/A"
-
-            try:
-                end_date = self.driver.find_element(By.XPATH, "//time[contains(text(), 'End date:')]")
-                job_data['end_date'] = end_date.text.replace('End date: ', '').strip()
-            except NoSuchElementException:
-                try:
-                    end_date = self.driver.find_element(By.XPATH, "//*[contains(text(), 'End date:')]")
-                    job_data['end_date'] = end_date.text.replace('End date: ', '').strip()
-                except NoSuchElementException:
-                    job_data['end_date'] = "N/A"
-
-            try:
-                job_data['phone'] = self.driver.find_element(By.CSS_SELECTOR, "a[href^='tel:']").text.strip()
-            except NoSuchElementException:
-                job_data['phone'] = "N/A"
-
-            try:
-                dt_elements = self.driver.find_elements(By.TAG_NAME, "dt")
-                for dt in dt_elements:
-                    if "ETA Case Number:" in dt.text:
-                        dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                        job_data['caseNumber'] = dd_element.text.strip()
-                        break
-                else:
-                    job_data['caseNumber'] = "N/A"
-            except NoSuchElementException:
-                job_data['caseNumber'] = "N/A"
-
-            try:
-                dt_elements = self.driver.find_elements(By.TAG_NAME, "dt")
-                for dt in dt_elements:
-                    if "Job Duties:" in dt.text:
-                        dd_element = dt.find_element(By.XPATH, "following-sibling::dd[1]")
-                        job_duties_text = dd_element.text.strip()
-                        job_data['job_duties'] = job_duties_text[:500] + "..." if len(job_duties_text) > 500 else job_duties_text
-                        break
-                else:
-                    job_data['job_duties'] = "N/A"
-            except NoSuchElementException:
-                job_data['job_duties'] = "N/A"
+            self.drivers.get(job_url)
+            # Espera o conteúdo do job renderizar em vez de um sleep fixo
+            with timed('detail_ready'):
+                self.wait.until(EC.any_of(
+                    EC.presence_of_element_located((By.ID, "job-detail")),
+                    EC.presence_of_element_located((By.TAG_NAME, "h1")),
+                ))
+            # Todos os campos em uma única chamada execute_script
+            with timed('extract_fields'):
+                raw = extract_job_fields(self.driver, include_html=self.archive is not None, fallbacks=self.fallbacks)
+            job_data = {'url': job_url, **build_listing_data(raw)}
+            if self.archive:
+                self.archive.save(case_number_from_url(job_url), raw.get('html'))
+
+            # Guarda a página renderizada para a próxima execução e para reextração offline
+            if self.cache:
+                self.cache.put(case_number_from_url(job_url), self.driver.page_source)
 
             return job_data
 
@@ -142,49 +75,63 @@ class JobListScraper:
     def save_to_json(self, data, filename='data/jobs_list.json'):
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         try:
-            with open(filename, 'w', encoding='utf-8') as file:
+            with timed('save_json'), open(filename, 'w', encoding='utf-8') as file:
                 json.dump(data, file, indent=2, ensure_ascii=False)
             print(f"✓ Dados salvos em {filename}")
 
-            os.makedirs('backup', exist_ok=True)
             data_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            backup_filename = f'backup/jobs_list_{data_str}.json'
-
-            with open(backup_filename, 'w', encoding='utf-8') as backup_file:
-                json.dump(data, backup_file, indent=2, ensure_ascii=False)
+            backup_filename = snapshot_filename(f'backup/jobs_list_{data_str}')
+            with timed('save_backup'):
+                write_snapshot(data, backup_filename)
             print(f"✓ Backup salvo em {backup_filename}")
 
         except Exception as e:
             print(f"✗ Erro ao salvar JSON: {e}")
 
     def close(self):
-        if self.driver:
-            self.driver.quit()
+        if self.http:
+            self.http.close()
+        self.drivers.quit()
 
 def read_job_codes_from_csv(filepath):
     with open(filepath, newline='', encoding='utf-8') as csvfile:
         reader = csv.reader(csvfile)
         return [row[0].strip() for row in reader if row]
 
-def main():
+def main(csv_file=os.path.join('services', 'h2.csv'), workers=4, use_http=False):
+    # csv_file: códigos dos jobs na primeira coluna; workers: navegadores headless em paralelo
+    # use_http: tenta HTTP simples antes do Chrome (experimental: o site renderiza no cliente)
     scraper = None
     try:
         print("=== Iniciando Scraper de Jobs em Lista ===")
-        scraper = JobListScraper(headless=True)
+        scraper = JobListScraper(headless=True, use_http=use_http, cache=PageCache(), archive=HtmlArchive())
 
-        job_codes = read_job_codes_from_csv('services\\h2.csv')
+        job_codes = read_job_codes_from_csv(csv_file)
         base_url = "https://seasonaljobs.dol.gov/jobs/"
         all_jobs_data = []
         successful_extractions = 0
         failed_extractions = 0
 
-        print(f"📋 Processando {len(job_codes)} jobs...")
-
-        for i, job_code in enumerate(job_codes, 1):
-            job_url = base_url + job_code
-            print(f"\n🔍 [{i}/{len(job_codes)}] Processando: {job_code}")
-
-            job_data = scraper.extract_job_data(job_url)
+        print(f"📋 Processando {len(job_codes)} jobs com {workers} navegador(es)...")
+
+        # O primeiro worker reaproveita este scraper; o pool começa em 1 request a cada 2s,
+        # se adapta à latência/erros do site e tenta de novo (com backoff) os jobs que falham
+        pool = BrowserPool(
+            lambda: JobListScraper(headless=scraper.headless, use_http=scraper.use_http,
+                                   cache=scraper.cache, archive=scraper.archive),
+            workers=workers,
+            min_interval=2.0,
+            primary=scraper,
+            progress_file='data/jobs_list_progress.jsonl',
+            dead_letter_file='data/jobs_list_dead_letter.jsonl',
+        )
+        job_urls = [base_url + job_code for job_code in job_codes]
+        results = pool.imap(job_urls, lambda worker, job_url: worker.extract_job_data(job_url))
+
+        for offset, job_url, job_data in results:
+            i = offset + 1
+            job_code = job_codes[offset]
+            print(f"\n🔍 [{i}/{len(job_codes)}] Processado: {job_code}")
 
             if job_data:
                 job_data['job_code'] = job_code
@@ -206,12 +153,11 @@ def main():
                 partial_filename = f"data/jobs_partial_{i}.json"
                 scraper.save_to_json(all_jobs_data, filename=partial_filename)
 
-            if i < len(job_codes):
-                time.sleep(2)
-
         # Salva resultado final
         if all_jobs_data:
             scraper.save_to_json(all_jobs_data, filename='data/jobs_list.json')
+            # Também no banco de jobs (data/jobs.sqlite)
+            save_to_store(all_jobs_data, 't.py')
 
             print(f"\n🎉 Extração completa!")
             print(f"✅ Jobs extraídos com sucesso: {successful_extractions}")
@@ -226,6 +172,9 @@ def main():
     finally:
         if scraper:
             scraper.close()
+        # Métricas da execução (latência por etapa, jobs/min, retries, RSS do Chrome)
+        print_latency_report()
+        write_metrics('data/jobs_list_metrics.json')
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,26 @@
+"""Readiness conditions used instead of fixed time.sleep calls"""
+
+ARTICLE_SELECTOR = "article[tabindex='0']"
+# Seconds to wait for "Load More" to add cards; once the list is exhausted every
+# attempt runs into this, so it is much shorter than the page wait
+LOAD_MORE_TIMEOUT = 3
+
+
+def count_articles(driver, selector=ARTICLE_SELECTOR):
+    """Number of listing cards, counted in the page (one round-trip, no element handles)"""
+    return driver.execute_script("return document.querySelectorAll(arguments[0]).length;", selector)
+
+
+class article_count_greater_than:
+    """Expected condition: more than `count` listing cards are on the page.
+
+    Returns the new count, so `wait.until(...)` gives it back directly.
+    """
+
+    def __init__(self, count, selector=ARTICLE_SELECTOR):
+        self.count = count
+        self.selector = selector
+
+    def __call__(self, driver):
+        current = count_articles(driver, self.selector)
+        return current if current > self.count else False
@@ -1,18 +1,11 @@
-import json
+from job_store import JobStore
 
-# 1. Ler o arquivo original
-with open('data/jobs_partial_1500.json', 'r', encoding='utf-8') as file:
-    jobs = json.load(file)
-
-# 2. Filtrar os trabalhos que não exigem experiência
-with_experience_jobs = [
-    job for job in jobs
-    if job.get("experience_required", "").strip().lower() == "yes"
-]
-
-# 3. Salvar os resultados filtrados em um novo arquivo
-with open('data/with_experience.json', 'w', encoding='utf-8') as file:
-    json.dump(with_experience_jobs, file, indent=2, ensure_ascii=False)
+# 1 a 3. Consultar no banco de jobs (data/jobs.sqlite) os trabalhos que exigem
+# experiência, pelo índice de experience_required, e salvar os resultados
+# (snapshots antigos entram com: python services/job_store.py import arquivo.json)
+store = JobStore()
+with_experience_count = store.export_query('data/with_experience.json', experience="yes")
+store.close()
 
 # 4. Mensagem de confirmação
-print(f"{len(with_experience_jobs)} trabalho(s) com exigência de experiência foram salvos em 'filtered_jobs_with_experience.json'")
+print(f"{with_experience_count} trabalho(s) com exigência de experiência foram salvos em 'data/with_experience.json'")